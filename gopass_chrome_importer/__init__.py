@@ -17,3 +17,82 @@ def coerce(value: int or float, min_value: int or float, max_value: int or float
     if value > max_value:
         return max_value
     return value
+
+
+def get_cache_dir() -> str:
+    """
+    :return: the directory used to store persistent data between runs (following the XDG base directory spec)
+    """
+    import os
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "gopass-chrome-importer")
+
+
+def write_file_atomically(file_path: str, write: callable) -> None:
+    """
+    Writes a file that is only readable by the current user, readers never see a partially written file
+
+    :param file_path: path of the file
+    :param write: function called with the opened temp file, that writes the content
+    """
+    import os
+
+    tmp_file_path = "%s.%s.tmp" % (file_path, os.getpid())
+    file_descriptor = os.open(tmp_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        with os.fdopen(file_descriptor, 'w') as tmp_file:
+            write(tmp_file)
+        os.replace(tmp_file_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_file_path):
+            os.remove(tmp_file_path)
+        raise
+
+
+def parse_config_value(output: str) -> str:
+    """
+    :param output: output of "gopass config <key>"
+    :return: the value of the setting
+    """
+    # older versions print "key: value"
+    return output.strip().split(": ", 1)[-1]
+
+
+class _ThreadLocalVariable:
+    """
+    Minimal replacement of contextvars.ContextVar for older python versions
+    """
+
+    def __init__(self, name: str, default=None):
+        import threading
+
+        self.name = name
+        self.default = default
+        self._local = threading.local()
+
+    def get(self):
+        return getattr(self._local, "value", self.default)
+
+    def set(self, value):
+        previous = self.get()
+        self._local.value = value
+        return previous
+
+    def reset(self, token) -> None:
+        self._local.value = token
+
+
+def create_context_variable(name: str, default=None):
+    """
+    Creates a variable with a separate value for each thread and asyncio task
+
+    :param name: name of the variable
+    :param default: the value of the variable if it has not been set
+    :return: a contextvars.ContextVar, or a thread local replacement for python versions before 3.7
+    """
+    try:
+        from contextvars import ContextVar
+    except ImportError:
+        return _ThreadLocalVariable(name, default=default)
+    return ContextVar(name, default=default)
@@ -0,0 +1,228 @@
+"""
+Import engine running all gopass calls as asyncio subprocesses
+
+Reading, planning and writing are separate stages connected by bounded queues,
+so slow gopass calls slow down parsing instead of filling up the memory.
+
+This module requires python 3.7 or newer and is only imported when it is used.
+"""
+
+import asyncio
+import contextvars
+import time
+
+from gopass_chrome_importer.backends import StoreBackend, StoreCall
+from gopass_chrome_importer.engine import import_entries
+from gopass_chrome_importer.executor import CommandExecutor
+from gopass_chrome_importer.importer import ImportReport, ImportRun
+from gopass_chrome_importer.profiler import PROFILER, STAGE_STORE
+from gopass_chrome_importer.store_hook import StoreResult
+
+
+async def run_command(executor: CommandExecutor, args: [str], input_data: str or None = None,
+                      capture_output: bool = False, env: dict or None = None,
+                      interactive: bool = False) -> str or None:
+    """
+    Runs a command as an asyncio subprocess, see CommandExecutor.run
+
+    :param executor: the executor used to record the call
+    :param args: the command and its arguments
+    :param input_data: data to write to the stdin of the command, if any
+    :param capture_output: when set to true the stdout of the command is returned
+    :param env: environment of the command, defaults to the environment of this process
+    :param interactive: when set to true the command uses the stdin and stderr of this process
+    :return: the stdout of the command, if captured
+    """
+    args = executor.get_command_args(args)
+
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE if input_data is not None else None,
+        stdout=asyncio.subprocess.PIPE if capture_output else None,
+        stderr=None if interactive else asyncio.subprocess.PIPE,
+        env=env)
+    communication = asyncio.ensure_future(
+        process.communicate(input=input_data.encode() if input_data is not None else None))
+    try:
+        output, error_output = await asyncio.shield(communication)
+    except asyncio.CancelledError:
+        # never interrupt gopass while it is writing a secret, the import is aborted afterwards
+        await communication
+        raise
+    duration = time.perf_counter() - start
+
+    return executor.process_result(args, duration, process.returncode, output, error_output, capture_output)
+
+
+async def _run_in_thread(function: callable, *args):
+    """
+    Runs a blocking function in the default thread pool, keeping the current profiler entry
+
+    :param function: the function to run
+    :param args: arguments of the function
+    :return: the result of the function
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(None, context.run, function, *args)
+
+
+async def store_secret(store_backend: StoreBackend, executor: CommandExecutor, secret_path: str, username: str,
+                       password: str) -> StoreResult:
+    """
+    Stores a single secret using the gopass call prepared by the store backend
+
+    :param store_backend: the backend used to store the secret
+    :param executor: the executor used to record the call
+    :param secret_path: the path of the secret within gopass
+    :param username: the username, if any
+    :param password: the password
+    :return: the outcome
+    """
+    call = store_backend.prepare(secret_path, username, password)
+    if call is None:
+        # the backend does not use a single gopass call
+        return await _run_in_thread(store_backend.store, secret_path, username, password)
+    if not isinstance(call, StoreCall):
+        return call
+
+    succeeded = False
+    try:
+        await run_command(executor, call.args, input_data=call.input_data, env=call.env,
+                          interactive=call.interactive)
+        succeeded = True
+    finally:
+        result = call.finish(succeeded)
+    return result
+
+
+async def import_pipeline(parsed_entries: iter, plan_entry: callable, finish_planning: callable,
+                          check_entry: callable, finish_entry: callable, store_backend: StoreBackend,
+                          executor: CommandExecutor, jobs: int = 1, blocking_check: bool = False) -> None:
+    """
+    Imports entries using a reader, a planner and multiple writer tasks
+
+    Writes to the same secret path are chained, so they never happen at the same time
+    and keep the order of the csv file.
+
+    :param parsed_entries: tuples of row number and entry, read in a separate thread
+    :param plan_entry: function returning the tuples of row number, secret path and entry
+                       that can be written after adding the given row number and entry
+    :param finish_planning: function returning the remaining tuples after the last entry
+    :param check_entry: function returning the outcome, if the given entry does not have to be stored
+    :param finish_entry: function called with the outcome after an entry has been processed
+    :param store_backend: the backend used to store the secrets
+    :param executor: the executor used to record all gopass calls
+    :param jobs: number of gopass calls that run at the same time
+    :param blocking_check: set to true, if check_entry may call gopass itself
+    """
+    parsed_queue = asyncio.Queue(maxsize=jobs * 2)
+    planned_queue = asyncio.Queue(maxsize=jobs * 2)
+    loop = asyncio.get_running_loop()
+
+    async def read():
+        entry_iterator = iter(parsed_entries)
+        while True:
+            item = await loop.run_in_executor(None, next, entry_iterator, None)
+            await parsed_queue.put(item)
+            if item is None:
+                return
+
+    async def plan():
+        # secret path -> future of the last write to it, resolved with true if it succeeded
+        last_writes = {}
+        while True:
+            item = await parsed_queue.get()
+            planned = plan_entry(*item) if item is not None else finish_planning()
+            for row, secret_path, entry in planned:
+                done = loop.create_future()
+                await planned_queue.put((last_writes.get(secret_path), done, row, secret_path, entry))
+                last_writes[secret_path] = done
+            if item is None:
+                break
+
+        for _ in range(jobs):
+            await planned_queue.put(None)
+
+    async def write():
+        while True:
+            item = await planned_queue.get()
+            if item is None:
+                return
+
+            previous, done, row, secret_path, entry = item
+            if previous is not None and not await previous:
+                # an earlier write to the same secret failed, the import is aborted anyway
+                entry.wipe()
+                done.set_result(False)
+                continue
+
+            try:
+                with PROFILER.entry(row, secret_path):
+                    if blocking_check:
+                        result = await _run_in_thread(check_entry, row, secret_path, entry)
+                    else:
+                        result = check_entry(row, secret_path, entry)
+
+                    stored = result is None
+                    if stored:
+                        with PROFILER.measure(STAGE_STORE):
+                            result = await store_secret(store_backend, executor, secret_path,
+                                                        entry.username, entry.password)
+                    finish_entry(row, secret_path, entry, result, stored)
+            except BaseException:
+                done.set_result(False)
+                raise
+            finally:
+                entry.wipe()
+            done.set_result(True)
+
+    tasks = [asyncio.ensure_future(read()), asyncio.ensure_future(plan())]
+    tasks += [asyncio.ensure_future(write()) for _ in range(jobs)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # the entries that are still queued are never written
+        while not parsed_queue.empty():
+            item = parsed_queue.get_nowait()
+            if item is not None:
+                item[1].wipe()
+        while not planned_queue.empty():
+            item = planned_queue.get_nowait()
+            if item is not None:
+                item[4].wipe()
+        raise
+
+
+def run_pipeline(*args, **kwargs) -> None:
+    """
+    Runs import_pipeline in a new event loop, see import_pipeline for the arguments
+    """
+    asyncio.run(import_pipeline(*args, **kwargs))
+
+
+async def run_import(import_run: ImportRun) -> ImportReport:
+    """
+    Runs an import within the running event loop, see Importer.run_async
+
+    :param import_run: the run of the importer
+    :return: the results
+    """
+    importer = import_run.importer
+    await _run_in_thread(import_run.begin)
+
+    completed = False
+    try:
+        importer.store_backend.open(importer.context)
+        try:
+            await import_entries(awaitable=True, **import_run.get_import_arguments())
+        finally:
+            importer.store_backend.close()
+        completed = True
+    finally:
+        await _run_in_thread(import_run.end, completed)
+
+    return await _run_in_thread(import_run.finish)
@@ -0,0 +1,410 @@
+"""
+Module for the different ways of writing secrets to gopass and the gopass calls used by an import
+"""
+
+import os
+import shlex
+import sys
+import time
+import uuid
+
+from gopass_chrome_importer import parse_config_value, store_hook
+from gopass_chrome_importer.const import EDITOR_ENV_VARIABLE_NAME, SUMMARY_TMP_FILE_ENV_VARIABLE_NAME, \
+    SECRET_PATH_ENV_VARIABLE_NAME, USERNAME_ENV_VARIABLE_NAME, PASSWORD_ENV_VARIABLE_NAME, \
+    STORE_RESULT_FILE_ENV_VARIABLE_NAME, PROFILE_FILE_ENV_VARIABLE_NAME, PROFILE_ROW_ENV_VARIABLE_NAME, \
+    PROFILE_START_ENV_VARIABLE_NAME, SUMMARY_SECTION_ENV_VARIABLE_NAME
+from gopass_chrome_importer.context import ImportContext
+from gopass_chrome_importer.editor_server import EditorServer
+from gopass_chrome_importer.executor import CommandExecutor, CommandError
+from gopass_chrome_importer.manifest import ImportManifest
+from gopass_chrome_importer.mounts import parse_mounts
+from gopass_chrome_importer.profiler import PROFILER, STAGE_STORE_INTERNAL
+from gopass_chrome_importer.store_hook import StoreResult, create_secret_content, store_secret_file, \
+    FORCE_OPTION_NAMES, DRY_RUN_OPTION_NAMES
+from gopass_chrome_importer.store_index import StoreIndex, content_digest
+from gopass_chrome_importer.summary_manager import SummaryManager
+
+
+class StoreCall:
+    """
+    A prepared gopass call that stores a single secret
+    """
+
+    def __init__(self, args: [str], input_data: str or None = None, env: dict or None = None,
+                 interactive: bool = False, finish: callable = None):
+        """
+        Constructor
+
+        :param args: the full argument list of the gopass call
+        :param input_data: data to write to the stdin of gopass, if any
+        :param env: environment of the gopass call, if different from the one of this process
+        :param interactive: when set to true gopass may ask questions
+        :param finish: function called with true (if the call succeeded) or false after the call,
+                       returning the outcome
+        """
+        self.args = args
+        self.input_data = input_data
+        self.env = env
+        self.interactive = interactive
+        self.finish = finish
+
+
+class StoreBackend:
+    """
+    Base class for the different ways of writing secrets to gopass
+    """
+
+    def __init__(self, force: bool = False, dry_run: bool = False, yes: bool = False,
+                 store_index: StoreIndex or None = None):
+        """
+        Constructor
+
+        :param force: If set to True existing secrets will be overwritten by imported data
+        :param dry_run: If set to True no changes will be made to the gopass store.
+                        Only used by callers of the library interface, a dry run of the import command
+                        plans the import instead of passing the entries to a backend.
+        :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+        :param store_index: index of the existing secrets, if the store has been scanned already
+        """
+        self.force = force
+        self.dry_run = dry_run
+        self.yes = yes
+        self.store_index = store_index
+        # set while the backend is open
+        self.context = None
+
+    def open(self, context: ImportContext) -> None:
+        """
+        Prepares the backend before the first secret is stored
+
+        :param context: runs the gopass calls and collects the messages of the import
+        """
+        self.context = context
+
+    def close(self) -> None:
+        """
+        Releases any resources after the last secret was stored
+        """
+
+    def store(self, secret_path: str, username: str, password: str) -> StoreResult:
+        """
+        Stores a single secret
+
+        :param secret_path: the path of the secret within gopass
+        :param username: the username, if any
+        :param password: the password
+        :return: the outcome
+        """
+        call = self.prepare(secret_path, username, password)
+        if call is None:
+            raise NotImplementedError()
+        if isinstance(call, StoreResult):
+            return call
+
+        succeeded = False
+        try:
+            self.context.executor.run(call.args, input_data=call.input_data, env=call.env,
+                                      interactive=call.interactive)
+            succeeded = True
+        finally:
+            result = call.finish(succeeded)
+        return result
+
+    def prepare(self, secret_path: str, username: str, password: str) -> StoreCall or StoreResult or None:
+        """
+        Prepares storing a single secret with a single gopass call,
+        so the call can be run by the different import engines
+
+        :param secret_path: the path of the secret within gopass
+        :param username: the username, if any
+        :param password: the password
+        :return: the gopass call, the outcome if no call is necessary
+                 or None if this backend does not store secrets with a single gopass call
+        """
+        return None
+
+    def _gopass_args(self, *args: str) -> [str]:
+        """
+        :param args: the gopass subcommand and its arguments
+        :return: the full argument list for a gopass call
+        """
+        return get_gopass_args(*args, yes=self.yes)
+
+
+class EditStoreBackend(StoreBackend):
+    """
+    Stores secrets using "gopass edit" and this tool as the editor
+    """
+
+    def __init__(self, force: bool = False, dry_run: bool = False, yes: bool = False,
+                 store_index: StoreIndex or None = None, editor_server: bool = False):
+        """
+        Constructor
+
+        :param editor_server: If set to True secrets are written in-process using the editor shim
+        """
+        super().__init__(force=force, dry_run=dry_run, yes=yes, store_index=store_index)
+        self.editor_server = editor_server
+        self._server = None
+        # variables added to the environment of every gopass call
+        self._environment = {}
+
+    def open(self, context: ImportContext) -> None:
+        super().open(context)
+        # set custom "editor" that will process the password
+        if self.editor_server:
+            self._server = EditorServer(handler=self._process_editor_file)
+            self._server.start()
+            editor_command = self._server.get_editor_command()
+        else:
+            # a dedicated entry point without click, as a new process is started for every secret
+            editor_command = "%s -m %s" % (shlex.quote(sys.executable), store_hook.__name__)
+            if self.force:
+                editor_command += " %s" % FORCE_OPTION_NAMES[0]
+            if self.dry_run:
+                editor_command += " %s" % DRY_RUN_OPTION_NAMES[0]
+        # the environment of this process is left unchanged, so multiple backends can be used at the same time
+        self._environment = {
+            EDITOR_ENV_VARIABLE_NAME: editor_command,
+            # set path to summary tmp file used for this run
+            SUMMARY_TMP_FILE_ENV_VARIABLE_NAME: context.summary_manager.get_tmp_file_path()
+        }
+
+    def close(self) -> None:
+        if self._server:
+            self._server.stop()
+            self._server = None
+
+    def _process_editor_file(self, file_path: str, entry: tuple) -> StoreResult:
+        """
+        Handles a file passed to the editor shim
+
+        :param file_path: path of the file passed to the editor by gopass
+        :param entry: the entry registered for this file
+        :return: the outcome
+        """
+        secret_path, username, password, profile_entry, summary_section = entry
+        summary_manager = self.context.summary_manager
+        with PROFILER.entry(*profile_entry), summary_manager.section(summary_section), \
+                PROFILER.measure(STAGE_STORE_INTERNAL):
+            return store_secret_file(file_path, secret_path, username, password, summary_manager, self.context.echo,
+                                     force=self.force, dry_run=self.dry_run)
+
+    def prepare(self, secret_path: str, username: str, password: str) -> StoreCall:
+        # this command is a simple workaround to use gopass in a non-interactive way
+        # by using the edit command and a 'fake' editor that is this python script and
+        # stores the password in the temporarily decrypted file until
+        # gopass encrypts it.
+
+        # secrets may be stored concurrently, so the environment is passed to
+        # each gopass call instead of modifying the one of this process
+        env = dict(os.environ)
+        env.update(self._environment)
+        summary_manager = self.context.summary_manager
+
+        token = None
+        result_file_path = None
+        if self._server:
+            # the editor server already knows about the secret,
+            # the editor shim only needs to know how to reach it
+            token = self._server.register((secret_path, username, password, PROFILER.get_current_entry(),
+                                           summary_manager.get_section()))
+            env.update(self._server.get_environment(token))
+        else:
+            # store final path to the secret in an env variable
+            env[SECRET_PATH_ENV_VARIABLE_NAME] = secret_path
+            # store username
+            env[USERNAME_ENV_VARIABLE_NAME] = username
+            # store password
+            env[PASSWORD_ENV_VARIABLE_NAME] = password
+            # the store_internal command reports its outcome using this file
+            result_file_path = "%s.%s" % (summary_manager.get_tmp_file_path(), uuid.uuid4().hex)
+            env[STORE_RESULT_FILE_ENV_VARIABLE_NAME] = result_file_path
+            if summary_manager.get_section() is not None:
+                env[SUMMARY_SECTION_ENV_VARIABLE_NAME] = summary_manager.get_section()
+            if PROFILER.enabled:
+                # the store_internal command runs in a separate process
+                env[PROFILE_FILE_ENV_VARIABLE_NAME] = get_profile_journal_path(summary_manager)
+                row, _ = PROFILER.get_current_entry()
+                if row is not None:
+                    env[PROFILE_ROW_ENV_VARIABLE_NAME] = str(row)
+                env[PROFILE_START_ENV_VARIABLE_NAME] = repr(time.time())
+
+        # maybe we could use this to be able to only update existing secrets, without creating new ones
+        # dont know if this is an actual usecase though...
+        create_new = True
+
+        # append the actual gopass command
+        args = ["edit"]
+        if create_new:
+            args.append("--create")
+        args.append(secret_path)
+
+        def finish(succeeded: bool) -> StoreResult:
+            result = None
+            if token:
+                result = self._server.unregister(token)
+            if result_file_path:
+                result = _read_store_result_file(result_file_path)
+            return result or StoreResult.UNKNOWN
+
+        # without --yes gopass may ask questions
+        return StoreCall(self._gopass_args(*args), env=env, interactive=not self.yes, finish=finish)
+
+
+class InsertStoreBackend(StoreBackend):
+    """
+    Stores secrets by streaming their content to "gopass insert"
+
+    Existing secrets are detected using a single listing of the store
+    so they don't have to be decrypted.
+    """
+
+    def open(self, context: ImportContext) -> None:
+        super().open(context)
+        if self.store_index is None:
+            self.store_index = scan_store(context.executor, yes=self.yes)
+
+    def prepare(self, secret_path: str, username: str, password: str) -> StoreCall or StoreResult:
+        exists = self.store_index.contains(secret_path)
+        if exists:
+            if not self.force:
+                self.context.echo("Existing secret will NOT be overwritten: %s" % secret_path, warn=True)
+                return StoreResult.SKIPPED
+
+            self.context.echo("Existing secret WILL BE overwritten: %s" % secret_path, warn=True)
+
+        if self.dry_run:
+            # just print what would be executed
+            secret_content = create_secret_content(password, username, mask_pw=True)
+            self.context.echo("%s:\n%s\n" % (secret_path, secret_content), info=True)
+            self.context.summary_manager.add_info("Would import: %s" % secret_path)
+            return StoreResult.DRY_RUN
+
+        args = ["insert"]
+        if exists:
+            args.append("--force")
+        args.append(secret_path)
+
+        secret_content = create_secret_content(password, username)
+
+        def finish(succeeded: bool) -> StoreResult or None:
+            if not succeeded:
+                return None
+            self.store_index.add(secret_path, content_digest(secret_content))
+            self.context.summary_manager.add_info("Imported %s" % secret_path)
+            return StoreResult.OVERWRITTEN if exists else StoreResult.IMPORTED
+
+        return StoreCall(self._gopass_args(*args), input_data=secret_content, finish=finish)
+
+
+def _read_store_result_file(file_path: str) -> StoreResult or None:
+    """
+    Reads (and removes) the file used by the store_internal command to report its outcome
+
+    :param file_path: path of the result file
+    :return: the outcome or None if it was not reported
+    """
+    try:
+        with open(file_path, 'r') as file:
+            return StoreResult(file.read().strip())
+    except (OSError, ValueError):
+        return None
+    finally:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def get_profile_journal_path(summary_manager: SummaryManager) -> str:
+    """
+    :param summary_manager: the summary of the import
+    :return: path of the file that store_internal processes append their profiling records to
+    """
+    return "%s.profile" % summary_manager.get_tmp_file_path()
+
+
+def get_store_root(executor: CommandExecutor, yes: bool = False) -> str:
+    """
+    :param executor: the executor running the gopass calls
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :return: the root directory of the gopass store
+    """
+    # the name of this setting depends on the gopass version
+    for key in ["mounts.path", "path"]:
+        try:
+            output = executor.run(get_gopass_args("config", key, yes=yes), capture_output=True)
+        except CommandError:
+            continue
+        value = parse_config_value(output)
+        if value:
+            return os.path.expanduser(value)
+
+    raise ValueError("Unable to determine the path of the gopass store")
+
+
+def get_mounts(executor: CommandExecutor, yes: bool = False) -> dict:
+    """
+    :param executor: the executor running the gopass call
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :return: path of each mounted sub-store by its name
+    """
+    try:
+        return parse_mounts(executor.run(get_gopass_args("mounts", yes=yes), capture_output=True))
+    except CommandError:
+        return {}
+
+
+def create_manifest(executor: CommandExecutor, store_root: str, base_path: str, yes: bool = False) -> ImportManifest:
+    """
+    :param executor: the executor running the gopass call
+    :param store_root: the root directory of the gopass store
+    :param base_path: the base path the entries are imported to
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :return: the (not yet loaded) manifest of the imports into the base path
+    """
+    # secrets below the base path may be stored in any of the mounts
+    return ImportManifest(ImportManifest.get_file_path(store_root, base_path), store_root=store_root,
+                          mounts=get_mounts(executor, yes=yes))
+
+
+def get_gopass_args(*args: str, yes: bool = False) -> [str]:
+    """
+    :param args: the gopass subcommand and its arguments
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :return: the full argument list for a gopass call
+    """
+    result = ["gopass"]
+    if yes:
+        result.append("--yes")
+    result.extend(args)
+    return result
+
+
+def scan_store(executor: CommandExecutor, yes: bool = False) -> StoreIndex:
+    """
+    Lists all existing secrets using a single gopass call
+
+    :param executor: the executor running the gopass call
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :return: index of the existing secrets
+    """
+    output = executor.run(get_gopass_args("list", "--flat", yes=yes), capture_output=True)
+    return StoreIndex(output.splitlines())
+
+
+def read_secret(executor: CommandExecutor, secret_path: str, yes: bool = False) -> str:
+    """
+    Reads the content of an existing secret
+
+    :param executor: the executor running the gopass call
+    :param secret_path: the path of the secret within gopass
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :return: the content of the secret
+    """
+    return executor.run(get_gopass_args("show", "-f", secret_path, yes=yes), capture_output=True)
+
+
+STORE_BACKENDS = {
+    "edit": EditStoreBackend,
+    "insert": InsertStoreBackend
+}
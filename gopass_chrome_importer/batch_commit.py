@@ -0,0 +1,189 @@
+"""
+Module for combining all changes of an import into a single git commit
+"""
+
+import hashlib
+import json
+import os
+
+from gopass_chrome_importer import get_cache_dir, parse_config_value, write_file_atomically
+from gopass_chrome_importer.executor import CommandExecutor, CommandError
+
+# gopass settings that are disabled during a batch, the names depend on the gopass version
+SUSPENDED_SETTINGS = ["core.autosync", "core.autopush", "autosync", "autopush"]
+SUSPENDED_VALUE = "false"
+
+COMMIT_MESSAGE = "Import %s secrets from chrome password export"
+
+
+def _is_process_running(pid: int) -> bool:
+    """
+    :param pid: id of a process
+    :return: True if the process is still running
+    """
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        # running, but owned by another user
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class BatchCommit:
+    """
+    Suspends automatic syncing of gopass during an import and squashes
+    the commits gopass creates for every secret into a single one afterwards.
+
+    The original settings are written to a restore file of the store before they are changed,
+    together with the id of the importing process. If that process is killed before restoring
+    the settings itself, the next batch on the same store restores them.
+    """
+
+    def __init__(self, store_root: str, executor: CommandExecutor, gopass_args: callable,
+                 restore_file_path: str or None = None):
+        """
+        Constructor
+
+        :param store_root: root directory of the gopass store
+        :param executor: executor used to run gopass and git
+        :param gopass_args: function creating the full argument list for a gopass call
+        :param restore_file_path: path of the file the original settings are saved to
+        """
+        self.store_root = store_root
+        self.executor = executor
+        self.gopass_args = gopass_args
+        self.restore_file_path = restore_file_path or self.get_restore_file_path(store_root)
+        self.start_commit = None
+        self._settings = {}
+
+    @staticmethod
+    def get_restore_file_path(store_root: str) -> str:
+        """
+        :param store_root: root directory of the gopass store
+        :return: default path of the file the original settings of the store are saved to
+        """
+        key = hashlib.sha256(store_root.encode()).hexdigest()
+        return os.path.join(get_cache_dir(), "batch_restore", "%s.json" % key)
+
+    @staticmethod
+    def restore_interrupted(store_root: str, executor: CommandExecutor, gopass_args: callable,
+                            restore_file_path: str or None = None) -> dict:
+        """
+        Restores the settings of a previous batch on the store that has been interrupted, if any.
+        The settings of a batch whose process is still running are left alone.
+
+        :param store_root: root directory of the gopass store
+        :param executor: executor used to run gopass
+        :param gopass_args: function creating the full argument list for a gopass call
+        :param restore_file_path: path of the file the original settings have been saved to
+        :return: the restored settings
+        """
+        restore_file_path = restore_file_path or BatchCommit.get_restore_file_path(store_root)
+        data = BatchCommit._read_restore_file(restore_file_path)
+        if data is None or _is_process_running(data["pid"]):
+            return {}
+
+        batch = BatchCommit(store_root, executor, gopass_args, restore_file_path=restore_file_path)
+        batch._settings = data["settings"]
+        batch.restore()
+        return data["settings"]
+
+    def begin(self) -> None:
+        """
+        Remembers the current commit of the store and suspends automatic syncing
+
+        :raise ValueError: if another running import has suspended the settings of the store
+        """
+        data = self._read_restore_file(self.restore_file_path)
+        if data is not None and _is_process_running(data["pid"]):
+            raise ValueError("Another import (process %s) is combining its changes on this store" % data["pid"])
+
+        self.start_commit = self._git_output("rev-parse", "HEAD")
+
+        for key in SUSPENDED_SETTINGS:
+            try:
+                value = parse_config_value(self.executor.run(self.gopass_args("config", key), capture_output=True))
+            except CommandError:
+                # not supported by this gopass version
+                continue
+            if value:
+                self._settings[key] = value
+
+        self._save_restore_file()
+        for key in self._settings.keys():
+            self._set_config(key, SUSPENDED_VALUE)
+
+    def restore(self) -> None:
+        """
+        Restores the original settings
+        """
+        for key, value in self._settings.items():
+            self._set_config(key, value)
+        self._settings = {}
+
+        if os.path.isfile(self.restore_file_path):
+            os.remove(self.restore_file_path)
+
+    def commit(self, push: bool = False) -> int:
+        """
+        Squashes all commits since the start of the batch into a single one
+
+        :param push: when set to true the commit is pushed to the default remote afterwards
+        :return: the number of squashed commits
+        """
+        if self.start_commit is None:
+            # a store without any commits can not be squashed
+            return 0
+
+        count = int(self._git_output("rev-list", "--count", "%s..HEAD" % self.start_commit) or 0)
+        if count > 0:
+            self.executor.run(["git", "-C", self.store_root, "reset", "--soft", self.start_commit])
+            self.executor.run(["git", "-C", self.store_root, "commit", "--quiet", "-m", COMMIT_MESSAGE % count])
+
+        if push and self._git_output("remote"):
+            self.executor.run(["git", "-C", self.store_root, "push", "--quiet"])
+
+        return count
+
+    def _save_restore_file(self) -> None:
+        """
+        Atomically writes the original settings to the restore file
+        """
+        os.makedirs(os.path.dirname(self.restore_file_path), mode=0o700, exist_ok=True)
+
+        data = {"store_root": self.store_root, "pid": os.getpid(), "settings": self._settings}
+        write_file_atomically(self.restore_file_path, lambda restore_file: json.dump(data, restore_file))
+
+    @staticmethod
+    def _read_restore_file(restore_file_path: str) -> dict or None:
+        """
+        :param restore_file_path: path of the file the original settings have been saved to
+        :return: the content of the restore file, None if it does not exist or is invalid
+        """
+        try:
+            with open(restore_file_path, 'r') as restore_file:
+                data = json.load(restore_file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("pid"), int) or "settings" not in data:
+            return None
+        return data
+
+    def _set_config(self, key: str, value: str) -> None:
+        """
+        :param key: name of the gopass setting
+        :param value: the new value
+        """
+        self.executor.run(self.gopass_args("config", key, value), capture_output=True)
+
+    def _git_output(self, *args: str) -> str or None:
+        """
+        :param args: the git subcommand and its arguments
+        :return: the output of the git call, None if it failed
+        """
+        try:
+            return self.executor.run(["git", "-C", self.store_root] + list(args), capture_output=True).strip()
+        except (CommandError, OSError):
+            return None
@@ -0,0 +1,129 @@
+"""
+Module for the checkpoint journal used to resume interrupted imports
+"""
+
+import hashlib
+import os
+
+from gopass_chrome_importer import get_cache_dir
+
+
+def file_digest(file_path: str) -> str:
+    """
+    :param file_path: path of the file
+    :return: the sha256 hex digest of the content of the file
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImportCheckpoint:
+    """
+    Append-only journal of the row numbers of all entries that have been processed completely.
+
+    Every row number is appended using a single write, so an interrupted import
+    leaves at most one incomplete line behind, which is ignored when loading the journal.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Constructor
+        :param file_path: path of the journal file
+        """
+        self.file_path = file_path
+        self._rows = set()
+        self._file_descriptor = None
+
+    @staticmethod
+    def get_file_path(csv_digest: str, base_path: str) -> str:
+        """
+        :param csv_digest: digest of the imported csv file
+        :param base_path: the base path the entries are imported to
+        :return: path of the journal file for the given csv file and base path
+        """
+        key = hashlib.sha256(("%s\0%s" % (csv_digest, base_path)).encode()).hexdigest()
+        return os.path.join(get_cache_dir(), "checkpoints", "%s.log" % key)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def load(self) -> int:
+        """
+        Loads the rows completed by a previous run, if any
+
+        :return: the number of completed rows
+        """
+        try:
+            with open(self.file_path, 'r') as journal_file:
+                lines = journal_file.read().split("\n")
+        except OSError:
+            return 0
+
+        # the last line is either empty or incomplete
+        for line in lines[:-1]:
+            if line.isdigit():
+                self._rows.add(int(line))
+        return len(self._rows)
+
+    def open(self, resume: bool = False) -> None:
+        """
+        Opens the journal file for appending
+
+        :param resume: when set to false the rows of a previous run are discarded
+        """
+        os.makedirs(os.path.dirname(self.file_path), mode=0o700, exist_ok=True)
+
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        if resume:
+            self._remove_incomplete_line()
+        else:
+            flags |= os.O_TRUNC
+            self._rows = set()
+        self._file_descriptor = os.open(self.file_path, flags, 0o600)
+
+    def _remove_incomplete_line(self) -> None:
+        """
+        Removes an incomplete last line left behind by an interrupted run
+        """
+        try:
+            with open(self.file_path, 'r+b') as journal_file:
+                content = journal_file.read()
+                journal_file.truncate(content.rfind(b"\n") + 1)
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        """
+        Closes the journal file
+        """
+        if self._file_descriptor is not None:
+            os.close(self._file_descriptor)
+            self._file_descriptor = None
+
+    def remove(self) -> None:
+        """
+        Closes and deletes the journal file, f.ex. after the import has finished successfully
+        """
+        self.close()
+        if os.path.isfile(self.file_path):
+            os.remove(self.file_path)
+
+    def contains(self, row: int) -> bool:
+        """
+        :param row: row number of an entry
+        :return: true, if the entry has been processed completely by a previous run
+        """
+        return row in self._rows
+
+    def add(self, row: int) -> None:
+        """
+        Records an entry that has been processed completely, if the journal file is open
+
+        :param row: row number of the entry
+        """
+        if self._file_descriptor is None:
+            return
+        os.write(self._file_descriptor, ("%s\n" % row).encode())
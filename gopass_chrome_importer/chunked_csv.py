@@ -0,0 +1,166 @@
+"""
+Parses large chrome password exports in chunks using a pool of processes
+
+The file is memory-mapped and split at record boundaries: a newline ends a record only if the number of
+quotes before it is even, so quoted values containing newlines are never split. Every process parses
+its chunks and creates the secret paths of the entries, the results are merged in the order of the file.
+
+This module is only imported when it is used.
+"""
+
+import codecs
+import csv
+import io
+import itertools
+import locale
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from gopass_chrome_importer.const import KEY_NAME, KEY_URL, KEY_USERNAME, KEY_PASSWORD
+from gopass_chrome_importer.entry import SecretEntry
+from gopass_chrome_importer.secret_path import create_secret_path
+
+# chunks are not made smaller than this, the overhead of a chunk outweighs parsing small ones
+MIN_CHUNK_SIZE = 256 * 1024
+# number of chunks per process, so processes that are done early get more work
+CHUNKS_PER_JOB = 4
+# number of chunks per process that are parsed ahead of the entries that are yielded
+MAX_CHUNKS_AHEAD_PER_JOB = 2
+
+# encodings in which a quote or newline byte is never part of another character
+SUPPORTED_ENCODINGS = ["utf-8", "ascii"]
+
+
+def get_encoding() -> str:
+    """
+    :return: the encoding used to read csv files, the same as the one of "open"
+    """
+    encoding = codecs.lookup(locale.getpreferredencoding(False)).name
+    if encoding not in SUPPORTED_ENCODINGS:
+        raise ValueError("Parsing in parallel is not supported for the encoding: %s" % encoding)
+    return encoding
+
+
+def find_record_boundaries(data, start: int, end: int, chunk_size: int) -> [(int, int)]:
+    """
+    Splits a part of a csv file into chunks of complete records
+
+    :param data: content of the csv file (bytes or a memory map)
+    :param start: position of the first record
+    :param end: end of the part to split
+    :param chunk_size: minimum size of a chunk (except the last one)
+    :return: start and end of each chunk
+    """
+    chunks = []
+    chunk_start = start
+    while chunk_start < end:
+        position = chunk_start + chunk_size
+        if position >= end:
+            break
+
+        # the quote parity at the target position, relative to the start of the chunk
+        in_quotes = data[chunk_start:position].count(b'"') % 2 == 1
+        while True:
+            newline = data.find(b"\n", position, end)
+            if newline == -1:
+                position = end
+                break
+            if data[position:newline].count(b'"') % 2 == 1:
+                in_quotes = not in_quotes
+            position = newline + 1
+            if not in_quotes:
+                break
+
+        chunks.append((chunk_start, position))
+        chunk_start = position
+
+    if chunk_start < end:
+        chunks.append((chunk_start, end))
+    return chunks
+
+
+def _parse_records(text: str) -> [[str]]:
+    """
+    :param text: complete records of a csv file
+    :return: the parsed rows
+    """
+    # translates line endings like reading the file in text mode
+    return list(csv.reader(io.StringIO(text, newline=None), delimiter=','))
+
+
+def _parse_chunk(path: str, start: int, end: int, encoding: str, columns: dict,
+                 base_path: str or None) -> [(str, str, str, str, str or None)]:
+    """
+    Parses a chunk of a csv file, executed by the processes of the pool
+
+    :param path: the path of the csv file
+    :param start: start of the chunk
+    :param end: end of the chunk
+    :param encoding: the encoding of the file
+    :param columns: column index for each entry key
+    :param base_path: base path of the secret paths to create, None to create none
+    :return: name, url, username, password and secret path of each row
+    """
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        text = data[start:end].decode(encoding)
+
+    rows = []
+    for row in _parse_records(text):
+        name, url, username, password = (row[columns[KEY_NAME]], row[columns[KEY_URL]],
+                                          row[columns[KEY_USERNAME]], row[columns[KEY_PASSWORD]])
+        secret_path = create_secret_path(base_path, name, url, username) if base_path is not None else None
+        rows.append((name, url, username, password, secret_path))
+    return rows
+
+
+def iter_csv_chunked(path: str, jobs: int, find_columns: callable, base_path: str or None = None,
+                     chunk_size: int or None = None) -> iter:
+    """
+    Parses a chrome password export in parallel, yielding the same entries as parsing it serially
+
+    :param path: the path of the (uncompressed) csv file
+    :param jobs: number of processes
+    :param find_columns: function returning the column index for each entry key of the header
+    :param base_path: when set the secret paths of the entries are created as well
+    :param chunk_size: minimum size of a chunk, depends on the size of the file by default
+    :return: generator of the parsed entries
+    """
+    encoding = get_encoding()
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # the first record is the header
+        header_end = find_record_boundaries(data, 0, size, 1)[0][1]
+        header = _parse_records(data[0:header_end].decode(encoding))
+        if not header:
+            return
+        columns = find_columns(header[0])
+
+        chunk_size = chunk_size or max((size - header_end) // (jobs * CHUNKS_PER_JOB), MIN_CHUNK_SIZE)
+        chunks = find_record_boundaries(data, header_end, size, chunk_size)
+
+    if len(chunks) <= 1 or jobs <= 1:
+        # not worth starting any processes
+        results = (_parse_chunk(path, start, end, encoding, columns, base_path) for start, end in chunks)
+        for rows in results:
+            for row in rows:
+                yield SecretEntry(*row)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # only a few chunks are parsed ahead, so the parsed rows of a large file are never all kept in memory
+        pending_chunks = iter(chunks)
+        futures = deque()
+        for start, end in itertools.islice(pending_chunks, jobs * MAX_CHUNKS_AHEAD_PER_JOB):
+            futures.append(executor.submit(_parse_chunk, path, start, end, encoding, columns, base_path))
+
+        while futures:
+            rows = futures.popleft().result()
+            for start, end in itertools.islice(pending_chunks, 1):
+                futures.append(executor.submit(_parse_chunk, path, start, end, encoding, columns, base_path))
+            for row in rows:
+                yield SecretEntry(*row)
@@ -13,3 +13,10 @@ USERNAME_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_STORE_USER'
 PASSWORD_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_STORE_PASS'
 EDITOR_ENV_VARIABLE_NAME = 'EDITOR'
 IPV4_REGEX = r"(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)"
+EDITOR_SOCKET_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_EDITOR_SOCKET'
+EDITOR_TOKEN_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_EDITOR_TOKEN'
+STORE_RESULT_FILE_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_STORE_RESULT_FILE'
+PROFILE_FILE_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_PROFILE_FILE_PATH'
+PROFILE_ROW_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_PROFILE_ROW'
+PROFILE_START_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_PROFILE_START'
+SUMMARY_SECTION_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_SUMMARY_SECTION'
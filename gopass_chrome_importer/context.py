@@ -0,0 +1,65 @@
+"""
+Module for the context an import runs in
+"""
+
+from gopass_chrome_importer.executor import CommandExecutor
+from gopass_chrome_importer.summary_manager import SummaryManager
+
+
+class ImportContext:
+    """
+    Runs the gopass calls of an import and collects its messages
+
+    The command line interface uses a single context that prints every message. Every Importer
+    uses its own context that prints nothing by default, so multiple importers can run at the same time.
+    Call close (or use the context as a context manager) when the summary is not needed anymore.
+    """
+
+    def __init__(self, summary_manager: SummaryManager or None = None, executor: CommandExecutor or None = None,
+                 printer: callable = None):
+        """
+        Constructor
+
+        :param summary_manager: the summary messages are added to, a new one with its own journal file by default
+        :param executor: the executor running all gopass calls, a new one by default
+        :param printer: function called with the text, the color and whether it is an error
+                        for every message, None to print nothing
+        """
+        self.summary_manager = summary_manager or SummaryManager()
+        self.executor = executor or CommandExecutor()
+        self.printer = printer
+
+    def echo(self, text: str, info: bool = False, warn: bool = False, err: bool = False) -> None:
+        """
+        Reports a message, warnings and errors are added to the summary as well
+
+        :param text: the text of the message
+        :param info: set to true, when this is a info message
+        :param warn: set to true, when this is a warning message
+        :param err: set to true, when this is an error message
+        """
+        if info:
+            color = 'green'
+        elif warn:
+            color = 'yellow'
+            self.summary_manager.add_warning(text)
+        elif err:
+            color = 'red'
+            self.summary_manager.add_error(text)
+        else:
+            color = 'white'
+
+        if self.printer is not None:
+            self.printer(text, color, err)
+
+    def close(self) -> None:
+        """
+        Removes the journal file of the summary, the messages of the import are lost afterwards
+        """
+        self.summary_manager.remove()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
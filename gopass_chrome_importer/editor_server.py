@@ -0,0 +1,150 @@
+"""
+Module for the persistent editor server
+
+Instead of launching a new instance of this tool for every secret gopass wants to have "edited",
+a tiny shim script is used as the editor that forwards the path of the temporarily decrypted file
+to the already running import process over a local unix socket.
+"""
+
+import os
+import shlex
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import uuid
+
+from gopass_chrome_importer.const import EDITOR_SOCKET_ENV_VARIABLE_NAME, EDITOR_TOKEN_ENV_VARIABLE_NAME
+
+SHIM_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "editor_shim.py")
+
+
+class _EditorRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles a single request of the editor shim
+    """
+
+    def handle(self):
+        token = self.rfile.readline().decode().rstrip("\n")
+        file_path = self.rfile.readline().decode().rstrip("\n")
+
+        exit_code = self.server.editor_server.process(token, file_path)
+        self.wfile.write(("%s\n" % exit_code).encode())
+
+
+class EditorServer:
+    """
+    Unix socket server used to process the files that are passed to the editor shim by gopass
+    """
+
+    def __init__(self, handler: callable):
+        """
+        Constructor
+
+        :param handler: function that is called with the file path and the registered entry
+                        for every request of the editor shim, its return value is kept as the result of the entry
+        """
+        self._handler = handler
+        self._entries = {}
+        self._results = {}
+        self._lock = threading.Lock()
+        self._tmp_dir = None
+        self._server = None
+        self._thread = None
+
+    def start(self) -> None:
+        """
+        Creates the socket and starts listening for requests in a background thread
+        """
+        # mkdtemp creates the directory with 0700 permissions so no other user can talk to the socket
+        tmp_root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        self._tmp_dir = tempfile.mkdtemp(prefix="gopass-chrome-importer-", dir=tmp_root)
+
+        self._server = socketserver.ThreadingUnixStreamServer(self.get_socket_path(), _EditorRequestHandler)
+        self._server.daemon_threads = True
+        self._server.editor_server = self
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the server and removes the socket
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+    def get_socket_path(self) -> str:
+        """
+        :return: the path of the unix socket of this server
+        """
+        return os.path.join(self._tmp_dir, "editor.sock")
+
+    def get_editor_command(self) -> str:
+        """
+        :return: the command to use as the $EDITOR for gopass
+        """
+        # "-S" skips the site module, the shim only needs the standard library
+        return "%s -S %s" % (shlex.quote(sys.executable), shlex.quote(SHIM_FILE_PATH))
+
+    def get_environment(self, token: str) -> dict:
+        """
+        :param token: the token of a registered entry
+        :return: environment variables the editor shim needs to process the given entry
+        """
+        return {
+            EDITOR_SOCKET_ENV_VARIABLE_NAME: self.get_socket_path(),
+            EDITOR_TOKEN_ENV_VARIABLE_NAME: token
+        }
+
+    def register(self, entry: any) -> str:
+        """
+        Registers an entry that is about to be processed by gopass
+
+        :param entry: the entry to pass to the handler
+        :return: token that identifies the entry
+        """
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._entries[token] = entry
+        return token
+
+    def unregister(self, token: str) -> any:
+        """
+        Removes a registered entry
+
+        :param token: the token of the entry
+        :return: the value returned by the handler for this entry or None if it has not been processed
+        """
+        with self._lock:
+            self._entries.pop(token, None)
+            return self._results.pop(token, None)
+
+    def process(self, token: str, file_path: str) -> int:
+        """
+        Processes a request of the editor shim
+
+        :param token: the token of the entry
+        :param file_path: the path of the file passed to the editor shim
+        :return: the exit code for the editor shim
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+        if entry is None:
+            return 1
+
+        try:
+            result = self._handler(file_path, entry)
+        except Exception as ex:
+            sys.stderr.write("Error processing %s: %s\n" % (file_path, ex))
+            return 1
+
+        with self._lock:
+            self._results[token] = result
+        return 0
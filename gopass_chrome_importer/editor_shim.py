@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Minimal "editor" that is used by gopass when importing with the editor server.
+
+It forwards the path of the file to edit to the running import process and exits with its result.
+This script is executed as a standalone file (not as part of the package) and intentionally
+only uses the standard library to keep its startup time as low as possible.
+"""
+
+import os
+import socket
+import sys
+
+# keep in sync with gopass_chrome_importer.const
+EDITOR_SOCKET_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_EDITOR_SOCKET'
+EDITOR_TOKEN_ENV_VARIABLE_NAME = 'GOPASS_CHROME_IMPORTER_EDITOR_TOKEN'
+
+
+def main(args: [str]) -> int:
+    """
+    Sends the file path to the editor server and waits for the result
+
+    :param args: command line arguments, the last one is the file to edit
+    :return: exit code
+    """
+    socket_path = os.environ[EDITOR_SOCKET_ENV_VARIABLE_NAME]
+    token = os.environ[EDITOR_TOKEN_ENV_VARIABLE_NAME]
+    file_path = os.path.abspath(args[-1])
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(("%s\n%s\n" % (token, file_path)).encode())
+
+        response = b""
+        while not response.endswith(b"\n"):
+            data = sock.recv(64)
+            if not data:
+                break
+            response += data
+
+    try:
+        return int(response.strip())
+    except ValueError:
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
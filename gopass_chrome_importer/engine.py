@@ -0,0 +1,563 @@
+"""
+Module for the import engine, which decides which entries are written and writes them in parallel
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from gopass_chrome_importer.backends import StoreBackend, read_secret
+from gopass_chrome_importer.checkpoint import ImportCheckpoint
+from gopass_chrome_importer.context import ImportContext
+from gopass_chrome_importer.entry import SecretEntry
+from gopass_chrome_importer.filters import EntryFilter
+from gopass_chrome_importer.manifest import ImportManifest
+from gopass_chrome_importer.mounts import MountMap, ROOT_MOUNT
+from gopass_chrome_importer.plan import ImportPlan, PLAN_WRITE_ACTIONS
+from gopass_chrome_importer.profiler import PROFILER, STAGE_PARSE, STAGE_PLAN, STAGE_MANIFEST, STAGE_CHECK, STAGE_STORE
+from gopass_chrome_importer.secret_path import format_site, get_secret_path
+from gopass_chrome_importer.store_hook import StoreResult, create_secret_content
+from gopass_chrome_importer.store_index import StoreIndex, content_digest
+from gopass_chrome_importer.summary_manager import SummaryManager
+from gopass_chrome_importer.verify import ImportVerification, VERIFY_CATEGORIES, VERIFY_MISMATCH, VERIFY_UNREADABLE
+
+DUPLICATE_POLICY_FIRST = "first"
+DUPLICATE_POLICY_LAST = "last"
+DUPLICATE_POLICY_SUFFIX = "suffix"
+DUPLICATE_POLICIES = [DUPLICATE_POLICY_FIRST, DUPLICATE_POLICY_LAST, DUPLICATE_POLICY_SUFFIX]
+
+ENGINE_THREADS = "threads"
+ENGINE_ASYNCIO = "asyncio"
+ENGINES = [ENGINE_THREADS, ENGINE_ASYNCIO]
+
+# maximum number of entries waiting to be written for each mount
+SHARD_QUEUE_SIZE = 64
+
+# results of secrets that have been written by an import and are read back by "--verify"
+VERIFY_RESULTS = [StoreResult.IMPORTED, StoreResult.OVERWRITTEN]
+# default number of secrets read back in parallel, gopass is mostly busy decrypting
+VERIFY_JOBS = os.cpu_count() or 1
+
+
+def is_entry_selected(entry: SecretEntry, entry_filter: EntryFilter or None) -> bool:
+    """
+    :param entry: a csv entry
+    :param entry_filter: the filter of the command, if any
+    :return: true, if the entry passes the filter
+    """
+    if entry_filter is None:
+        return True
+    # the same site as in the secret path, formatted sites are cached
+    return entry_filter.accepts(format_site(entry.name or entry.url), entry.username)
+
+
+def add_filter_summary(entry_filter: EntryFilter or None, summary_manager: SummaryManager) -> None:
+    """
+    Adds the number of entries matched by each filter to the summary
+
+    :param entry_filter: the filter of the command, if any
+    :param summary_manager: the summary the counts are added to
+    """
+    if entry_filter is None:
+        return
+    for label, value, count in entry_filter.get_counts():
+        summary_manager.add_info("%s \"%s\": %s entries" % (label, value, count))
+    if entry_filter.not_included_count > 0:
+        summary_manager.add_info("Not matched by any include filter: %s entries" % entry_filter.not_included_count)
+
+
+def import_entries(entries: iter, store_backend: StoreBackend, base_path: str, context: ImportContext,
+                   jobs: int = 1, store_index: StoreIndex or None = None, compare_content: bool = False,
+                   manifest: ImportManifest or None = None, duplicate_policy: str or None = None,
+                   checkpoint: ImportCheckpoint or None = None, engine: str = ENGINE_THREADS,
+                   mount_map: MountMap or None = None, plan: ImportPlan or None = None,
+                   verification: ImportVerification or None = None,
+                   entry_filter: EntryFilter or None = None, on_result: callable = None, awaitable: bool = False):
+    """
+    Stores all given entries using the given backend
+
+    Entries are processed while they are read, so writing can start before the whole csv file is parsed
+    (except for the "last" duplicate policy).
+
+    :param entries: the parsed csv entries
+    :param store_backend: the backend used to store the secrets
+    :param base_path: The base path to insert secrets into within gopass
+    :param context: runs the gopass calls and collects the messages, the backend has to be opened with it
+    :param jobs: number of secrets to write in parallel
+    :param store_index: index of the existing secrets used to skip entries before calling gopass, if any
+    :param compare_content: If set to True the content of existing secrets is compared using the store index
+    :param manifest: manifest of previously imported entries used to skip unchanged entries, if any
+    :param duplicate_policy: policy for entries with the same secret path (see DUPLICATE_POLICIES),
+                             if None every entry is passed to the store backend
+    :param checkpoint: journal of processed entries used to skip entries of a previous run and to record new ones
+    :param engine: how entries are written in parallel, see ENGINES
+    :param mount_map: when set entries of different gopass mounts are written in parallel,
+                      while those of the same mount are written one after another
+    :param plan: when set only the entries planned to be written are stored, using their planned secret path
+    :param verification: when set the content of every written secret is added to it
+    :param entry_filter: when set only the entries passing the filter are stored
+    :param on_result: function called with the row number, secret path, outcome, whether gopass has been called
+                      and the duration in seconds of every entry passed to the store backend
+    :param awaitable: If set to True (only supported by the "asyncio" engine) the pipeline is returned as a coroutine
+                      to be awaited by a running event loop, instead of running it in a new one
+    :return: the coroutine of the pipeline, if it has to be awaited
+    """
+    if awaitable and engine != ENGINE_ASYNCIO:
+        raise ValueError("Only the \"%s\" engine can be awaited" % ENGINE_ASYNCIO)
+
+    resolver = DuplicateResolver(duplicate_policy, context) if duplicate_policy is not None else None
+    skipped_counts = {"resumed": 0, "unchanged": 0}
+    # row number -> start of the check of an entry
+    started = {}
+
+    def parsed_entries():
+        # rows are counted without the header
+        row = 0
+        entry_iterator = iter(entries)
+        while True:
+            start = time.perf_counter()
+            entry = next(entry_iterator, None)
+            if entry is None:
+                return
+            row += 1
+            PROFILER.record(STAGE_PARSE, time.perf_counter() - start, row=row)
+            yield row, entry
+
+    def is_pending(row: int, secret_path: str, entry: SecretEntry) -> bool:
+        # duplicates are resolved first, so resolving them again in a resumed run has the same result
+        if checkpoint is not None and checkpoint.contains(row):
+            skipped_counts["resumed"] += 1
+            return False
+
+        if manifest is not None:
+            start = time.perf_counter()
+            unchanged = manifest.contains(secret_path, create_secret_content(entry.password, entry.username))
+            PROFILER.record(STAGE_MANIFEST, time.perf_counter() - start, row=row, secret_path=secret_path)
+            if unchanged:
+                skipped_counts["unchanged"] += 1
+                return False
+
+        return True
+
+    def select_pending(located: list) -> list:
+        pending = []
+        for row, secret_path, entry in located:
+            if is_pending(row, secret_path, entry):
+                pending.append((row, secret_path, entry))
+            else:
+                entry.wipe()
+        return pending
+
+    def plan_entry(row: int, entry: SecretEntry) -> list:
+        if plan is not None:
+            planned = plan.get_entry(row)
+            if planned is None or planned[1] not in PLAN_WRITE_ACTIONS:
+                entry.wipe()
+                return []
+            return select_pending([(row, planned[0], entry)])
+
+        start = time.perf_counter()
+        if not is_entry_selected(entry, entry_filter):
+            # filtered entries never reach gopass
+            entry.wipe()
+            return []
+        secret_path = get_secret_path(base_path, entry)
+        PROFILER.record(STAGE_PLAN, time.perf_counter() - start, row=row, secret_path=secret_path)
+
+        located = [(row, secret_path, entry)] if resolver is None else resolver.add(row, secret_path, entry)
+        return select_pending(located)
+
+    def finish_planning() -> list:
+        remaining = [] if resolver is None else select_pending(resolver.finish())
+        add_filter_summary(entry_filter, context.summary_manager)
+
+        if skipped_counts["resumed"] > 0:
+            context.summary_manager.add_info("Processed by a previous run: %s entries" % skipped_counts["resumed"])
+        if skipped_counts["unchanged"] > 0:
+            context.echo("Skipped %s entries that have not changed since the last import" % skipped_counts["unchanged"],
+                         info=True)
+            context.summary_manager.add_info("Unchanged since last import: %s entries" % skipped_counts["unchanged"])
+
+        return remaining
+
+    def planned_entries():
+        for row, entry in parsed_entries():
+            yield from plan_entry(row, entry)
+        yield from finish_planning()
+
+    def check_entry(row: int, secret_path: str, entry: SecretEntry) -> StoreResult or None:
+        if on_result is not None:
+            started[row] = time.perf_counter()
+        with PROFILER.measure(STAGE_CHECK):
+            if store_index is None or not store_index.contains(secret_path):
+                return None
+
+            if compare_content and store_index.get_digest(secret_path) is None:
+                store_index.load_digests([secret_path],
+                                         lambda path: read_secret(context.executor, path, yes=store_backend.yes))
+            secret_content = create_secret_content(entry.password, entry.username)
+            return _check_existing_entry(secret_path, secret_content, store_index, context,
+                                         force=store_backend.force)
+
+    def finish_entry(row: int, secret_path: str, entry: SecretEntry, result: StoreResult, stored: bool) -> None:
+        secret_content = create_secret_content(entry.password, entry.username)
+
+        if stored and store_index is not None and result is not StoreResult.SKIPPED:
+            store_index.add(secret_path, content_digest(secret_content) if result.is_in_store() else None)
+
+        if manifest is not None and result.is_in_store():
+            manifest.add(secret_path, secret_content)
+
+        if verification is not None and stored and result in VERIFY_RESULTS:
+            verification.add(secret_path, secret_content)
+
+        if checkpoint is not None:
+            checkpoint.add(row)
+
+        # the password is not needed anymore
+        entry.wipe()
+
+        if on_result is not None:
+            on_result(row, secret_path, result, stored, time.perf_counter() - started.pop(row))
+
+    def store_entry(row: int, secret_path: str, entry: SecretEntry):
+        with PROFILER.entry(row, secret_path):
+            try:
+                result = check_entry(row, secret_path, entry)
+                stored = result is None
+                if stored:
+                    with PROFILER.measure(STAGE_STORE):
+                        result = store_backend.store(secret_path, entry.username, entry.password)
+                finish_entry(row, secret_path, entry, result, stored)
+            finally:
+                entry.wipe()
+
+    if engine == ENGINE_ASYNCIO:
+        # only imported when used, as it requires a newer python version
+        from gopass_chrome_importer.async_engine import import_pipeline, run_pipeline
+        pipeline_args = (parsed_entries(), plan_entry, finish_planning, check_entry, finish_entry,
+                         store_backend, context.executor)
+        if awaitable:
+            return import_pipeline(*pipeline_args, jobs=jobs, blocking_check=compare_content)
+        run_pipeline(*pipeline_args, jobs=jobs, blocking_check=compare_content)
+        return
+
+    if mount_map is not None:
+        _run_sharded(planned_entries(), store_entry, mount_map, context.summary_manager, jobs=jobs)
+        return
+
+    if jobs <= 1:
+        for row, secret_path, entry in planned_entries():
+            store_entry(row, secret_path, entry)
+        return
+
+    _run_parallel(planned_entries(), store_entry, jobs=jobs)
+
+
+class DuplicateResolver:
+    """
+    Makes sure every secret path is written only once, before any entry is passed to gopass
+
+    Entries with the same secret path and identical content are merged into the first one,
+    entries with different content are resolved using the given policy.
+    The "last" policy has to read all entries before the first one can be written. The "suffix" policy
+    numbers the conflicting entries after all entries have been read, so their numbered paths never
+    take the path of an entry of a later row.
+    """
+
+    def __init__(self, policy: str, context: ImportContext):
+        """
+        Constructor
+        :param policy: one of DUPLICATE_POLICIES
+        :param context: the context the conflicts are reported to
+        """
+        self.policy = policy
+        self.context = context
+        # secret path -> (row number, content digest) of the entry that is written to it
+        self._planned = {}
+        # secret path -> (row number, entry), only used for the "last" policy
+        self._latest = OrderedDict()
+        # row number, secret path, content digest and entry of the conflicting entries,
+        # only used for the "suffix" policy
+        self._conflicts = []
+        self._duplicate_count = 0
+        self._conflict_count = 0
+
+    def add(self, row: int, secret_path: str, entry: SecretEntry) -> list:
+        """
+        Adds the next entry
+
+        :param row: row number of the entry
+        :param secret_path: the path of the secret within gopass
+        :param entry: the entry
+        :return: tuples of row number, secret path and entry that can be written now
+        """
+        digest = content_digest(create_secret_content(entry.password, entry.username))
+
+        if secret_path in self._planned:
+            planned_row, planned_digest = self._planned[secret_path]
+            if planned_digest == digest:
+                self._duplicate_count += 1
+                entry.wipe()
+                return []
+
+            if self.policy == DUPLICATE_POLICY_SUFFIX:
+                # numbered once the paths of all rows are known
+                self._conflicts.append((row, secret_path, digest, entry))
+                return []
+
+            self._conflict_count += 1
+            if self.policy == DUPLICATE_POLICY_FIRST:
+                self.context.echo("Conflicting entry in row %s ignored, row %s is imported instead: %s" % (
+                    row, planned_row, secret_path), warn=True)
+                entry.wipe()
+                return []
+            self.context.echo("Conflicting entry in row %s replaced by row %s: %s" % (
+                planned_row, row, secret_path), warn=True)
+
+        self._planned[secret_path] = (row, digest)
+        if self.policy == DUPLICATE_POLICY_LAST:
+            # the first occurrence determines the position of a secret path
+            if secret_path in self._latest:
+                # replaced by this entry
+                self._latest[secret_path][1].wipe()
+            self._latest[secret_path] = (row, entry)
+            return []
+        return [(row, secret_path, entry)]
+
+    def finish(self) -> list:
+        """
+        Called after the last entry has been added
+
+        :return: tuples of row number, secret path and entry that have not been returned yet
+        """
+        remaining = []
+        for row, secret_path, digest, entry in self._conflicts:
+            suffixed_path = _find_free_suffix_path(secret_path, digest, self._planned)
+            if suffixed_path is None:
+                self._duplicate_count += 1
+                entry.wipe()
+                continue
+            self._conflict_count += 1
+            self.context.echo("Conflicting entry in row %s is imported as: %s" % (row, suffixed_path), info=True)
+            self._planned[suffixed_path] = (row, digest)
+            remaining.append((row, suffixed_path, entry))
+        self._conflicts = []
+
+        if self._duplicate_count > 0:
+            self.context.summary_manager.add_info("Duplicate entries merged: %s" % self._duplicate_count)
+        if self._conflict_count > 0:
+            self.context.summary_manager.add_info("Conflicting entries resolved using the \"%s\" policy: %s" % (
+                self.policy, self._conflict_count))
+
+        remaining.extend((row, secret_path, entry) for secret_path, (row, entry) in self._latest.items())
+        self._latest = OrderedDict()
+        return remaining
+
+
+def _find_free_suffix_path(secret_path: str, digest: str, planned: dict) -> str or None:
+    """
+    Finds the first numbered variant of a secret path that is not used by another entry
+
+    :param secret_path: the conflicting secret path
+    :param digest: content digest of the entry
+    :param planned: secret paths that are already used, with the row number and content digest of their entry
+    :return: the numbered secret path, or None if an entry with identical content already uses one of them
+    """
+    number = 2
+    while True:
+        suffixed_path = "%s-%s" % (secret_path, number)
+        if suffixed_path not in planned:
+            return suffixed_path
+        if planned[suffixed_path][1] == digest:
+            return None
+        number += 1
+
+
+def _run_parallel(planned_entries: iter, store_entry: callable, jobs: int) -> None:
+    """
+    Stores entries using a bounded pool of worker threads
+
+    Writes to the same secret path are chained, so they never happen at the same time
+    and keep the order of the csv file.
+
+    :param planned_entries: tuples of row number, secret path and entry
+    :param store_entry: function that stores a single entry
+    :param jobs: number of secrets to write in parallel
+    """
+    # limit the number of entries that are waiting for a worker,
+    # so parsing does not run ahead of writing
+    slots = threading.BoundedSemaphore(jobs * 2)
+    lock = threading.Lock()
+    last_writes = {}
+    errors = []
+
+    # the futures of the writes resolve with true if the entry has been written
+    def run(previous, row: int, secret_path: str, entry: SecretEntry) -> bool:
+        if previous is not None:
+            wait([previous])
+            if previous.exception() is not None or not previous.result():
+                # an earlier write to the same secret failed, the import is aborted anyway
+                entry.wipe()
+                return False
+        store_entry(row, secret_path, entry)
+        return True
+
+    def on_done(secret_path: str, future):
+        slots.release()
+        with lock:
+            if future.exception() is not None:
+                errors.append(future.exception())
+            if last_writes.get(secret_path) is future:
+                del last_writes[secret_path]
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for row, secret_path, entry in planned_entries:
+            slots.acquire()
+            with lock:
+                if errors:
+                    slots.release()
+                    entry.wipe()
+                    break
+                future = executor.submit(run, last_writes.get(secret_path), row, secret_path, entry)
+                last_writes[secret_path] = future
+            future.add_done_callback(lambda done, path=secret_path: on_done(path, done))
+
+    if errors:
+        # raise the exception of the first failed write
+        raise errors[0]
+
+
+def _run_sharded(planned_entries: iter, store_entry: callable, mount_map: MountMap, summary_manager: SummaryManager,
+                 jobs: int) -> None:
+    """
+    Stores entries using a worker thread for each gopass mount
+
+    Entries of the same mount are written one after another in the order of the csv file,
+    as they share a git repository. Each mount gets its own section in the summary.
+
+    :param planned_entries: tuples of row number, secret path and entry
+    :param store_entry: function that stores a single entry
+    :param mount_map: used to find the mount of each secret path
+    :param summary_manager: the summary the sections of the mounts are added to
+    :param jobs: number of mounts that are written to in parallel
+    """
+    slots = threading.BoundedSemaphore(jobs)
+    queues = {}
+    workers = []
+    errors = []
+
+    def work(mount: str, entry_queue: queue.Queue):
+        section = _get_mount_section(mount)
+        with summary_manager.section(section):
+            count = 0
+            busy_time = 0.0
+            start = time.perf_counter()
+            while True:
+                item = entry_queue.get()
+                if item is None:
+                    break
+                if errors:
+                    # the import is aborted, only wait for the end of the queue
+                    item[2].wipe()
+                    continue
+
+                with slots:
+                    entry_start = time.perf_counter()
+                    try:
+                        store_entry(*item)
+                    except BaseException as ex:
+                        errors.append(ex)
+                    busy_time += time.perf_counter() - entry_start
+                count += 1
+
+            summary_manager.add_info("Processed %s entries in %.2fs (%.2fs writing)" % (
+                count, time.perf_counter() - start, busy_time))
+
+    try:
+        for row, secret_path, entry in planned_entries:
+            if errors:
+                entry.wipe()
+                break
+
+            mount = mount_map.get_mount(secret_path)
+            if mount not in queues:
+                queues[mount] = queue.Queue(maxsize=SHARD_QUEUE_SIZE)
+                worker = threading.Thread(target=work, args=(mount, queues[mount]), daemon=True)
+                worker.start()
+                workers.append(worker)
+            # blocks while the queue of the mount is full, so parsing does not run ahead of writing
+            queues[mount].put((row, secret_path, entry))
+    finally:
+        for entry_queue in queues.values():
+            entry_queue.put(None)
+        for worker in workers:
+            worker.join()
+
+    if errors:
+        # raise the exception of the first failed write
+        raise errors[0]
+
+
+def _get_mount_section(mount: str) -> str:
+    """
+    :param mount: name of a gopass mount
+    :return: the title of the summary section of the mount
+    """
+    if mount == ROOT_MOUNT:
+        return "Root store"
+    return "Mount: %s" % mount
+
+
+def _check_existing_entry(secret_path: str, secret_content: str, store_index: StoreIndex, context: ImportContext,
+                          force: bool = False) -> StoreResult or None:
+    """
+    Checks if an entry of an existing secret has to be passed to the store backend at all
+
+    :param secret_path: the path of the secret within gopass
+    :param secret_content: the content of the entry
+    :param store_index: index of the existing secrets
+    :param context: the context the skipped secrets are reported to
+    :param force: If set to True existing secrets will be overwritten by imported data
+    :return: the outcome, if the entry can be skipped, None otherwise
+    """
+    existing_digest = store_index.get_digest(secret_path)
+    if existing_digest and existing_digest == content_digest(secret_content):
+        context.echo("Non-empty secret with identical content ignored: %s" % secret_path, info=True)
+        return StoreResult.IDENTICAL
+
+    if not force:
+        if existing_digest:
+            context.echo("Non-empty file with unequal content will NOT be overwritten: %s" % secret_path, warn=True)
+        else:
+            context.echo("Existing secret will NOT be overwritten: %s" % secret_path, warn=True)
+        return StoreResult.SKIPPED
+
+    return None
+
+
+def verify_secrets(verification: ImportVerification, context: ImportContext, yes: bool = False,
+                   jobs: int = 1) -> dict:
+    """
+    Reads back the secrets of the given verification and reports the ones that do not match as errors
+
+    :param verification: the expected content of the secrets
+    :param context: runs the gopass calls and collects the messages
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :param jobs: number of secrets to read in parallel
+    :return: the sorted secret paths of each of the VERIFY_CATEGORIES
+    """
+    context.echo("Verifying %s secrets..." % len(verification), info=True)
+    result = verification.verify(lambda secret_path: read_secret(context.executor, secret_path, yes=yes), jobs=jobs)
+
+    for secret_path in result[VERIFY_MISMATCH]:
+        context.echo("Secret does not match the imported entry: %s" % secret_path, err=True)
+    for secret_path in result[VERIFY_UNREADABLE]:
+        context.echo("Secret could not be read: %s" % secret_path, err=True)
+
+    context.summary_manager.add_info("Verified: %s" % ", ".join(
+        "%s %s" % (len(result[category]), category) for category in VERIFY_CATEGORIES))
+    return result
@@ -0,0 +1,68 @@
+"""
+Module for the in-memory representation of the entries of a chrome password export
+"""
+
+from gopass_chrome_importer.const import KEY_NAME, KEY_URL, KEY_USERNAME, KEY_PASSWORD
+
+
+class SecretEntry:
+    """
+    A single row of a chrome password export
+
+    The password is kept in a mutable buffer, so it can be overwritten as soon as the entry
+    has been stored (or skipped). Note that python may still keep copies of the password,
+    f.ex. the strings read by the csv parser, until they are garbage collected.
+    """
+
+    __slots__ = ("name", "url", "username", "_password", "secret_path")
+
+    def __init__(self, name: str, url: str, username: str, password: str, secret_path: str or None = None):
+        """
+        Constructor
+        :param name: the name of the entry
+        :param url: the url of the entry
+        :param username: the username, if any
+        :param password: the password
+        :param secret_path: the secret path, if it has already been created while parsing
+        """
+        self.name = name
+        self.url = url
+        self.username = username
+        self._password = bytearray(password.encode())
+        self.secret_path = secret_path
+
+    @property
+    def password(self) -> str:
+        """
+        :return: the password, an empty string if the entry has been wiped
+        """
+        return self._password.decode()
+
+    def wipe(self) -> None:
+        """
+        Overwrites the password buffer with zeros
+        """
+        self._password[:] = bytes(len(self._password))
+        self._password = bytearray()
+
+    def to_dict(self) -> dict:
+        """
+        :return: the values of the entry by their KEY_* constant
+        """
+        return {
+            KEY_NAME: self.name,
+            KEY_URL: self.url,
+            KEY_USERNAME: self.username,
+            KEY_PASSWORD: self.password
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SecretEntry):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        # never print the password
+        return "SecretEntry(name=%r, url=%r, username=%r)" % (self.name, self.url, self.username)
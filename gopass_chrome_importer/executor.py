@@ -0,0 +1,175 @@
+"""
+Module for executing external commands
+"""
+
+import subprocess
+import sys
+import threading
+import time
+
+from gopass_chrome_importer.profiler import PROFILER
+
+
+class CommandError(ValueError):
+    """
+    Raised when a command exits with a non-zero exit code
+    """
+
+    def __init__(self, args: [str], exit_code: int, stderr: str = ""):
+        """
+        Constructor
+
+        :param args: the executed command and its arguments
+        :param exit_code: the exit code of the command
+        :param stderr: the captured error output of the command
+        """
+        message = "Command '%s' failed with exit code %s" % (" ".join(args), exit_code)
+        if stderr:
+            message += ": %s" % stderr.strip()
+        super().__init__(message)
+        self.command = args
+        self.exit_code = exit_code
+        self.stderr = stderr
+
+
+class CommandStatistics:
+    """
+    Latency statistics of all calls of a command
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.failed = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def average(self) -> float:
+        """
+        :return: the average duration of a call in seconds
+        """
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, duration: float, failed: bool = False) -> None:
+        """
+        Adds a single call
+        :param duration: duration of the call in seconds
+        :param failed: true, if the call failed
+        """
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        if failed:
+            self.failed += 1
+
+
+class CommandExecutor:
+    """
+    Runs commands without a shell and records the latency of each call
+    """
+
+    def __init__(self, run_as: str or None = None):
+        """
+        Constructor
+        :param run_as: name of the user to run all commands as (using sudo), if any
+        """
+        self.run_as = run_as
+        self._statistics = {}
+        self._lock = threading.Lock()
+
+    def run(self, args: [str], input_data: str or None = None, capture_output: bool = False,
+            env: dict or None = None, interactive: bool = False) -> str or None:
+        """
+        Runs a command
+
+        :param args: the command and its arguments
+        :param input_data: data to write to the stdin of the command, if any
+        :param capture_output: when set to true the stdout of the command is returned
+        :param env: environment of the command, defaults to the environment of this process
+        :param interactive: when set to true the command uses the stdin and stderr of this process,
+                            f.ex. to be able to ask questions
+        :return: the stdout of the command, if captured
+        """
+        args = self.get_command_args(args)
+
+        start = time.perf_counter()
+        process = subprocess.Popen(args,
+                                   stdin=subprocess.PIPE if input_data is not None else None,
+                                   stdout=subprocess.PIPE if capture_output else None,
+                                   stderr=None if interactive else subprocess.PIPE,
+                                   env=env)
+        output, error_output = process.communicate(input=input_data.encode() if input_data is not None else None)
+        duration = time.perf_counter() - start
+
+        return self.process_result(args, duration, process.returncode, output, error_output, capture_output)
+
+    def get_command_args(self, args: [str]) -> [str]:
+        """
+        :param args: the command and its arguments
+        :return: the arguments that are actually executed
+        """
+        if self.run_as is not None:
+            return ["sudo", "-u", self.run_as] + list(args)
+        return args
+
+    def process_result(self, args: [str], duration: float, exit_code: int, output: bytes or None,
+                       error_output: bytes or None, capture_output: bool = False) -> str or None:
+        """
+        Records a finished call and checks its result
+
+        :param args: the executed arguments (see get_command_args)
+        :param duration: duration of the call in seconds
+        :param exit_code: the exit code of the command
+        :param output: the stdout of the command, if captured
+        :param error_output: the stderr of the command, if captured
+        :param capture_output: when set to true the stdout of the command is returned
+        :return: the stdout of the command, if captured
+        """
+        error_output = error_output.decode(errors="replace") if error_output else ""
+        self._record(args, duration, failed=exit_code != 0)
+
+        if exit_code != 0:
+            raise CommandError(args, exit_code, error_output)
+
+        if error_output:
+            # don't swallow warnings of successful calls
+            sys.stderr.write(error_output)
+
+        if capture_output:
+            return output.decode()
+        return None
+
+    def get_statistics(self) -> dict:
+        """
+        :return: latency statistics for each command, f.ex. "gopass edit"
+        """
+        with self._lock:
+            return dict(self._statistics)
+
+    def _record(self, args: [str], duration: float, failed: bool) -> None:
+        """
+        Records the duration of a call
+
+        :param args: the command and its arguments
+        :param duration: duration of the call in seconds
+        :param failed: true, if the call failed
+        """
+        name = self._command_name(args)
+        with self._lock:
+            self._statistics.setdefault(name, CommandStatistics()).add(duration, failed=failed)
+        PROFILER.record(name, duration)
+
+    def _command_name(self, args: [str]) -> str:
+        """
+        :param args: the command and its arguments
+        :return: the name of the command including its subcommand (if any), f.ex. "gopass edit"
+        """
+        if self.run_as is not None:
+            args = args[3:]
+
+        parts = [args[0]]
+        for arg in args[1:]:
+            if not arg.startswith("-"):
+                parts.append(arg)
+                break
+        return " ".join(parts)
@@ -0,0 +1,141 @@
+"""
+Module for the --include and --exclude filters selecting the entries of an export that are imported
+"""
+
+import fnmatch
+import re
+
+FIELD_HOST = "host"
+FIELD_CATEGORY = "category"
+FIELD_USERNAME = "username"
+FILTER_FIELDS = [FIELD_HOST, FIELD_CATEGORY, FIELD_USERNAME]
+
+# patterns starting with this prefix are regular expressions, all other ones are globs
+REGEX_PREFIX = "re:"
+
+FILTER_INCLUDED = "Included by"
+FILTER_EXCLUDED = "Excluded by"
+
+
+def _translate(pattern: str) -> str:
+    """
+    :param pattern: the pattern of a filter (without the field)
+    :return: a regular expression matching the value of a field from the start
+    """
+    if pattern.startswith(REGEX_PREFIX):
+        expression = pattern[len(REGEX_PREFIX):]
+        try:
+            re.compile(expression)
+        except re.error as e:
+            raise ValueError("Invalid regular expression \"%s\": %s" % (expression, e))
+        # regular expressions may match anywhere, like "grep"
+        return ".*?(?:%s)" % expression
+
+    expression = fnmatch.translate(pattern)
+    # older python versions append the flags instead of using a scoped group
+    if expression.endswith("(?ms)"):
+        expression = expression[:-len("(?ms)")]
+    return "(?:%s)" % expression
+
+
+def _compile(filters: [str]) -> [(str, object)]:
+    """
+    Combines the patterns of all filters of a field into a single regular expression
+
+    The pattern of each filter is a named group ("f" and the index of the filter),
+    so the filter that matched can be looked up by the name of the last matched group.
+
+    :param filters: filters like "host:*.example.com"
+    :return: the field and compiled regular expression of every field with at least one filter
+    """
+    alternatives = {}
+    for index, value in enumerate(filters):
+        field, separator, pattern = value.partition(":")
+        if not separator or field not in FILTER_FIELDS:
+            raise ValueError("Invalid filter \"%s\", expected one of %s followed by \":\" and a pattern" % (
+                value, ", ".join(FILTER_FIELDS)))
+        alternatives.setdefault(field, []).append("(?P<f%s>%s)" % (index, _translate(pattern)))
+
+    return [(field, re.compile("|".join(alternatives[field]), re.DOTALL))
+            for field in FILTER_FIELDS if field in alternatives]
+
+
+class EntryFilter:
+    """
+    Decides whether an entry is imported, based on the category ("website", "ip" or "android"),
+    the host (the rest of the site) and the username of the entry.
+
+    An entry is imported if it matches any of the include filters (if there are some)
+    and none of the exclude filters. The number of entries matched by each filter is counted.
+    """
+
+    def __init__(self, includes: [str] = (), excludes: [str] = ()):
+        """
+        Constructor
+        :param includes: filters like "host:*.example.com" or "category:re:^(ip|android)$"
+        :param excludes: filters in the same format
+        """
+        self.includes = list(includes)
+        self.excludes = list(excludes)
+        self._include_patterns = _compile(self.includes)
+        self._exclude_patterns = _compile(self.excludes)
+        self._include_counts = [0] * len(self.includes)
+        self._exclude_counts = [0] * len(self.excludes)
+        self._not_included_count = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.includes or self.excludes)
+
+    def accepts(self, site: str, username: str, count: bool = True) -> bool:
+        """
+        :param site: the formatted site of an entry, f.ex. "website/example.com"
+        :param username: the username of the entry, if any
+        :param count: If set to False the counts of the filters are not changed
+        :return: true, if the entry is imported
+        """
+        category, _, host = site.partition("/")
+        values = {FIELD_HOST: host, FIELD_CATEGORY: category, FIELD_USERNAME: username or ""}
+
+        if self._include_patterns:
+            index = _find_match(self._include_patterns, values)
+            if index is None:
+                if count:
+                    self._not_included_count += 1
+                return False
+            if count:
+                self._include_counts[index] += 1
+
+        index = _find_match(self._exclude_patterns, values)
+        if index is not None:
+            if count:
+                self._exclude_counts[index] += 1
+            return False
+        return True
+
+    def get_counts(self) -> [(str, str, int)]:
+        """
+        :return: FILTER_INCLUDED or FILTER_EXCLUDED, the filter and the number of entries it matched
+        """
+        counts = [(FILTER_INCLUDED, value, count) for value, count in zip(self.includes, self._include_counts)]
+        counts += [(FILTER_EXCLUDED, value, count) for value, count in zip(self.excludes, self._exclude_counts)]
+        return counts
+
+    @property
+    def not_included_count(self) -> int:
+        """
+        :return: number of entries that did not match any include filter
+        """
+        return self._not_included_count
+
+
+def _find_match(patterns: [(str, object)], values: dict) -> int or None:
+    """
+    :param patterns: the field and compiled pattern of each field with filters
+    :param values: the value of each field
+    :return: index of the first filter matching one of the values or None
+    """
+    for field, pattern in patterns:
+        match = pattern.match(values[field])
+        if match:
+            return int(match.lastgroup[1:])
+    return None
@@ -3,160 +3,237 @@
 gopass-chrome-importer
 """
 
-import os
-import subprocess
-from enum import Enum
+import sys
+import threading
+import time
+from contextlib import contextmanager
 
 import click
 
-from gopass_chrome_importer import coerce
-from gopass_chrome_importer.const import KEY_USERNAME, KEY_PASSWORD, KEY_URL, KEY_NAME, IPV4_REGEX, \
-    EDITOR_ENV_VARIABLE_NAME, SUMMARY_TMP_FILE_ENV_VARIABLE_NAME, SECRET_PATH_ENV_VARIABLE_NAME, \
-    USERNAME_ENV_VARIABLE_NAME, PASSWORD_ENV_VARIABLE_NAME
-from gopass_chrome_importer.summary_manager import SummaryManager
-
-
-class UrlType(Enum):
+from gopass_chrome_importer import store_hook
+from gopass_chrome_importer.backends import StoreBackend, EditStoreBackend, STORE_BACKENDS, get_store_root, \
+    create_manifest, scan_store, read_secret, get_profile_journal_path
+from gopass_chrome_importer.checkpoint import ImportCheckpoint, file_digest
+from gopass_chrome_importer.const import KEY_USERNAME, KEY_PASSWORD, KEY_URL, KEY_NAME
+from gopass_chrome_importer.context import ImportContext
+from gopass_chrome_importer.engine import DuplicateResolver, DUPLICATE_POLICIES, DUPLICATE_POLICY_FIRST, \
+    DUPLICATE_POLICY_LAST, ENGINES, ENGINE_THREADS, VERIFY_JOBS, is_entry_selected, add_filter_summary, \
+    verify_secrets
+from gopass_chrome_importer.entry import SecretEntry
+from gopass_chrome_importer.executor import CommandExecutor, CommandError
+from gopass_chrome_importer.filters import EntryFilter
+from gopass_chrome_importer.importer import Importer
+from gopass_chrome_importer.manifest import ImportManifest
+from gopass_chrome_importer.plan import ImportPlan, PLAN_ACTIONS, PLAN_WRITE_ACTIONS, PLAN_ACTION_CREATE, \
+    PLAN_ACTION_SKIP_IDENTICAL, PLAN_ACTION_CONFLICT, PLAN_ACTION_OVERWRITE
+from gopass_chrome_importer.profiler import PROFILER, STAGE_PLAN
+from gopass_chrome_importer.secret_path import get_secret_path
+from gopass_chrome_importer.store_hook import create_secret_content
+from gopass_chrome_importer.store_index import StoreIndex, content_digest, normalize_secret_path
+from gopass_chrome_importer.summary_manager import SummaryManager, SUMMARY_FORMAT_TEXT, SUMMARY_FORMATS
+from gopass_chrome_importer.verify import ImportVerification
+
+
+def _read_csv(path: str) -> [SecretEntry]:
     """
-    URL types that may occur
-    """
-    ANDROID = "android"
-    IP = "ip"
-    DOMAIN = "domain"
-
-
-def _run_shell_command(cmd: str, run_as: str = None) -> None:
-    """Run a shell command"""
-    if run_as is not None:
-        cmd = "sudo -u %s %s" % (run_as, cmd)
+    Parses a chrome password export csv file to a list
 
-    result = subprocess.call(cmd, shell=True)
-    if result != 0:
-        raise ValueError("An error occurred")
+    :param path: the path of the csv file
+    :return: file parsed to a list
+    """
+    return list(_iter_csv(path))
 
 
-def _read_csv(path: str) -> [dict]:
+def _iter_csv(path: str) -> iter:
     """
-    Parses a chrome password export csv file to a list
+    Lazily parses a chrome password export csv file
 
-    :param path: the path of the csv file
-    :return: file parsed to a list
+    :param path: the path of the csv file, "-" to read from stdin.
+                 Files ending with ".gz" or ".zst" are decompressed on the fly.
+    :return: generator of the parsed entries
     """
     import csv
 
-    result = []
-
-    with open(path) as file:
+    with _open_csv(path) as file:
         reader = csv.reader(file, delimiter=',')
 
-        # this is the header of the csv file and can be ignored
-        next(reader)
+        # the header of the csv file is used to find the columns
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = _find_csv_columns(header)
 
         for row in reader:
-            result.append({
-                KEY_NAME: row[0],
-                KEY_URL: row[1],
-                KEY_USERNAME: row[2],
-                KEY_PASSWORD: row[3]
-            })
+            yield SecretEntry(row[columns[KEY_NAME]], row[columns[KEY_URL]], row[columns[KEY_USERNAME]],
+                              row[columns[KEY_PASSWORD]])
 
-    return result
 
-
-def _find_type(url: str) -> UrlType:
+def _iter_entries(path: str, parse_jobs: int = 1, base_path: str or None = None) -> iter:
     """
-    Checks the type of url, f.ex. a normal website, an IP Address or an android app specific url
+    Lazily parses a chrome password export, using multiple processes if requested
 
-    :param url: the url to analyze
-    :return: the type of the url to insert
+    :param path: the path of the csv file, see _iter_csv
+    :param parse_jobs: number of processes parsing the file, only supported for uncompressed files
+    :param base_path: when set and parsing in parallel, the secret paths are created by the processes as well
+    :return: generator of the parsed entries
     """
+    _check_parse_jobs(path, parse_jobs)
+    if parse_jobs <= 1:
+        return _iter_csv(path)
 
-    import re
-
-    if url.startswith("android://"):
-        return UrlType.ANDROID
-    if re.search(IPV4_REGEX, url):
-        return UrlType.IP
+    # only imported when used
+    from gopass_chrome_importer.chunked_csv import iter_csv_chunked
+    return iter_csv_chunked(path, parse_jobs, _find_csv_columns, base_path=base_path)
 
-    return UrlType.DOMAIN
 
-
-def _format_site(url: str) -> str:
+def _check_parse_jobs(path: str, parse_jobs: int) -> None:
     """
-    Formats the given URL for the use as a secret file name
+    Checks if a chrome password export can be parsed using the given number of processes
 
-    :param url: The URL to format
-    :return: the formatted name
+    :param path: the path of the csv file, see _iter_csv
+    :param parse_jobs: number of processes parsing the file
     """
+    if parse_jobs > 1 and (path == "-" or path.endswith(".gz") or path.endswith(".zst")):
+        raise ValueError("Parsing in parallel requires an uncompressed csv file")
 
-    url_type = _find_type(url)
 
-    result = url
-    if url_type is UrlType.IP or url_type is UrlType.DOMAIN:
+def _find_csv_columns(header: [str]) -> dict:
+    """
+    Finds the columns of all required values in the header of a chrome password export
 
-        default_port = None
-        if result.startswith('https://'):
-            default_port = 443
-        if result.startswith('http://'):
-            default_port = 80
+    :param header: the first row of the csv file
+    :return: column index for each entry key
+    """
+    names = [column.strip().lower() for column in header]
 
-        result = result.replace('https://', '')
-        result = result.replace('http://', '')
-        result = result.replace('www.', '')
+    columns = {}
+    for key in [KEY_NAME, KEY_URL, KEY_USERNAME, KEY_PASSWORD]:
+        if key not in names:
+            raise ValueError("Missing column in csv header: %s" % key)
+        columns[key] = names.index(key)
 
-        # if the port is the default port for the
-        # given protocol we just omit it
-        if default_port:
-            result = result.replace(':{}'.format(default_port), '')
+    return columns
 
-        if '/' in result:
-            # remove any sub path
-            result = result[0:result.index('/')]
 
-        if url_type is UrlType.IP:
-            result = "ip/" + result
-        else:
-            result = "website/" + result
+@contextmanager
+def _open_csv(path: str):
+    """
+    Opens a chrome password export for reading text
 
-    if url_type is UrlType.ANDROID:
-        import re
-        # strip away everything except app package name
-        matches = re.search(r"(?:==@)([\w\d.]*)", result)
-        if not matches:
-            echo("No match found: %s" % url, err=True)
-            exit(1)
+    :param path: the path of the csv file, "-" to read from stdin
+    :return: the opened file
+    """
+    if path == "-":
+        # stdin is not ours to close
+        yield sys.stdin
+        return
 
-        result = "android/" + matches.group(1)
+    if path.endswith(".gz"):
+        import gzip
+        file = gzip.open(path, 'rt')
+    elif path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Reading .zst files requires the \"zstandard\" package")
+        import io
+        file = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True))
+    else:
+        file = open(path)
 
-    return result
+    with file:
+        yield file
 
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
 CMD_STORE_INTERNAL = "store_internal"
+CMD_APPLY = "apply"
+CMD_DIFF = "diff"
+CMD_VERIFY = "verify"
 
 PARAM_PATH = "path"
 PARAM_GOPASS_PATH = "gopass-path"
 PARAM_FORCE = "force"
 PARAM_YES = "yes"
 PARAM_DRY_RUN = "dry-run"
+PARAM_EDITOR_SERVER = "editor-server"
+PARAM_BACKEND = "backend"
+PARAM_JOBS = "jobs"
+PARAM_PRESCAN = "prescan"
+PARAM_PRESCAN_CONTENT = "prescan-content"
+PARAM_INCREMENTAL = "incremental"
+PARAM_PROFILE = "profile"
+PARAM_DUPLICATES = "duplicates"
+PARAM_BATCH_COMMIT = "batch-commit"
+PARAM_PUSH = "push"
+PARAM_RESUME = "resume"
+PARAM_ENGINE = "engine"
+PARAM_SHARD_MOUNTS = "shard-mounts"
+PARAM_PLAN = "plan"
+PARAM_SUMMARY_FORMAT = "summary-format"
+PARAM_SUMMARY_INFOS = "summary-infos"
+PARAM_VERIFY = "verify"
+PARAM_INCLUDE = "include"
+PARAM_EXCLUDE = "exclude"
+PARAM_PARSE_JOBS = "parse-jobs"
 
 CMD_OPTION_NAMES = {
     PARAM_PATH: ['--path', '-p'],
     PARAM_GOPASS_PATH: ['--gopass-basepath', '-gb'],
     PARAM_FORCE: ['--force', '-f'],
     PARAM_YES: ['--yes', '-y'],
-    PARAM_DRY_RUN: ['--dry-run', '-d']
+    PARAM_DRY_RUN: ['--dry-run', '-d'],
+    PARAM_EDITOR_SERVER: ['--editor-server', '-es'],
+    PARAM_BACKEND: ['--backend', '-b'],
+    PARAM_JOBS: ['--jobs', '-j'],
+    PARAM_PRESCAN: ['--prescan', '-ps'],
+    PARAM_PRESCAN_CONTENT: ['--prescan-content', '-pc'],
+    PARAM_INCREMENTAL: ['--incremental', '-i'],
+    PARAM_PROFILE: ['--profile', '-pr'],
+    PARAM_DUPLICATES: ['--duplicates', '-dp'],
+    PARAM_BATCH_COMMIT: ['--batch-commit', '-bc'],
+    PARAM_PUSH: ['--push', '-pu'],
+    PARAM_RESUME: ['--resume', '-r'],
+    PARAM_ENGINE: ['--engine', '-e'],
+    PARAM_SHARD_MOUNTS: ['--shard-mounts', '-sm'],
+    PARAM_PLAN: ['--plan', '-pl'],
+    PARAM_SUMMARY_FORMAT: ['--summary-format', '-sf'],
+    PARAM_SUMMARY_INFOS: ['--summary-infos', '-si'],
+    PARAM_VERIFY: ['--verify', '-vf'],
+    PARAM_INCLUDE: ['--include', '-in'],
+    PARAM_EXCLUDE: ['--exclude', '-ex'],
+    PARAM_PARSE_JOBS: ['--parse-jobs', '-pj']
 }
 
 SUMMARY_MANAGER = SummaryManager()
+EXECUTOR = CommandExecutor()
+ECHO_LOCK = threading.Lock()
+
+
+def _print_message(text: str, color: str, err: bool) -> None:
+    """
+    Prints a message of the command line context
+
+    :param text: the text to print
+    :param color: the foreground color of the text
+    :param err: set to true, to print to stderr
+    """
+    with ECHO_LOCK:
+        click.echo(click.style(text, fg=color), err=err)
+
+
+CONTEXT = ImportContext(SUMMARY_MANAGER, EXECUTOR, printer=_print_message)
 
 
 @click.group(context_settings=CONTEXT_SETTINGS)
-def cli():
+@click.pass_context
+def cli(ctx: click.Context):
     """
     Main CLI entry point
     """
+    # the journal of the summary is removed after the command has printed it
+    ctx.call_on_close(CONTEXT.close)
 
 
 def get_option_names(parameter: str) -> list:
@@ -168,33 +245,60 @@ def get_option_names(parameter: str) -> list:
     return CMD_OPTION_NAMES[parameter]
 
 
-def _create_secret_path(base_path, name, url, username) -> str:
+def include_option(verb: str) -> callable:
     """
-    Generates a secret path for a csv entry
-
-    :param base_path: base path to prepend
-    :param name: name of the entry, if any
-    :param url: url of the entry
-    :param username: username of the entry
-    :return: generated secret path
+    :param verb: what happens to the selected entries, f.ex. "imported"
+    :return: the decorator adding the include filter option to a command
     """
+    return click.option(*get_option_names(PARAM_INCLUDE), required=False, multiple=True, type=str,
+                        help='Only entries matching this filter are %s, can be given multiple times. '
+                             'A filter consists of a field (host, category or username), a colon and a glob or '
+                             'a regular expression prefixed with "re:", '
+                             'f.ex. "host:*.example.com" or "category:android".' % verb)
 
-    if name:
-        site = _format_site(name)
-    else:
-        site = _format_site(url)
-
-    if username:
-        user = username
-    else:
-        user = "site_pw"
 
-    return "{}{}/{}".format(base_path, site, user)
+def exclude_option(verb: str) -> callable:
+    """
+    :param verb: what happens to the selected entries, f.ex. "imported"
+    :return: the decorator adding the exclude filter option to a command
+    """
+    return click.option(*get_option_names(PARAM_EXCLUDE), required=False, multiple=True, type=str,
+                        help='Entries matching this filter are not %s, can be given multiple times. '
+                             'Uses the same format as "--include".' % verb)
+
+
+# options shared by all commands that print a summary
+SUMMARY_FORMAT_OPTION = click.option(
+    *get_option_names(PARAM_SUMMARY_FORMAT), required=False, default=SUMMARY_FORMAT_TEXT,
+    type=click.Choice(SUMMARY_FORMATS),
+    help='How the summary is printed. "text" prints all messages grouped by type, "jsonl" prints '
+         'a json record for each message followed by the number of messages of each type and '
+         '"counts" only prints the number of messages of each type.')
+SUMMARY_INFOS_OPTION = click.option(
+    *get_option_names(PARAM_SUMMARY_INFOS), required=False, default=None, type=click.IntRange(min=0),
+    help='Maximum number of info messages (the most recent ones) printed in the summary, '
+         'warnings and errors are always printed. All info messages are printed by default.')
+
+# categories reported by the diff command
+DIFF_NEW = "new"
+DIFF_CHANGED = "changed"
+DIFF_IDENTICAL = "identical"
+DIFF_STORE_ONLY = "store-only"
+# the existing secret could not be read, so it is unknown whether it has changed
+DIFF_UNREADABLE = "unreadable"
+DIFF_CATEGORIES = [DIFF_NEW, DIFF_CHANGED, DIFF_IDENTICAL, DIFF_STORE_ONLY, DIFF_UNREADABLE]
+# prefix of the secret paths of each category in the output of the diff command
+DIFF_PREFIXES = {
+    DIFF_NEW: "+",
+    DIFF_CHANGED: "~",
+    DIFF_STORE_ONLY: "-"
+}
 
 
 @cli.command(name="import")
 @click.option(*get_option_names(PARAM_PATH), required=True, type=str,
-              help='Path to the chrome password export .csv file.')
+              help='Path to the chrome password export .csv file. '
+                   'Use "-" to read from stdin, ".gz" and ".zst" files are decompressed automatically.')
 @click.option(*get_option_names(PARAM_GOPASS_PATH), required=False, type=str, default="imported/",
               help='The path in gopass where all entries are imported to.')
 @click.option(*get_option_names(PARAM_FORCE), required=False, default=False, is_flag=True,
@@ -204,8 +308,75 @@ def _create_secret_path(base_path, name, url, username) -> str:
                    'This effectively sets the --yes flag on gopass. '
                    'Note that this will NOT overwrite any existing data (see "-f" to do that)')
 @click.option(*get_option_names(PARAM_DRY_RUN), required=False, default=False, is_flag=True,
-              help='When set no passwords will actually be written and a preview of what WOULD be done will be printed.')
-def c_import(path: str, gopass_basepath: str, force: bool, yes: bool, dry_run: bool):
+              help='When set no passwords will actually be written and a preview of what WOULD be done '
+                   'will be printed. The preview is planned using a single listing of the store, '
+                   'without calling gopass for each entry.')
+@click.option(*get_option_names(PARAM_PLAN), required=False, default=None, type=str,
+              help='When set (implies "--dry-run") the planned action of every entry is written to the given file, '
+                   'which can be executed later using the "%s" command. The file contains no passwords.' % CMD_APPLY)
+@click.option(*get_option_names(PARAM_EDITOR_SERVER), required=False, default=False, is_flag=True,
+              help='When set secrets are written by this process through a minimal editor shim, '
+                   'instead of starting a new instance of this tool for every secret. '
+                   'Only used by the "edit" backend.')
+@click.option(*get_option_names(PARAM_BACKEND), required=False, default="edit",
+              type=click.Choice(list(STORE_BACKENDS.keys())),
+              help='How secrets are written to gopass. "edit" uses "gopass edit" and checks the content '
+                   'of existing secrets, "insert" streams new secrets to "gopass insert" without decrypting anything.')
+@click.option(*get_option_names(PARAM_JOBS), required=False, default=1, type=click.IntRange(min=1),
+              help='Number of secrets that are written to gopass in parallel. '
+                   'Secrets with the same path are always written one after another.')
+@click.option(*get_option_names(PARAM_PRESCAN), required=False, default=False, is_flag=True,
+              help='When set the store is listed once before importing and entries of existing secrets '
+                   'are skipped (unless "-f" is set) without calling gopass for each of them.')
+@click.option(*get_option_names(PARAM_PRESCAN_CONTENT), required=False, default=False, is_flag=True,
+              help='When set (implies "--prescan") the content of existing secrets is read in parallel '
+                   'and entries with identical content are skipped.')
+@click.option(*get_option_names(PARAM_INCREMENTAL), required=False, default=False, is_flag=True,
+              help='When set entries that have already been imported by a previous run are skipped, '
+                   'as long as the store has not been changed since then.')
+@click.option(*get_option_names(PARAM_PROFILE), required=False, default=None, type=str,
+              help='When set the duration of each stage of the import is measured and a report is written '
+                   'to the given file (".csv" files are written as csv, all others as json). '
+                   'The report contains secret paths but no secret values.')
+@click.option(*get_option_names(PARAM_DUPLICATES), required=False, default=None,
+              type=click.Choice(DUPLICATE_POLICIES),
+              help='How entries with the same secret path but different content are handled: '
+                   '"first" imports the first entry, "last" imports the last entry of the file '
+                   'and "suffix" imports all of them, appending "-2", "-3", ... to the path of later ones. '
+                   'Defaults to "last" if "-f" is set and "first" otherwise. '
+                   'Entries with identical content are always imported only once.')
+@click.option(*get_option_names(PARAM_BATCH_COMMIT), required=False, default=False, is_flag=True,
+              help='When set automatic syncing of gopass is suspended during the import and all changes '
+                   'are combined into a single git commit at the end. '
+                   'The original gopass settings are restored even if the import fails.')
+@click.option(*get_option_names(PARAM_PUSH), required=False, default=False, is_flag=True,
+              help='When set the single commit is pushed to the remote of the store. '
+                   'Only used with "--batch-commit".')
+@click.option(*get_option_names(PARAM_RESUME), required=False, default=False, is_flag=True,
+              help='When set entries that have been processed by a previous (failed) import '
+                   'of the same file are skipped.')
+@click.option(*get_option_names(PARAM_ENGINE), required=False, default=ENGINE_THREADS, type=click.Choice(ENGINES),
+              help='How secrets are written in parallel (see "-j"). "threads" uses a pool of threads, '
+                   '"asyncio" runs all gopass calls from a single thread (requires python 3.7 or newer).')
+@click.option(*get_option_names(PARAM_PARSE_JOBS), required=False, default=1, type=click.IntRange(min=1),
+              help='Number of processes parsing the csv file and creating the secret paths. '
+                   'Only worth it for very large, uncompressed exports.')
+@click.option(*get_option_names(PARAM_SHARD_MOUNTS), required=False, default=False, is_flag=True,
+              help='When set secrets of different gopass mounts are written in parallel (up to "-j" mounts '
+                   'at the same time) while secrets of the same mount are written one after another. '
+                   'The summary is grouped by mount. Only used by the "threads" engine.')
+@click.option(*get_option_names(PARAM_VERIFY), required=False, default=False, is_flag=True,
+              help='When set every secret written by this run is read back afterwards (in parallel) and '
+                   'compared with the imported entry. Mismatches are reported in the summary.')
+@include_option("imported")
+@exclude_option("imported")
+@SUMMARY_FORMAT_OPTION
+@SUMMARY_INFOS_OPTION
+def c_import(path: str, gopass_basepath: str, force: bool, yes: bool, dry_run: bool, plan: str or None,
+             editor_server: bool, backend: str, jobs: int, prescan: bool, prescan_content: bool, incremental: bool,
+             profile: str or None, duplicates: str or None, batch_commit: bool, push: bool, resume: bool, engine: str,
+             parse_jobs: int, shard_mounts: bool, verify: bool, include: [str], exclude: [str], summary_format: str,
+             summary_infos: int or None):
     """
     Imports items from a chrome password export
 
@@ -214,105 +385,451 @@ def c_import(path: str, gopass_basepath: str, force: bool, yes: bool, dry_run: b
     :param force: If set to True existing secrets will be overwritten by imported data
     :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
     :param dry_run: If set to True no changes will be made to the gopass store
+    :param plan: path of the plan file to write, if any (implies dry_run)
+    :param editor_server: If set to True secrets are written in-process using the editor shim
+    :param backend: name of the store backend to use
+    :param jobs: number of secrets to write in parallel
+    :param prescan: If set to True existing secrets are detected using a single listing of the store
+    :param prescan_content: If set to True the content of existing secrets is compared before importing
+    :param incremental: If set to True entries that have been imported by a previous run are skipped
+    :param profile: path of the profiling report to write, if any
+    :param duplicates: policy for entries with the same secret path, see DUPLICATE_POLICIES
+    :param batch_commit: If set to True all changes are combined into a single git commit
+    :param push: If set to True the single commit is pushed afterwards
+    :param resume: If set to True entries processed by a previous run of the same file are skipped
+    :param engine: how secrets are written in parallel, see ENGINES
+    :param parse_jobs: number of processes parsing the csv file
+    :param shard_mounts: If set to True secrets are written in parallel for each gopass mount
+    :param verify: If set to True all written secrets are read back and compared afterwards
+    :param include: filters selecting the entries to import, all entries if empty
+    :param exclude: filters selecting entries that are not imported
+    :param summary_format: how the summary is printed, see SUMMARY_FORMATS
+    :param summary_infos: maximum number of info messages printed in the summary, None to print all of them
     """
 
-    # set custom "editor" that will process the password
-    editor_command = "gopass-chrome-importer %s" % CMD_STORE_INTERNAL
-    if force:
-        editor_command += " %s" % get_option_names(PARAM_FORCE)[0]
+    # fail early on invalid filters
+    entry_filter = _create_entry_filter(include, exclude)
+
+    if plan and path == "-":
+        raise ValueError("A plan can not be created when reading from stdin")
+    if resume and path == "-":
+        raise ValueError("Resuming an import is not possible when reading from stdin")
+
+    # checked before any gopass settings are changed
+    _check_parse_jobs(path, parse_jobs)
+
+    if profile:
+        PROFILER.enable()
+
+    dry_run = dry_run or bool(plan)
     if dry_run:
         echo("This is a dry run. Nothing will be changed.", warn=True)
-        editor_command += " %s" % get_option_names(PARAM_DRY_RUN)[0]
-    os.environ[EDITOR_ENV_VARIABLE_NAME] = editor_command
 
-    # set path to summary tmp file used for this run
-    os.environ[SUMMARY_TMP_FILE_ENV_VARIABLE_NAME] = SUMMARY_MANAGER.get_tmp_file_path()
+    if duplicates is None:
+        # matches what happened before duplicates were resolved up front
+        duplicates = DUPLICATE_POLICY_LAST if force else DUPLICATE_POLICY_FIRST
 
-    # maybe we could use this to be able to only update existing secrets, without creating new ones
-    # dont know if this is an actual usecase though...
-    create_new = True
+    if dry_run:
+        import_plan = _plan_import(path, gopass_basepath, force=force, yes=yes, jobs=jobs,
+                                   compare_content=prescan_content, incremental=incremental,
+                                   duplicate_policy=duplicates, entry_filter=entry_filter, parse_jobs=parse_jobs)
+        if plan:
+            import_plan.save(plan)
+            echo("Plan written to: %s" % plan, info=True)
+
+        SUMMARY_MANAGER.print_summary(output_format=summary_format, info_limit=summary_infos)
+        _write_profile_report(profile)
+        return
 
-    entries = _read_csv(path)
+    checkpoint = None
+    if path != "-":
+        checkpoint = ImportCheckpoint(ImportCheckpoint.get_file_path(file_digest(path), gopass_basepath))
 
-    for entry in entries:
-        name = entry[KEY_NAME]
-        url = entry[KEY_URL]
-        user = entry[KEY_USERNAME]
-        password = entry[KEY_PASSWORD]
+    importer = Importer(_create_store_backend(backend, force, yes, editor_server), gopass_basepath, jobs=jobs,
+                        duplicate_policy=duplicates, engine=engine, prescan=prescan, compare_content=prescan_content,
+                        incremental=incremental, checkpoint=checkpoint, resume=resume, shard_mounts=shard_mounts,
+                        entry_filter=entry_filter, batch_commit=batch_commit, push=push, verify=verify,
+                        context=CONTEXT)
+    importer.run(_iter_entries(path, parse_jobs=parse_jobs, base_path=gopass_basepath))
 
-        secret_path = _create_secret_path(gopass_basepath, name, url, user)
+    SUMMARY_MANAGER.print_summary(output_format=summary_format, info_limit=summary_infos)
+    _write_profile_report(profile)
 
-        # this command is a simple workaround to use gopass in a non-interactive way
-        # by using the edit command and a 'fake' editor that is this python script and
-        # stores the password in the temporarily decrypted file until
-        # gopass encrypts it.
 
-        # store final path to the secret in an env variable
-        os.environ[SECRET_PATH_ENV_VARIABLE_NAME] = secret_path
-        # store username
-        os.environ[USERNAME_ENV_VARIABLE_NAME] = user
-        # store password
-        os.environ[PASSWORD_ENV_VARIABLE_NAME] = password
+@cli.command(name=CMD_APPLY)
+@click.option(*get_option_names(PARAM_PLAN), required=True, type=str,
+              help='Path to the plan file created by "import --dry-run --plan".')
+@click.option(*get_option_names(PARAM_PATH), required=False, type=str, default=None,
+              help='Path to the chrome password export .csv file. '
+                   'Defaults to the file the plan has been created for, the file must not have changed since then.')
+@click.option(*get_option_names(PARAM_YES), required=False, default=False, is_flag=True,
+              help='When set no questions will be asked during execution. '
+                   'This effectively sets the --yes flag on gopass.')
+@click.option(*get_option_names(PARAM_EDITOR_SERVER), required=False, default=False, is_flag=True,
+              help='When set secrets are written by this process through a minimal editor shim, '
+                   'instead of starting a new instance of this tool for every secret. '
+                   'Only used by the "edit" backend.')
+@click.option(*get_option_names(PARAM_BACKEND), required=False, default="edit",
+              type=click.Choice(list(STORE_BACKENDS.keys())),
+              help='How secrets are written to gopass, see the "import" command.')
+@click.option(*get_option_names(PARAM_JOBS), required=False, default=1, type=click.IntRange(min=1),
+              help='Number of secrets that are written to gopass in parallel.')
+@click.option(*get_option_names(PARAM_BATCH_COMMIT), required=False, default=False, is_flag=True,
+              help='When set all changes are combined into a single git commit at the end.')
+@click.option(*get_option_names(PARAM_PUSH), required=False, default=False, is_flag=True,
+              help='When set the single commit is pushed to the remote of the store. '
+                   'Only used with "--batch-commit".')
+@click.option(*get_option_names(PARAM_VERIFY), required=False, default=False, is_flag=True,
+              help='When set every secret written by this run is read back afterwards (in parallel) and '
+                   'compared with the imported entry. Mismatches are reported in the summary.')
+@SUMMARY_FORMAT_OPTION
+@SUMMARY_INFOS_OPTION
+def c_apply(plan: str, path: str or None, yes: bool, editor_server: bool, backend: str, jobs: int,
+            batch_commit: bool, push: bool, verify: bool, summary_format: str, summary_infos: int or None):
+    """
+    Executes a plan created by a dry run of the import command
+
+    :param plan: path of the plan file
+    :param path: Path to the chrome password export .csv file, defaults to the one of the plan
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :param editor_server: If set to True secrets are written in-process using the editor shim
+    :param backend: name of the store backend to use
+    :param jobs: number of secrets to write in parallel
+    :param batch_commit: If set to True all changes are combined into a single git commit
+    :param push: If set to True the single commit is pushed afterwards
+    :param verify: If set to True all written secrets are read back and compared afterwards
+    :param summary_format: how the summary is printed, see SUMMARY_FORMATS
+    :param summary_infos: maximum number of info messages printed in the summary, None to print all of them
+    """
+    import_plan = ImportPlan.load(plan)
+    path = path or import_plan.csv_path
+    if file_digest(path) != import_plan.csv_digest:
+        raise ValueError("The csv file has been changed since the plan was created: %s" % path)
 
-        # append the actual gopass command
-        gopass_command = "gopass"
-        if yes:
-            gopass_command += " --yes"
-        gopass_command += " edit"
+    counts = import_plan.count_actions()
+    echo("Applying plan: %s" % ", ".join("%s %s" % (counts[action], action) for action in PLAN_ACTIONS), info=True)
 
-        if create_new:
-            gopass_command += " --create"
+    # secrets are still checked while writing, in case the store has been changed since planning
+    importer = Importer(_create_store_backend(backend, import_plan.force, yes, editor_server), import_plan.base_path,
+                        jobs=jobs, plan=import_plan, batch_commit=batch_commit, push=push, verify=verify,
+                        context=CONTEXT)
+    importer.run(_iter_csv(path))
 
-        gopass_command += " '%s'" % secret_path
+    SUMMARY_MANAGER.print_summary(output_format=summary_format, info_limit=summary_infos)
 
-        _run_shell_command(gopass_command)
 
-    SUMMARY_MANAGER.print_summary()
+def _create_store_backend(backend: str, force: bool, yes: bool, editor_server: bool) -> StoreBackend:
+    """
+    :param backend: name of the store backend to use
+    :param force: If set to True existing secrets will be overwritten by imported data
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :param editor_server: If set to True secrets are written in-process using the editor shim
+    :return: the store backend
+    """
+    if backend == "edit":
+        return EditStoreBackend(force=force, yes=yes, editor_server=editor_server)
+    return STORE_BACKENDS[backend](force=force, yes=yes)
 
 
-def _create_secret_content(password: str, username: str or None = None, mask_pw: bool = False) -> str:
+@cli.command(name=CMD_DIFF)
+@click.option(*get_option_names(PARAM_PATH), required=True, type=str,
+              help='Path to the chrome password export .csv file. '
+                   'Use "-" to read from stdin, ".gz" and ".zst" files are decompressed automatically.')
+@click.option(*get_option_names(PARAM_GOPASS_PATH), required=False, type=str, default="imported/",
+              help='The path in gopass the entries are compared with.')
+@click.option(*get_option_names(PARAM_YES), required=False, default=False, is_flag=True,
+              help='When set no questions will be asked during execution. '
+                   'This effectively sets the --yes flag on gopass.')
+@click.option(*get_option_names(PARAM_JOBS), required=False, default=4, type=click.IntRange(min=1),
+              help='Number of existing secrets that are read from gopass in parallel.')
+@click.option(*get_option_names(PARAM_DUPLICATES), required=False, default=DUPLICATE_POLICY_FIRST,
+              type=click.Choice(DUPLICATE_POLICIES),
+              help='How entries with the same secret path but different content are handled, '
+                   'see the "import" command.')
+@include_option("compared")
+@exclude_option("compared")
+@SUMMARY_FORMAT_OPTION
+@SUMMARY_INFOS_OPTION
+def c_diff(path: str, gopass_basepath: str, yes: bool, jobs: int, duplicates: str, include: [str], exclude: [str],
+           summary_format: str, summary_infos: int or None):
     """
-    Creates the text that is written to a secret
+    Compares a chrome password export with the secrets in gopass without changing anything
 
-    :param username: a username, if present
-    :param password: the password
-    :param mask_pw: when set to true the password will be masked
-    :return: the secret file content
+    :param path: Path to the chrome password export .csv file
+    :param gopass_basepath: The base path within gopass the entries are compared with
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :param jobs: number of existing secrets to read in parallel
+    :param duplicates: policy for entries with the same secret path, see DUPLICATE_POLICIES
+    :param include: filters selecting the entries to compare, all entries if empty
+    :param exclude: filters selecting entries that are not compared
+    :param summary_format: how the summary is printed, see SUMMARY_FORMATS
+    :param summary_infos: maximum number of info messages printed in the summary, None to print all of them
     """
-    if mask_pw:
-        content = coerce(len(password), min_value=10, max_value=20) * '*'
-    else:
-        content = password
+    entry_filter = _create_entry_filter(include, exclude)
+    store_index = scan_store(EXECUTOR, yes=yes)
+    diff = _diff_store(_iter_csv(path), gopass_basepath, store_index,
+                       lambda secret_path: read_secret(EXECUTOR, secret_path, yes=yes), jobs=jobs,
+                       duplicate_policy=duplicates, entry_filter=entry_filter)
 
-    if username:
-        content += "\n---\n"
-        content += "user: %s" % username
+    for category in [DIFF_NEW, DIFF_CHANGED, DIFF_STORE_ONLY]:
+        for secret_path in diff[category]:
+            echo("%s %s" % (DIFF_PREFIXES[category], secret_path))
+    for secret_path in diff[DIFF_UNREADABLE]:
+        echo("Secret could not be read: %s" % secret_path, err=True)
 
-    return content
+    SUMMARY_MANAGER.add_info("Compared with %s: %s" % (gopass_basepath, ", ".join(
+        "%s %s" % (len(diff[category]), category) for category in DIFF_CATEGORIES)))
+    SUMMARY_MANAGER.print_summary(output_format=summary_format, info_limit=summary_infos)
+
+
+def _diff_store(entries: iter, base_path: str, store_index: StoreIndex, read_secret: callable, jobs: int = 1,
+                duplicate_policy: str = DUPLICATE_POLICY_FIRST, entry_filter: EntryFilter or None = None) -> dict:
+    """
+    Compares the given entries with the existing secrets within the base path
+
+    :param entries: the parsed csv entries
+    :param base_path: The base path within gopass the entries are compared with
+    :param store_index: index of the existing secrets
+    :param read_secret: function that returns the content of a secret
+    :param jobs: number of existing secrets to read in parallel
+    :param duplicate_policy: policy for entries with the same secret path, see DUPLICATE_POLICIES
+    :param entry_filter: filter selecting the entries (and existing secrets) to compare, if any
+    :return: the sorted secret paths of each of the DIFF_CATEGORIES
+    """
+    located = _locate_entries(entries, base_path, duplicate_policy, entry_filter=entry_filter)
+
+    unreadable = set(normalize_secret_path(secret_path) for secret_path in store_index.load_digests(
+        [secret_path for row, secret_path, entry in located], read_secret, jobs=jobs))
+
+    diff = {category: [] for category in DIFF_CATEGORIES}
+    for row, secret_path, entry in located:
+        secret_path = normalize_secret_path(secret_path)
+        if secret_path in unreadable:
+            diff[DIFF_UNREADABLE].append(secret_path)
+        elif not store_index.contains(secret_path):
+            diff[DIFF_NEW].append(secret_path)
+        elif store_index.get_digest(secret_path) == content_digest(
+                create_secret_content(entry.password, entry.username)):
+            diff[DIFF_IDENTICAL].append(secret_path)
+        else:
+            diff[DIFF_CHANGED].append(secret_path)
+        entry.wipe()
+
+    imported_paths = set(normalize_secret_path(secret_path) for row, secret_path, entry in located)
+    diff[DIFF_STORE_ONLY] = [secret_path for secret_path in store_index.get_secret_paths(base_path)
+                             if secret_path not in imported_paths and
+                             _is_secret_path_selected(secret_path, base_path, entry_filter)]
+
+    for category in [DIFF_NEW, DIFF_CHANGED, DIFF_IDENTICAL, DIFF_UNREADABLE]:
+        diff[category].sort()
+    return diff
+
+
+@cli.command(name=CMD_VERIFY)
+@click.option(*get_option_names(PARAM_PATH), required=True, type=str,
+              help='Path to the chrome password export .csv file. '
+                   'Use "-" to read from stdin, ".gz" and ".zst" files are decompressed automatically.')
+@click.option(*get_option_names(PARAM_GOPASS_PATH), required=False, type=str, default="imported/",
+              help='The path in gopass the entries have been imported to.')
+@click.option(*get_option_names(PARAM_YES), required=False, default=False, is_flag=True,
+              help='When set no questions will be asked during execution. '
+                   'This effectively sets the --yes flag on gopass.')
+@click.option(*get_option_names(PARAM_JOBS), required=False, default=VERIFY_JOBS, type=click.IntRange(min=1),
+              help='Number of secrets that are read from gopass in parallel. Defaults to the number of cpus.')
+@click.option(*get_option_names(PARAM_DUPLICATES), required=False, default=DUPLICATE_POLICY_FIRST,
+              type=click.Choice(DUPLICATE_POLICIES),
+              help='How entries with the same secret path but different content are handled, '
+                   'use the policy of the import.')
+@include_option("verified")
+@exclude_option("verified")
+@SUMMARY_FORMAT_OPTION
+@SUMMARY_INFOS_OPTION
+def c_verify(path: str, gopass_basepath: str, yes: bool, jobs: int, duplicates: str, include: [str],
+             exclude: [str], summary_format: str, summary_infos: int or None):
+    """
+    Reads back the secrets of a previous import and compares them with a chrome password export
+
+    :param path: Path to the chrome password export .csv file
+    :param gopass_basepath: The base path within gopass the entries have been imported to
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :param jobs: number of secrets to read in parallel
+    :param duplicates: policy for entries with the same secret path, see DUPLICATE_POLICIES
+    :param include: filters selecting the entries to verify, all entries if empty
+    :param exclude: filters selecting entries that are not verified
+    :param summary_format: how the summary is printed, see SUMMARY_FORMATS
+    :param summary_infos: maximum number of info messages printed in the summary, None to print all of them
+    """
+    entry_filter = _create_entry_filter(include, exclude)
+    verification = ImportVerification()
+    for row, secret_path, entry in _locate_entries(_iter_csv(path), gopass_basepath, duplicates,
+                                                   entry_filter=entry_filter):
+        verification.add(secret_path, create_secret_content(entry.password, entry.username))
+        entry.wipe()
+
+    verify_secrets(verification, CONTEXT, yes=yes, jobs=jobs)
+    SUMMARY_MANAGER.print_summary(output_format=summary_format, info_limit=summary_infos)
+
+
+def _write_profile_report(profile: str or None) -> None:
+    """
+    Writes the profiling report, if profiling is enabled
+
+    :param profile: path of the profiling report to write, if any
+    """
+    if not profile:
+        return
+
+    PROFILER.finish()
+    PROFILER.merge_journal(get_profile_journal_path(SUMMARY_MANAGER))
+    PROFILER.write_report(profile)
+    echo("Profiling report written to: %s" % profile, info=True)
+
+
+def _plan_import(path: str, base_path: str, force: bool = False, yes: bool = False, jobs: int = 1,
+                 compare_content: bool = False, incremental: bool = False,
+                 duplicate_policy: str = DUPLICATE_POLICY_FIRST,
+                 entry_filter: EntryFilter or None = None, parse_jobs: int = 1) -> ImportPlan:
+    """
+    Plans the action of every entry without writing anything
+
+    Existing secrets are detected using a single listing of the store, gopass is only called for
+    each entry if the content of existing secrets has to be compared.
+
+    :param path: Path to the chrome password export .csv file
+    :param base_path: The base path to insert secrets into within gopass
+    :param force: If set to True existing secrets would be overwritten by imported data
+    :param yes: Automatically answer to gopass requests with "yes" if applicable (see gopass documentation)
+    :param jobs: number of existing secrets to read in parallel
+    :param compare_content: If set to True the content of existing secrets is read and compared
+    :param incremental: If set to True the manifest of a previous import is used to detect identical secrets
+    :param duplicate_policy: policy for entries with the same secret path, see DUPLICATE_POLICIES
+    :param entry_filter: filter selecting the entries to plan, if any
+    :param parse_jobs: number of processes parsing the csv file
+    :return: the plan
+    """
+    try:
+        store_index = scan_store(EXECUTOR, yes=yes)
+    except (CommandError, OSError):
+        echo("Existing secrets could not be listed, all entries are planned as new secrets.", warn=True)
+        store_index = None
+
+    manifest = None
+    if incremental and store_index is not None:
+        store_root = get_store_root(EXECUTOR, yes=yes)
+        manifest = create_manifest(EXECUTOR, store_root, base_path, yes=yes)
+        if not manifest.load():
+            manifest = None
+
+    import_plan = ImportPlan(path, file_digest(path) if path != "-" else None, base_path, force=force,
+                             store_listed=store_index is not None)
+
+    planned = _locate_entries(_iter_entries(path, parse_jobs=parse_jobs, base_path=base_path), base_path,
+                              duplicate_policy, entry_filter=entry_filter)
+
+    if compare_content and store_index is not None:
+        store_index.load_digests([secret_path for row, secret_path, entry in planned],
+                                 lambda secret_path: read_secret(EXECUTOR, secret_path, yes=yes), jobs=jobs)
+
+    for row, secret_path, entry in planned:
+        secret_content = create_secret_content(entry.password, entry.username)
+        action = _plan_action(secret_path, secret_content, store_index, manifest, force)
+        import_plan.add(row, secret_path, action)
+        entry.wipe()
+
+        if action == PLAN_ACTION_CONFLICT:
+            echo("Existing secret will NOT be overwritten: %s" % secret_path, warn=True)
+        elif action == PLAN_ACTION_OVERWRITE:
+            echo("Existing secret WILL BE overwritten: %s" % secret_path, warn=True)
+        if action in PLAN_WRITE_ACTIONS:
+            SUMMARY_MANAGER.add_info("Would import: %s" % secret_path)
+
+    counts = import_plan.count_actions()
+    SUMMARY_MANAGER.add_info("Planned actions: %s" % ", ".join(
+        "%s %s" % (counts[action], action) for action in PLAN_ACTIONS))
+    return import_plan
+
+
+def _locate_entries(entries: iter, base_path: str, duplicate_policy: str,
+                    entry_filter: EntryFilter or None = None) -> [(int, str, SecretEntry)]:
+    """
+    Finds the secret path of every entry and resolves duplicates
+
+    :param entries: the parsed csv entries
+    :param base_path: The base path to insert secrets into within gopass
+    :param duplicate_policy: policy for entries with the same secret path, see DUPLICATE_POLICIES
+    :param entry_filter: filter selecting the entries, if any
+    :return: row number, secret path and entry of every entry that would be written
+    """
+    resolver = DuplicateResolver(duplicate_policy, CONTEXT)
+    located = []
+    for row, entry in enumerate(entries, start=1):
+        start = time.perf_counter()
+        if not is_entry_selected(entry, entry_filter):
+            entry.wipe()
+            continue
+        secret_path = get_secret_path(base_path, entry)
+        located.extend(resolver.add(row, secret_path, entry))
+        PROFILER.record(STAGE_PLAN, time.perf_counter() - start, row=row, secret_path=secret_path)
+    located.extend(resolver.finish())
+    add_filter_summary(entry_filter, SUMMARY_MANAGER)
+    return located
+
+
+def _create_entry_filter(include: [str], exclude: [str]) -> EntryFilter or None:
+    """
+    :param include: filters selecting the entries, all entries if empty
+    :param exclude: filters selecting entries that are skipped
+    :return: the compiled filter or None if there are no filters
+    """
+    entry_filter = EntryFilter(include, exclude)
+    return entry_filter if entry_filter else None
+
+
+def _is_secret_path_selected(secret_path: str, base_path: str, entry_filter: EntryFilter or None) -> bool:
+    """
+    :param secret_path: path of an existing secret within the base path
+    :param base_path: the base path the entries are imported to
+    :param entry_filter: the filter of the command, if any
+    :return: true, if an entry with this secret path would pass the filter
+    """
+    if entry_filter is None:
+        return True
+    relative_path = normalize_secret_path(secret_path)[len(normalize_secret_path(base_path)):]
+    site, _, username = relative_path.strip("/").rpartition("/")
+    return entry_filter.accepts(site, username, count=False)
+
+
+def _plan_action(secret_path: str, secret_content: str, store_index: StoreIndex or None,
+                 manifest: ImportManifest or None, force: bool) -> str:
+    """
+    :param secret_path: the path of the secret within gopass
+    :param secret_content: the content of the entry
+    :param store_index: index of the existing secrets or None if they are unknown
+    :param manifest: manifest of a previous import, if any
+    :param force: If set to True existing secrets would be overwritten by imported data
+    :return: the action of the entry, see PLAN_ACTIONS
+    """
+    if store_index is None or not store_index.contains(secret_path):
+        return PLAN_ACTION_CREATE
+
+    digest = store_index.get_digest(secret_path)
+    if (digest is not None and digest == content_digest(secret_content)) or \
+            (manifest is not None and manifest.contains(secret_path, secret_content)):
+        return PLAN_ACTION_SKIP_IDENTICAL
+
+    return PLAN_ACTION_OVERWRITE if force else PLAN_ACTION_CONFLICT
 
 
 def echo(text: str, info: bool = False, warn: bool = False, err: bool = False) -> None:
     """
-    Simple wrapper for the click.echo function
+    Prints a message using the context of the command line interface
 
     :param text: the text to print
     :param info: set to true, when this is a info message
     :param warn: set to true, when this is a warning message
     :param err: set to true, when this is an error message
     """
-
-    if info:
-        foreground_color = 'green'
-    elif warn:
-        foreground_color = 'yellow'
-        SUMMARY_MANAGER.add_warning(text)
-    elif err:
-        foreground_color = 'red'
-        SUMMARY_MANAGER.add_error(text)
-    else:
-        foreground_color = 'white'
-
-    click.echo(click.style(text, fg=foreground_color), err=err)
+    CONTEXT.echo(text, info=info, warn=warn, err=err)
 
 
 @cli.command(name=CMD_STORE_INTERNAL, hidden=True)
@@ -329,47 +846,14 @@ def c_store_internal(file_path: str, force: bool, dry_run: bool):
     As it could be security critical to pass a password as a command line parameter this method uses
     an environment variable instead.
 
+    The editor command set by the import uses the store_hook module directly, as it starts faster.
+
     :param file_path:
     :param force: When set to true existing passwords will be overwritten. USE WITH CAUTION!
     :param dry_run: When set no passwords will actually be written and a preview of what WOULD be done will be printed.
     """
 
-    SUMMARY_MANAGER.set_tmp_file(os.environ[SUMMARY_TMP_FILE_ENV_VARIABLE_NAME])
-
-    final_secret_path = os.environ[SECRET_PATH_ENV_VARIABLE_NAME]
-
-    username = os.environ[USERNAME_ENV_VARIABLE_NAME]
-    password = os.environ[PASSWORD_ENV_VARIABLE_NAME]
-
-    secret_content = _create_secret_content(password, username)
-
-    # check if the file is empty
-    file_stats = os.stat(file_path)
-    if file_stats.st_size != 0:
-        # check if existing content matches the one we are about to write
-        with open(file_path, 'r') as file:
-            existing_content = file.read()
-            if existing_content == secret_content:
-                echo("Non-empty secret with identical content ignored: %s" % final_secret_path, info=True)
-                return
-
-        if not force:
-            echo("Non-empty file with unequal content will NOT be overwritten: %s" % final_secret_path, warn=True)
-            return
-
-        echo("Non-empty file with unequal content WILL BE overwritten: %s" % final_secret_path, warn=True)
-
-    if dry_run:
-        # just print what would be executed
-        secret_content = _create_secret_content(password, username, mask_pw=True)
-        echo("%s:\n%s\n" % (final_secret_path, secret_content), info=True)
-        SUMMARY_MANAGER.add_info("Would import: %s" % final_secret_path)
-        return
-
-    with open(file_path, 'w') as file:
-        file.write(secret_content)
-    SUMMARY_MANAGER.add_info("Imported %s" % final_secret_path)
-    return
+    store_hook.run(file_path, force=force, dry_run=dry_run)
 
 
 if __name__ == '__main__':
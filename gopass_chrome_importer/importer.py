@@ -0,0 +1,384 @@
+"""
+Library interface for importing entries into gopass without the command line interface
+
+Example:
+
+    from gopass_chrome_importer.backends import InsertStoreBackend
+    from gopass_chrome_importer.importer import Importer
+
+    importer = Importer(InsertStoreBackend(yes=True), base_path="imported/", jobs=4)
+    report = importer.run([{"name": "", "url": "https://example.com", "username": "joe", "password": "secret"}])
+    for row_result in report.results:
+        print(row_result.row, row_result.secret_path, row_result.result, row_result.duration)
+
+Nothing is printed by default, messages are collected in the summary manager of the context of the importer.
+This module does not depend on click, the import command is a thin wrapper around it.
+"""
+
+import threading
+import time
+
+from gopass_chrome_importer.backends import StoreBackend, get_gopass_args, get_store_root, create_manifest, \
+    get_mounts, scan_store
+from gopass_chrome_importer.batch_commit import BatchCommit
+from gopass_chrome_importer.checkpoint import ImportCheckpoint
+from gopass_chrome_importer.const import KEY_NAME, KEY_URL, KEY_USERNAME, KEY_PASSWORD
+from gopass_chrome_importer.context import ImportContext
+from gopass_chrome_importer.engine import ENGINE_ASYNCIO, ENGINE_THREADS, VERIFY_JOBS, import_entries, \
+    verify_secrets
+from gopass_chrome_importer.entry import SecretEntry
+from gopass_chrome_importer.filters import EntryFilter
+from gopass_chrome_importer.manifest import ImportManifest
+from gopass_chrome_importer.mounts import MountMap
+from gopass_chrome_importer.plan import ImportPlan
+from gopass_chrome_importer.store_hook import StoreResult
+from gopass_chrome_importer.store_index import StoreIndex
+from gopass_chrome_importer.verify import ImportVerification
+
+
+class RowResult:
+    """
+    The outcome of a single entry that has been passed to the store backend
+    """
+
+    __slots__ = ("row", "secret_path", "result", "stored", "duration")
+
+    def __init__(self, row: int, secret_path: str, result: StoreResult, stored: bool, duration: float):
+        """
+        Constructor
+        :param row: the number of the entry, starting at 1
+        :param secret_path: the path of the secret within gopass
+        :param result: the outcome
+        :param stored: false, if the entry has been skipped without calling gopass (f.ex. using the store index)
+        :param duration: time spent checking and storing the entry in seconds
+        """
+        self.row = row
+        self.secret_path = secret_path
+        self.result = result
+        self.stored = stored
+        self.duration = duration
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RowResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return "RowResult(row=%r, secret_path=%r, result=%s, stored=%r, duration=%.4f)" % (
+            self.row, self.secret_path, self.result, self.stored, self.duration)
+
+
+class ImportReport:
+    """
+    The results of an import
+    """
+
+    def __init__(self, rows: int, results: [RowResult], duration: float, verified: dict or None = None):
+        """
+        Constructor
+        :param rows: number of entries that have been read
+        :param results: the results of the entries passed to the store backend, ordered by row number.
+                        Entries that have been filtered, merged as duplicates or skipped as unchanged are missing.
+        :param duration: duration of the whole import in seconds
+        :param verified: the sorted secret paths of each of the VERIFY_CATEGORIES, if the secrets have been verified
+        """
+        self.rows = rows
+        self.results = results
+        self.duration = duration
+        self.verified = verified
+
+    def count_results(self) -> dict:
+        """
+        :return: number of entries for each outcome
+        """
+        counts = {result: 0 for result in StoreResult}
+        for row_result in self.results:
+            counts[row_result.result] += 1
+        return counts
+
+
+class Importer:
+    """
+    Imports entries into gopass using a store backend
+
+    Every call of "run" opens the backend, stores the given entries and closes it again.
+    Everything around the import (manifest, checkpoint, batch commit and verification) is handled as well,
+    so the import command only parses its options and prints the summary.
+    """
+
+    def __init__(self, store_backend: StoreBackend, base_path: str = "imported/", jobs: int = 1,
+                 duplicate_policy: str or None = None, engine: str = ENGINE_THREADS,
+                 store_index: StoreIndex or None = None, prescan: bool = False, compare_content: bool = False,
+                 incremental: bool = False, checkpoint: ImportCheckpoint or None = None, resume: bool = False,
+                 shard_mounts: bool = False, plan: ImportPlan or None = None,
+                 entry_filter: EntryFilter or None = None, batch_commit: bool = False, push: bool = False,
+                 verify: bool = False, context: ImportContext or None = None):
+        """
+        Constructor
+
+        :param store_backend: the backend used to store the secrets
+        :param base_path: The base path to insert secrets into within gopass
+        :param jobs: number of secrets to write in parallel
+        :param duplicate_policy: policy for entries with the same secret path (see DUPLICATE_POLICIES),
+                                 if None every entry is passed to the store backend
+        :param engine: how entries are written in parallel, see ENGINES
+        :param store_index: index of the existing secrets used to skip entries before calling gopass, if any
+        :param prescan: If set to True and no store index is given, the store is listed before the import
+        :param compare_content: If set to True the content of existing secrets is compared using the store index
+                                (implies prescan)
+        :param incremental: If set to True entries that have been imported by a previous run are skipped
+        :param checkpoint: journal of processed entries, it is removed when the import has been completed
+        :param resume: If set to True the entries of the checkpoint that have been processed by a previous run
+                       are skipped, otherwise they are discarded
+        :param shard_mounts: If set to True secrets are written in parallel for each gopass mount
+        :param plan: when set only the entries planned to be written are stored, using their planned secret path
+        :param entry_filter: when set only the entries passing the filter are stored
+        :param batch_commit: If set to True all changes are combined into a single git commit
+        :param push: If set to True the single commit is pushed afterwards
+        :param verify: If set to True all written secrets are read back and compared afterwards
+        :param context: runs the gopass calls and collects the messages, a new one printing nothing by default
+        """
+        if shard_mounts and engine != ENGINE_THREADS:
+            raise ValueError("Sharding by mount is only supported by the \"%s\" engine" % ENGINE_THREADS)
+
+        self.store_backend = store_backend
+        self.base_path = base_path
+        self.jobs = jobs
+        self.duplicate_policy = duplicate_policy
+        self.engine = engine
+        self.store_index = store_index
+        self.prescan = prescan
+        self.compare_content = compare_content
+        self.incremental = incremental
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.shard_mounts = shard_mounts
+        self.plan = plan
+        self.entry_filter = entry_filter
+        self.batch_commit = batch_commit
+        self.push = push
+        self.verify = verify
+        self.context = context or ImportContext()
+
+    def run(self, rows: iter) -> ImportReport:
+        """
+        Stores the given entries
+
+        :param rows: SecretEntry objects or dicts with the KEY_* constants as keys, f.ex. the rows of a csv.DictReader
+        :return: the results
+        """
+        import_run = ImportRun(self, rows)
+        import_run.begin()
+
+        completed = False
+        try:
+            self.store_backend.open(self.context)
+            try:
+                import_entries(**import_run.get_import_arguments())
+            finally:
+                self.store_backend.close()
+            completed = True
+        finally:
+            import_run.end(completed)
+
+        return import_run.finish()
+
+    def run_async(self, rows: iter):
+        """
+        Stores the given entries within a running asyncio event loop, using the "asyncio" engine
+
+        The gopass calls are awaited directly, the steps around the import (f.ex. listing the store or verifying
+        the written secrets) run in the default executor of the loop. Requires python 3.7 or newer.
+
+        :param rows: SecretEntry objects or dicts with the KEY_* constants as keys, f.ex. the rows of a csv.DictReader
+        :return: an awaitable resolving to the results
+        """
+        if self.engine != ENGINE_ASYNCIO:
+            raise ValueError("Running an import in an event loop requires the \"%s\" engine" % ENGINE_ASYNCIO)
+
+        # only imported when used, as it requires a newer python version
+        from gopass_chrome_importer.async_engine import run_import
+        return run_import(ImportRun(self, rows))
+
+    def _get_store_index(self) -> StoreIndex or None:
+        """
+        :return: the given store index, a new one if the store has to be listed, None otherwise
+        """
+        if self.store_index is not None or not (self.prescan or self.compare_content):
+            return self.store_index
+
+        store_index = scan_store(self.context.executor, yes=self.store_backend.yes)
+        if self.store_backend.store_index is None:
+            # the backend does not have to list the store again
+            self.store_backend.store_index = store_index
+        return store_index
+
+    def _load_manifest(self, store_root: str) -> ImportManifest:
+        """
+        :param store_root: root directory of the gopass store
+        :return: the manifest of the previous imports into the base path
+        """
+        manifest = create_manifest(self.context.executor, store_root, self.base_path, yes=self.store_backend.yes)
+        if not manifest.load():
+            self.context.echo("No valid manifest of a previous import found, importing all entries.")
+        return manifest
+
+    def _get_mount_map(self) -> MountMap:
+        """
+        :return: the mounts of the store
+        """
+        mounts = get_mounts(self.context.executor, yes=self.store_backend.yes)
+        self.context.echo("Found %s mounted sub-store(s): %s" % (len(mounts), ", ".join(sorted(mounts.keys())) or "-"))
+        return MountMap(mounts.keys())
+
+    def _open_checkpoint(self) -> None:
+        """
+        Opens the checkpoint, loading the entries of a previous run when resuming
+        """
+        if self.resume:
+            if self.checkpoint.load() > 0:
+                self.context.echo("Resuming a previous import, %s entries have already been processed." % len(
+                    self.checkpoint), info=True)
+            else:
+                self.context.echo("No checkpoint of a previous import found, importing all entries.")
+        self.checkpoint.open(resume=self.resume)
+
+    def _close_checkpoint(self, completed: bool) -> None:
+        """
+        Removes the checkpoint of a completed import, keeps it otherwise
+
+        :param completed: true, if all entries have been processed
+        """
+        if completed:
+            self.checkpoint.remove()
+        else:
+            self.checkpoint.close()
+            self.context.echo("The import has been interrupted, use \"--resume\" to continue where it stopped.",
+                              err=True)
+
+
+class ImportRun:
+    """
+    The state of a single run of an Importer, split into the steps around the import of the entries,
+    so the import itself can be run by a thread or by an asyncio event loop
+    """
+
+    def __init__(self, importer: Importer, rows: iter):
+        """
+        Constructor
+        :param importer: the importer of the run
+        :param rows: SecretEntry objects or dicts with the KEY_* constants as keys
+        """
+        self.importer = importer
+        self.rows = rows
+        self.results = []
+        self.row_count = 0
+        self._lock = threading.Lock()
+        self._start = None
+        self._store_index = None
+        self._manifest = None
+        self._mount_map = None
+        self._verification = None
+        self._batch = None
+
+    def begin(self) -> None:
+        """
+        Prepares the import: lists the store, loads the manifest and the checkpoint and starts the batch commit
+        """
+        importer = self.importer
+        executor = importer.context.executor
+        self._start = time.perf_counter()
+
+        def gopass_args(*args: str) -> [str]:
+            return get_gopass_args(*args, yes=importer.store_backend.yes)
+
+        self._store_index = importer._get_store_index()
+        store_root = None
+        if importer.incremental or importer.batch_commit:
+            store_root = get_store_root(executor, yes=importer.store_backend.yes)
+        self._manifest = importer._load_manifest(store_root) if importer.incremental else None
+        self._mount_map = importer._get_mount_map() if importer.shard_mounts else None
+        self._verification = ImportVerification() if importer.verify else None
+
+        if importer.batch_commit:
+            restored_settings = BatchCommit.restore_interrupted(store_root, executor, gopass_args)
+            if restored_settings:
+                importer.context.echo("Restored gopass settings changed by an interrupted import: %s" % ", ".join(
+                    restored_settings.keys()), warn=True)
+            self._batch = BatchCommit(store_root, executor, gopass_args)
+            self._batch.begin()
+
+        if importer.checkpoint is not None:
+            try:
+                importer._open_checkpoint()
+            except BaseException:
+                if self._batch is not None:
+                    self._batch.restore()
+                raise
+
+    def get_import_arguments(self) -> dict:
+        """
+        :return: the keyword arguments of import_entries
+        """
+        importer = self.importer
+
+        def entries():
+            for row in self.rows:
+                self.row_count += 1
+                yield row if isinstance(row, SecretEntry) else _create_entry(row)
+
+        def on_result(row: int, secret_path: str, result: StoreResult, stored: bool, duration: float):
+            with self._lock:
+                self.results.append(RowResult(row, secret_path, result, stored, duration))
+
+        return {
+            "entries": entries(), "store_backend": importer.store_backend, "base_path": importer.base_path,
+            "context": importer.context, "jobs": importer.jobs, "store_index": self._store_index,
+            "compare_content": importer.compare_content, "manifest": self._manifest,
+            "duplicate_policy": importer.duplicate_policy, "checkpoint": importer.checkpoint,
+            "engine": importer.engine, "mount_map": self._mount_map, "plan": importer.plan,
+            "verification": self._verification, "entry_filter": importer.entry_filter, "on_result": on_result
+        }
+
+    def end(self, completed: bool) -> None:
+        """
+        Closes the checkpoint, restores the gopass settings and saves the manifest, also if the import failed
+
+        :param completed: true, if all entries have been processed
+        """
+        if self.importer.checkpoint is not None:
+            self.importer._close_checkpoint(completed)
+        if self._batch is not None:
+            self._batch.restore()
+        if self._manifest is not None:
+            self._manifest.save()
+
+    def finish(self) -> ImportReport:
+        """
+        Commits the batch and verifies the written secrets after a completed import
+
+        :return: the results
+        """
+        importer = self.importer
+        if self._batch is not None:
+            squashed_count = self._batch.commit(push=importer.push)
+            if squashed_count > 0:
+                importer.context.summary_manager.add_info("Combined %s commits into a single one" % squashed_count)
+
+        verified = None
+        if self._verification is not None:
+            verified = verify_secrets(self._verification, importer.context, yes=importer.store_backend.yes,
+                                      jobs=max(importer.jobs, VERIFY_JOBS))
+
+        self.results.sort(key=lambda row_result: row_result.row)
+        return ImportReport(self.row_count, self.results, time.perf_counter() - self._start, verified=verified)
+
+
+def _create_entry(row: dict) -> SecretEntry:
+    """
+    :param row: the values of an entry by their KEY_* constant, the name and username are optional
+    :return: the entry
+    """
+    return SecretEntry(row.get(KEY_NAME) or "", row[KEY_URL], row.get(KEY_USERNAME) or "", row[KEY_PASSWORD])
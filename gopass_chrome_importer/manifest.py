@@ -0,0 +1,154 @@
+"""
+Module for the manifest of previously imported entries
+"""
+
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import threading
+
+from gopass_chrome_importer import get_cache_dir, write_file_atomically
+from gopass_chrome_importer.mounts import MountMap, ROOT_MOUNT
+from gopass_chrome_importer.store_index import normalize_secret_path
+
+MANIFEST_VERSION = 2
+# extensions of the encrypted files of the gpg and age backends of gopass
+SECRET_FILE_EXTENSIONS = [".gpg", ".age"]
+
+
+class ImportManifest:
+    """
+    Keeps salted hashes of the secret path and content of every entry that is known to be in the store,
+    so unchanged entries can be skipped on the next import.
+
+    Entries are keyed by the hash of their secret path, so an overwritten secret never matches
+    a previously imported content. The size and modification time of the file of every secret are kept
+    as well, so an entry is dropped as soon as its secret has been changed by anything else
+    (f.ex. by hand or a git pull), while all other entries stay valid.
+    """
+
+    def __init__(self, file_path: str, store_root: str or None = None, mounts: dict or None = None):
+        """
+        Constructor
+        :param file_path: path of the manifest file
+        :param store_root: root directory of the gopass store, None to not check the files of the secrets
+        :param mounts: directory of each mounted sub-store by its name
+        """
+        self.file_path = file_path
+        self.store_root = store_root
+        self.mounts = dict(mounts or {})
+        self._mount_map = MountMap(self.mounts.keys())
+        self._salt = os.urandom(16)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_file_path(store_root: str, base_path: str) -> str:
+        """
+        :param store_root: root directory of the gopass store
+        :param base_path: the base path the entries are imported to
+        :return: path of the manifest file for the given store and base path
+        """
+        key = hashlib.sha256(("%s\0%s" % (store_root, base_path)).encode()).hexdigest()
+        return os.path.join(get_cache_dir(), "manifests", "%s.json" % key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self) -> bool:
+        """
+        Loads the manifest file
+
+        :return: true, if the manifest was loaded, false if it was missing or invalid
+        """
+        try:
+            with open(self.file_path, 'r') as manifest_file:
+                data = json.load(manifest_file)
+        except (OSError, ValueError):
+            return False
+
+        if data.get("version") != MANIFEST_VERSION:
+            return False
+
+        self._salt = binascii.unhexlify(data["salt"])
+        self._entries = dict(data["entries"])
+        return True
+
+    def save(self) -> None:
+        """
+        Atomically writes the manifest file
+        """
+        os.makedirs(os.path.dirname(self.file_path), mode=0o700, exist_ok=True)
+
+        with self._lock:
+            data = {
+                "version": MANIFEST_VERSION,
+                "salt": binascii.hexlify(self._salt).decode(),
+                "entries": dict(self._entries)
+            }
+
+        write_file_atomically(self.file_path, lambda manifest_file: json.dump(data, manifest_file))
+
+    def contains(self, secret_path: str, secret_content: str) -> bool:
+        """
+        :param secret_path: the path of the secret within gopass
+        :param secret_content: the content of the secret
+        :return: true, if this exact entry has been imported before and its secret has not been changed since then
+        """
+        record = self._entries.get(self._hash(secret_path))
+        if record is None or record[0] != self._hash(secret_path, secret_content):
+            return False
+        file_stamp = self._get_file_stamp(secret_path)
+        return file_stamp is not None and record[1] == file_stamp
+
+    def add(self, secret_path: str, secret_content: str) -> None:
+        """
+        Records an entry that is known to be in the store
+
+        :param secret_path: the path of the secret within gopass
+        :param secret_content: the content of the secret
+        """
+        record = [self._hash(secret_path, secret_content), self._get_file_stamp(secret_path)]
+        path_hash = self._hash(secret_path)
+        with self._lock:
+            self._entries[path_hash] = record
+
+    def _hash(self, *values: str) -> str:
+        """
+        :return: salted hash of the given values
+        """
+        return hmac.new(self._salt, "\0".join(values).encode(), hashlib.sha256).hexdigest()
+
+    def get_secret_file_path(self, secret_path: str) -> str:
+        """
+        :param secret_path: the path of the secret within gopass
+        :return: path of the encrypted file of the secret (without extension), within the mount the secret
+                 is stored in
+        """
+        secret_path = normalize_secret_path(secret_path)
+        mount = self._mount_map.get_mount(secret_path)
+        if mount == ROOT_MOUNT:
+            store_directory = self.store_root
+        else:
+            store_directory = self.mounts[mount]
+            secret_path = secret_path[len(mount):].lstrip("/")
+        return os.path.join(os.path.expanduser(store_directory), *secret_path.split("/"))
+
+    def _get_file_stamp(self, secret_path: str) -> str or None:
+        """
+        :param secret_path: the path of the secret within gopass
+        :return: size and modification time of the file of the secret, None if it does not exist
+                 and an empty string if the files are not checked
+        """
+        if self.store_root is None:
+            return ""
+        file_path = self.get_secret_file_path(secret_path)
+        for extension in SECRET_FILE_EXTENSIONS:
+            try:
+                stat = os.stat(file_path + extension)
+            except OSError:
+                continue
+            return "%s:%s" % (stat.st_size, stat.st_mtime_ns)
+        return None
@@ -0,0 +1,54 @@
+"""
+Module for mapping secret paths to the gopass (sub-)store they are stored in
+"""
+
+import re
+
+from gopass_chrome_importer.store_index import normalize_secret_path
+
+# the name of the root store
+ROOT_MOUNT = ""
+
+# f.ex. "├── work (/home/user/.password-store-work)", the tree characters depend on the gopass version
+MOUNT_LINE_PATTERN = re.compile(r"^[\s│├└─|`+-]*(.+?)\s+\((.+)\)\s*$")
+
+
+def parse_mounts(output: str) -> dict:
+    """
+    Parses the output of "gopass mounts"
+
+    :param output: the output of "gopass mounts", the first line is the root store
+    :return: path of each mounted sub-store by its name
+    """
+    mounts = {}
+    lines = [line for line in output.splitlines() if line.strip()]
+    for line in lines[1:]:
+        match = MOUNT_LINE_PATTERN.match(line)
+        if match:
+            mounts[normalize_secret_path(match.group(1))] = match.group(2)
+    return mounts
+
+
+class MountMap:
+    """
+    Finds the mount a secret path belongs to
+    """
+
+    def __init__(self, mount_names: [str]):
+        """
+        Constructor
+        :param mount_names: names of all mounted sub-stores
+        """
+        # the longest (most specific) mount has to be checked first
+        self.mount_names = sorted((normalize_secret_path(name) for name in mount_names), key=len, reverse=True)
+
+    def get_mount(self, secret_path: str) -> str:
+        """
+        :param secret_path: the path of a secret within gopass
+        :return: the name of the mount the secret is stored in, ROOT_MOUNT for the root store
+        """
+        secret_path = normalize_secret_path(secret_path)
+        for name in self.mount_names:
+            if secret_path == name or secret_path.startswith(name + "/"):
+                return name
+        return ROOT_MOUNT
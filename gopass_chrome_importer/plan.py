@@ -0,0 +1,134 @@
+"""
+Module for import plans, which are created by a dry run and executed by the "apply" command
+"""
+
+import json
+import os
+
+from gopass_chrome_importer import write_file_atomically
+
+PLAN_VERSION = 1
+
+# the secret does not exist yet
+PLAN_ACTION_CREATE = "create"
+# the secret already contains the content of the entry
+PLAN_ACTION_SKIP_IDENTICAL = "skip-identical"
+# the secret exists (with different or unknown content) and will not be overwritten
+PLAN_ACTION_CONFLICT = "conflict"
+# the secret exists (with different or unknown content) and will be overwritten
+PLAN_ACTION_OVERWRITE = "overwrite"
+
+PLAN_ACTIONS = [PLAN_ACTION_CREATE, PLAN_ACTION_SKIP_IDENTICAL, PLAN_ACTION_CONFLICT, PLAN_ACTION_OVERWRITE]
+# actions that are passed to gopass when the plan is applied
+PLAN_WRITE_ACTIONS = [PLAN_ACTION_CREATE, PLAN_ACTION_OVERWRITE]
+
+
+class ImportPlan:
+    """
+    The secret path and expected action of every entry of a csv file.
+
+    Plans never contain any secret values, the entries are read from the (unchanged) csv file again
+    when the plan is applied. The file is written as json lines: a header followed by one line per entry.
+    """
+
+    def __init__(self, csv_path: str, csv_digest: str, base_path: str, force: bool = False,
+                 store_listed: bool = True):
+        """
+        Constructor
+        :param csv_path: path of the planned csv file
+        :param csv_digest: digest of the content of the csv file, see checkpoint.file_digest
+        :param base_path: the base path the entries are imported to
+        :param force: whether existing secrets are overwritten
+        :param store_listed: false, if existing secrets could not be listed while planning
+        """
+        self.csv_path = csv_path
+        self.csv_digest = csv_digest
+        self.base_path = base_path
+        self.force = force
+        self.store_listed = store_listed
+        # row number -> (secret path, action)
+        self._entries = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, row: int, secret_path: str, action: str) -> None:
+        """
+        Adds the planned action of an entry
+
+        :param row: the row number of the entry in the csv file
+        :param secret_path: the path of the secret within gopass
+        :param action: one of PLAN_ACTIONS
+        """
+        if action not in PLAN_ACTIONS:
+            raise ValueError("Unknown plan action: %s" % action)
+        self._entries[row] = (secret_path, action)
+
+    def get_entry(self, row: int) -> (str, str) or None:
+        """
+        :param row: the row number of an entry in the csv file
+        :return: secret path and action of the entry or None if it is not part of the plan (f.ex. a duplicate)
+        """
+        return self._entries.get(row)
+
+    def get_entries(self) -> [(int, str, str)]:
+        """
+        :return: row number, secret path and action of all entries in the order of the csv file
+        """
+        return [(row, secret_path, action) for row, (secret_path, action) in sorted(self._entries.items())]
+
+    def count_actions(self) -> dict:
+        """
+        :return: number of entries for each action
+        """
+        counts = {action: 0 for action in PLAN_ACTIONS}
+        for secret_path, action in self._entries.values():
+            counts[action] += 1
+        return counts
+
+    def save(self, file_path: str) -> None:
+        """
+        Atomically writes the plan file, only readable by the current user as it contains secret paths
+
+        :param file_path: path of the plan file
+        """
+        header = {
+            "version": PLAN_VERSION,
+            "csv_path": os.path.abspath(self.csv_path),
+            "csv_digest": self.csv_digest,
+            "base_path": self.base_path,
+            "force": self.force,
+            "store_listed": self.store_listed
+        }
+
+        def write(plan_file):
+            plan_file.write(json.dumps(header) + "\n")
+            for row, secret_path, action in self.get_entries():
+                plan_file.write(json.dumps({"row": row, "secret_path": secret_path, "action": action}) + "\n")
+
+        write_file_atomically(file_path, write)
+
+    @staticmethod
+    def load(file_path: str) -> 'ImportPlan':
+        """
+        Reads a plan file
+
+        :param file_path: path of the plan file
+        :return: the plan
+        """
+        with open(file_path, 'r') as plan_file:
+            try:
+                header = json.loads(plan_file.readline())
+            except ValueError:
+                raise ValueError("Not a valid plan file: %s" % file_path)
+            if not isinstance(header, dict) or header.get("version") != PLAN_VERSION:
+                raise ValueError("Unsupported plan file version: %s" % file_path)
+
+            plan = ImportPlan(header["csv_path"], header["csv_digest"], header["base_path"],
+                              force=header["force"], store_listed=header["store_listed"])
+            for line in plan_file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                plan.add(record["row"], record["secret_path"], record["action"])
+        return plan
@@ -0,0 +1,233 @@
+"""
+Module for measuring how long the different stages of an import take
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from gopass_chrome_importer import create_context_variable
+
+# stages that are measured for every entry, f.ex. "gopass edit" calls are added by the executor
+STAGE_PARSE = "parse"
+STAGE_PLAN = "plan"
+STAGE_MANIFEST = "manifest"
+STAGE_CHECK = "check"
+STAGE_STORE = "store"
+STAGE_EDITOR_STARTUP = "editor_startup"
+STAGE_STORE_INTERNAL = "store_internal"
+STAGE_SUMMARY = "summary"
+
+
+def _percentile(sorted_values: [float], percentile: float) -> float:
+    """
+    :param sorted_values: sorted list of values
+    :param percentile: the percentile to calculate (0-100)
+    :return: the value at the given percentile (nearest rank)
+    """
+    if not sorted_values:
+        return 0.0
+    index = int(round(percentile / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+class Profiler:
+    """
+    Collects the durations of the stages of an import for each entry.
+
+    Only secret paths (which end with the username of an entry) are recorded, never any passwords.
+    When a journal file is set (used by the store_internal command that runs in a separate process)
+    records are appended to that file instead, so the importing process can merge them.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._journal_path = None
+        self._lock = threading.Lock()
+        # the entry that is processed by the current thread or asyncio task
+        self._current_entry = create_context_variable("profiler_entry", default=(None, None))
+        self._durations = {}
+        self._entries = {}
+        self._start = None
+        self._end = None
+
+    def enable(self, journal_path: str or None = None) -> None:
+        """
+        Starts profiling, the records of a previous run are discarded
+
+        :param journal_path: file to append records to instead of keeping them in memory, if any
+        """
+        with self._lock:
+            self._durations = {}
+            self._entries = {}
+        self.enabled = True
+        self._journal_path = journal_path
+        self._start = time.perf_counter()
+        self._end = None
+
+    def finish(self) -> None:
+        """
+        Marks the end of the profiled run
+        """
+        self._end = time.perf_counter()
+
+    def get_current_entry(self) -> (int or None, str or None):
+        """
+        :return: row number and secret path of the entry that is processed by the current thread or asyncio task
+        """
+        return self._current_entry.get()
+
+    @contextmanager
+    def entry(self, row: int or None, secret_path: str or None = None):
+        """
+        Assigns all stages measured by the current thread or asyncio task to the given entry
+
+        :param row: the row number of the entry in the csv file
+        :param secret_path: the path of the secret within gopass
+        """
+        token = self._current_entry.set((row, secret_path))
+        try:
+            yield
+        finally:
+            self._current_entry.reset(token)
+
+    @contextmanager
+    def measure(self, stage: str):
+        """
+        Measures the duration of a stage for the current entry
+
+        :param stage: name of the stage
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, duration: float, row: int or None = None, secret_path: str or None = None) -> None:
+        """
+        Records the duration of a stage
+
+        :param stage: name of the stage
+        :param duration: duration in seconds
+        :param row: the row number of the entry, defaults to the current entry
+        :param secret_path: the path of the secret, defaults to the current entry
+        """
+        if not self.enabled:
+            return
+
+        if row is None and secret_path is None:
+            row, secret_path = self.get_current_entry()
+
+        if self._journal_path:
+            record = json.dumps({"stage": stage, "duration": duration, "row": row, "secret_path": secret_path})
+            file_descriptor = os.open(self._journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(file_descriptor, (record + "\n").encode())
+            finally:
+                os.close(file_descriptor)
+            return
+
+        with self._lock:
+            self._durations.setdefault(stage, []).append(duration)
+            if row is not None:
+                entry = self._entries.setdefault(row, {"row": row, "secret_path": secret_path, "stages": {}})
+                if secret_path:
+                    entry["secret_path"] = secret_path
+                entry["stages"][stage] = entry["stages"].get(stage, 0.0) + duration
+
+    def merge_journal(self, journal_path: str) -> None:
+        """
+        Adds all records of a journal file written by another process and removes the file
+
+        :param journal_path: path of the journal file
+        """
+        if not os.path.isfile(journal_path):
+            return
+
+        with open(journal_path, 'r') as journal_file:
+            for line in journal_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.record(record["stage"], record["duration"], row=record["row"],
+                            secret_path=record["secret_path"])
+        os.remove(journal_path)
+
+    def create_report(self, slowest_count: int = 10) -> dict:
+        """
+        :param slowest_count: number of slowest entries to include
+        :return: report with statistics for each stage and the slowest entries
+        """
+        with self._lock:
+            stages = {}
+            for stage, durations in self._durations.items():
+                durations = sorted(durations)
+                stages[stage] = {
+                    "count": len(durations),
+                    "total": sum(durations),
+                    "mean": sum(durations) / len(durations),
+                    "p50": _percentile(durations, 50),
+                    "p90": _percentile(durations, 90),
+                    "p99": _percentile(durations, 99),
+                    "max": durations[-1]
+                }
+
+            entries = []
+            for entry in self._entries.values():
+                entries.append({
+                    "row": entry["row"],
+                    "secret_path": entry["secret_path"],
+                    # stages of an entry may overlap (f.ex. a gopass call during the store stage)
+                    # so the duration of the outermost stages is used
+                    "total": sum(duration for stage, duration in entry["stages"].items()
+                                 if stage in [STAGE_PARSE, STAGE_PLAN, STAGE_CHECK, STAGE_STORE]),
+                    "stages": dict(entry["stages"])
+                })
+
+        entries.sort(key=lambda item: item["total"], reverse=True)
+
+        end = self._end if self._end is not None else time.perf_counter()
+        return {
+            "total": end - self._start if self._start is not None else 0.0,
+            "entries": len(entries),
+            "stages": stages,
+            "slowest_entries": entries[:slowest_count]
+        }
+
+    def write_report(self, file_path: str, slowest_count: int = 10) -> None:
+        """
+        Writes the report to a file, as csv if the file name ends with ".csv" and as json otherwise
+
+        :param file_path: path of the report file
+        :param slowest_count: number of slowest entries to include
+        """
+        report = self.create_report(slowest_count=slowest_count)
+
+        if not file_path.endswith(".csv"):
+            with open(file_path, 'w') as report_file:
+                json.dump(report, report_file, indent=2)
+            return
+
+        import csv
+
+        with open(file_path, 'w', newline='') as report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(["type", "name", "count", "total", "mean", "p50", "p90", "p99", "max"])
+            writer.writerow(["run", "total", report["entries"], report["total"], "", "", "", "", ""])
+            for stage, statistics in report["stages"].items():
+                writer.writerow(["stage", stage, statistics["count"], statistics["total"], statistics["mean"],
+                                 statistics["p50"], statistics["p90"], statistics["p99"], statistics["max"]])
+            for entry in report["slowest_entries"]:
+                writer.writerow(["entry", "%s: %s" % (entry["row"], entry["secret_path"]), len(entry["stages"]),
+                                 entry["total"], "", "", "", "", ""])
+
+
+PROFILER = Profiler()
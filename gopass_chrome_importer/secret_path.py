@@ -0,0 +1,126 @@
+"""
+Module for creating the secret path of an entry of a chrome password export
+"""
+
+import re
+from enum import Enum
+from functools import lru_cache
+
+from gopass_chrome_importer.const import IPV4_REGEX
+from gopass_chrome_importer.entry import SecretEntry
+
+IPV4_PATTERN = re.compile(IPV4_REGEX)
+ANDROID_PACKAGE_PATTERN = re.compile(r"(?:==@)([\w\d.]*)")
+
+# exports usually contain lots of entries for the same handful of sites
+URL_CACHE_SIZE = 4096
+
+
+class UrlType(Enum):
+    """
+    URL types that may occur
+    """
+    ANDROID = "android"
+    IP = "ip"
+    DOMAIN = "domain"
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def find_type(url: str) -> UrlType:
+    """
+    Checks the type of url, f.ex. a normal website, an IP Address or an android app specific url
+
+    :param url: the url to analyze
+    :return: the type of the url to insert
+    """
+
+    if url.startswith("android://"):
+        return UrlType.ANDROID
+    if IPV4_PATTERN.search(url):
+        return UrlType.IP
+
+    return UrlType.DOMAIN
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def format_site(url: str) -> str:
+    """
+    Formats the given URL for the use as a secret file name
+
+    :param url: The URL to format
+    :return: the formatted name
+    """
+
+    url_type = find_type(url)
+
+    result = url
+    if url_type is UrlType.IP or url_type is UrlType.DOMAIN:
+
+        default_port = None
+        if result.startswith('https://'):
+            default_port = 443
+        if result.startswith('http://'):
+            default_port = 80
+
+        result = result.replace('https://', '')
+        result = result.replace('http://', '')
+        result = result.replace('www.', '')
+
+        # if the port is the default port for the
+        # given protocol we just omit it
+        if default_port:
+            result = result.replace(':{}'.format(default_port), '')
+
+        if '/' in result:
+            # remove any sub path
+            result = result[0:result.index('/')]
+
+        if url_type is UrlType.IP:
+            result = "ip/" + result
+        else:
+            result = "website/" + result
+
+    if url_type is UrlType.ANDROID:
+        # strip away everything except app package name
+        matches = ANDROID_PACKAGE_PATTERN.search(result)
+        if not matches:
+            raise ValueError("No android package name found in url: %s" % url)
+
+        result = "android/" + matches.group(1)
+
+    return result
+
+
+def get_secret_path(base_path: str, entry: SecretEntry) -> str:
+    """
+    :param base_path: base path to prepend
+    :param entry: a csv entry
+    :return: the secret path of the entry, created while parsing if possible
+    """
+    if entry.secret_path is not None:
+        return entry.secret_path
+    return create_secret_path(base_path, entry.name, entry.url, entry.username)
+
+
+def create_secret_path(base_path, name, url, username) -> str:
+    """
+    Generates a secret path for a csv entry
+
+    :param base_path: base path to prepend
+    :param name: name of the entry, if any
+    :param url: url of the entry
+    :param username: username of the entry
+    :return: generated secret path
+    """
+
+    if name:
+        site = format_site(name)
+    else:
+        site = format_site(url)
+
+    if username:
+        user = username
+    else:
+        user = "site_pw"
+
+    return "{}{}/{}".format(base_path, site, user)
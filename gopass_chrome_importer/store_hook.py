@@ -0,0 +1,205 @@
+"""
+Minimal "editor" that is used by gopass when importing without the editor server.
+
+gopass starts a new process for every imported secret, so this module is used as the
+editor command ("python -m gopass_chrome_importer.store_hook") instead of the click based cli.
+It must only import lightweight modules at the top level to keep the startup time of
+these processes as low as possible (this is enforced by a unit test).
+"""
+
+import os
+import sys
+from enum import Enum
+
+from gopass_chrome_importer import coerce
+from gopass_chrome_importer.const import SUMMARY_TMP_FILE_ENV_VARIABLE_NAME, SECRET_PATH_ENV_VARIABLE_NAME, \
+    USERNAME_ENV_VARIABLE_NAME, PASSWORD_ENV_VARIABLE_NAME, STORE_RESULT_FILE_ENV_VARIABLE_NAME, \
+    PROFILE_FILE_ENV_VARIABLE_NAME, PROFILE_ROW_ENV_VARIABLE_NAME, PROFILE_START_ENV_VARIABLE_NAME, \
+    SUMMARY_SECTION_ENV_VARIABLE_NAME
+
+# keep in sync with the "force" and "dry-run" options of the cli
+FORCE_OPTION_NAMES = ['--force', '-f']
+DRY_RUN_OPTION_NAMES = ['--dry-run', '-d']
+
+# ansi color codes used when printing to a terminal
+ANSI_COLORS = {
+    'green': "\033[32m",
+    'yellow': "\033[33m",
+    'red': "\033[31m",
+    'white': "\033[37m"
+}
+ANSI_RESET = "\033[0m"
+
+
+class StoreResult(Enum):
+    """
+    Possible outcomes of storing a single entry
+    """
+    IMPORTED = "imported"
+    OVERWRITTEN = "overwritten"
+    IDENTICAL = "identical"
+    SKIPPED = "skipped"
+    DRY_RUN = "dry_run"
+    UNKNOWN = "unknown"
+
+    def is_in_store(self) -> bool:
+        """
+        :return: true, if the store contains the content of the entry after this outcome
+        """
+        return self in [StoreResult.IMPORTED, StoreResult.OVERWRITTEN, StoreResult.IDENTICAL]
+
+
+def create_secret_content(password: str, username: str or None = None, mask_pw: bool = False) -> str:
+    """
+    Creates the text that is written to a secret
+
+    :param username: a username, if present
+    :param password: the password
+    :param mask_pw: when set to true the password will be masked
+    :return: the secret file content
+    """
+    if mask_pw:
+        content = coerce(len(password), min_value=10, max_value=20) * '*'
+    else:
+        content = password
+
+    if username:
+        content += "\n---\n"
+        content += "user: %s" % username
+
+    return content
+
+
+def store_secret_file(file_path: str, final_secret_path: str, username: str, password: str,
+                      summary_manager, echo: callable, force: bool = False, dry_run: bool = False) -> StoreResult:
+    """
+    Stores a password in the given (temporarily decrypted) secret file
+
+    :param file_path: path of the file passed to the editor by gopass
+    :param final_secret_path: the path of the secret within gopass
+    :param username: the username, if any
+    :param password: the password
+    :param summary_manager: the SummaryManager of the import
+    :param echo: function used to print messages, called like the echo function of the cli
+    :param force: When set to true existing passwords will be overwritten. USE WITH CAUTION!
+    :param dry_run: When set no passwords will actually be written and a preview of what WOULD be done will be printed.
+    :return: the outcome
+    """
+    secret_content = create_secret_content(password, username)
+
+    result = StoreResult.IMPORTED
+
+    # check if the file is empty
+    file_stats = os.stat(file_path)
+    if file_stats.st_size != 0:
+        # check if existing content matches the one we are about to write
+        with open(file_path, 'r') as file:
+            existing_content = file.read()
+            if existing_content == secret_content:
+                echo("Non-empty secret with identical content ignored: %s" % final_secret_path, info=True)
+                return StoreResult.IDENTICAL
+
+        if not force:
+            echo("Non-empty file with unequal content will NOT be overwritten: %s" % final_secret_path, warn=True)
+            return StoreResult.SKIPPED
+
+        echo("Non-empty file with unequal content WILL BE overwritten: %s" % final_secret_path, warn=True)
+        result = StoreResult.OVERWRITTEN
+
+    if dry_run:
+        # just print what would be executed
+        secret_content = create_secret_content(password, username, mask_pw=True)
+        echo("%s:\n%s\n" % (final_secret_path, secret_content), info=True)
+        summary_manager.add_info("Would import: %s" % final_secret_path)
+        return StoreResult.DRY_RUN
+
+    with open(file_path, 'w') as file:
+        file.write(secret_content)
+    summary_manager.add_info("Imported %s" % final_secret_path)
+    return result
+
+
+def run(file_path: str, force: bool = False, dry_run: bool = False) -> StoreResult:
+    """
+    Stores the secret passed by the importing process using environment variables in the given file
+
+    :param file_path: path of the file passed to the editor by gopass
+    :param force: When set to true existing passwords will be overwritten. USE WITH CAUTION!
+    :param dry_run: When set no passwords will actually be written and a preview of what WOULD be done will be printed.
+    :return: the outcome
+    """
+    import time
+
+    from gopass_chrome_importer.profiler import PROFILER, STAGE_EDITOR_STARTUP, STAGE_STORE_INTERNAL
+    from gopass_chrome_importer.summary_manager import SummaryManager
+
+    summary_manager = SummaryManager(os.environ[SUMMARY_TMP_FILE_ENV_VARIABLE_NAME])
+
+    def echo(text: str, info: bool = False, warn: bool = False, err: bool = False) -> None:
+        if info:
+            color = 'green'
+        elif warn:
+            color = 'yellow'
+            summary_manager.add_warning(text)
+        elif err:
+            color = 'red'
+            summary_manager.add_error(text)
+        else:
+            color = 'white'
+
+        stream = sys.stderr if err else sys.stdout
+        if stream.isatty():
+            text = "%s%s%s" % (ANSI_COLORS[color], text, ANSI_RESET)
+        stream.write(text + "\n")
+        stream.flush()
+
+    final_secret_path = os.environ[SECRET_PATH_ENV_VARIABLE_NAME]
+
+    username = os.environ[USERNAME_ENV_VARIABLE_NAME]
+    password = os.environ[PASSWORD_ENV_VARIABLE_NAME]
+
+    profile_file_path = os.environ.get(PROFILE_FILE_ENV_VARIABLE_NAME)
+    if profile_file_path:
+        PROFILER.enable(journal_path=profile_file_path)
+
+    row = os.environ.get(PROFILE_ROW_ENV_VARIABLE_NAME)
+    with PROFILER.entry(int(row) if row else None, final_secret_path), \
+            summary_manager.section(os.environ.get(SUMMARY_SECTION_ENV_VARIABLE_NAME)):
+        start = os.environ.get(PROFILE_START_ENV_VARIABLE_NAME)
+        if start:
+            # time spent by gopass (decrypting) and python until this command is actually executed
+            PROFILER.record(STAGE_EDITOR_STARTUP, time.time() - float(start))
+
+        with PROFILER.measure(STAGE_STORE_INTERNAL):
+            result = store_secret_file(file_path, final_secret_path, username, password, summary_manager, echo,
+                                       force=force, dry_run=dry_run)
+
+    result_file_path = os.environ.get(STORE_RESULT_FILE_ENV_VARIABLE_NAME)
+    if result_file_path:
+        with open(result_file_path, 'w') as result_file:
+            result_file.write(result.value)
+
+    return result
+
+
+def main(args: [str]) -> int:
+    """
+    Stores the secret in the file passed by gopass
+
+    :param args: command line arguments, the last one is the file to edit
+    :return: exit code
+    """
+    options = args[1:-1]
+    unknown_options = [option for option in options if option not in FORCE_OPTION_NAMES + DRY_RUN_OPTION_NAMES]
+    if len(args) < 2 or unknown_options:
+        sys.stderr.write("Usage: %s [--force] [--dry-run] FILE_PATH\n" % args[0])
+        return 2
+
+    run(args[-1],
+        force=any(option in FORCE_OPTION_NAMES for option in options),
+        dry_run=any(option in DRY_RUN_OPTION_NAMES for option in options))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,109 @@
+"""
+Module for the in-memory index of existing secrets
+"""
+
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from gopass_chrome_importer.executor import CommandError
+
+
+def content_digest(content: str) -> str:
+    """
+    Calculates the digest used to compare secret contents without keeping them in memory
+
+    :param content: the content of a secret
+    :return: hex digest of the content
+    """
+    # gopass adds a trailing newline when printing a secret
+    return hashlib.sha256(content.rstrip("\n").encode()).hexdigest()
+
+
+def normalize_secret_path(secret_path: str) -> str:
+    """
+    :param secret_path: a secret path as used on the command line
+    :return: the secret path as printed by "gopass list"
+    """
+    return secret_path.strip("/")
+
+
+class StoreIndex:
+    """
+    Index of the secrets that exist in a gopass store and (optionally) digests of their content
+    """
+
+    def __init__(self, secret_paths: [str] = ()):
+        """
+        Constructor
+        :param secret_paths: the paths of all existing secrets
+        """
+        self._secret_paths = set(normalize_secret_path(secret_path) for secret_path in secret_paths)
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._secret_paths)
+
+    def contains(self, secret_path: str) -> bool:
+        """
+        :param secret_path: path of a secret
+        :return: true, if the secret exists
+        """
+        return normalize_secret_path(secret_path) in self._secret_paths
+
+    def get_secret_paths(self, base_path: str = "") -> [str]:
+        """
+        :param base_path: only secrets within this path are returned, all secrets if empty
+        :return: the sorted paths of the existing secrets
+        """
+        base_path = normalize_secret_path(base_path)
+        if not base_path:
+            return sorted(self._secret_paths)
+        return sorted(secret_path for secret_path in self._secret_paths if secret_path.startswith(base_path + "/"))
+
+    def add(self, secret_path: str, digest: str or None = None) -> None:
+        """
+        Adds a secret to the index
+        :param secret_path: path of the secret
+        :param digest: digest of the secret content, if known
+        """
+        secret_path = normalize_secret_path(secret_path)
+        with self._lock:
+            self._secret_paths.add(secret_path)
+            if digest:
+                self._digests[secret_path] = digest
+            else:
+                self._digests.pop(secret_path, None)
+
+    def get_digest(self, secret_path: str) -> str or None:
+        """
+        :param secret_path: path of a secret
+        :return: digest of the secret content or None if unknown
+        """
+        return self._digests.get(normalize_secret_path(secret_path))
+
+    def load_digests(self, secret_paths: [str], read_secret: callable, jobs: int = 1) -> [str]:
+        """
+        Reads the content of the given (existing) secrets in parallel and stores their digests
+
+        :param secret_paths: paths of the secrets to read
+        :param read_secret: function that returns the content of a secret
+        :param jobs: number of secrets to read in parallel
+        :return: the sorted paths of the secrets that could not be read, their digests remain unknown
+        """
+        secret_paths = [secret_path for secret_path in secret_paths if self.contains(secret_path)]
+
+        def load(secret_path: str) -> bool:
+            try:
+                digest = content_digest(read_secret(secret_path))
+            except CommandError:
+                return False
+            with self._lock:
+                self._digests[normalize_secret_path(secret_path)] = digest
+            return True
+
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            # map keeps the order of the secret paths
+            loaded = list(executor.map(load, secret_paths))
+        return sorted(secret_path for secret_path, succeeded in zip(secret_paths, loaded) if not succeeded)
@@ -2,18 +2,69 @@
 Module for managing summary entries
 """
 
+import heapq
+import json
 import os
-import pickle
-import random
-import shutil
-import string
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 
-import click
+from gopass_chrome_importer import create_context_variable
+from gopass_chrome_importer.profiler import PROFILER, STAGE_SUMMARY
+
+SUMMARY_FORMAT_TEXT = "text"
+SUMMARY_FORMAT_JSONL = "jsonl"
+SUMMARY_FORMAT_COUNTS = "counts"
+SUMMARY_FORMATS = [SUMMARY_FORMAT_TEXT, SUMMARY_FORMAT_JSONL, SUMMARY_FORMAT_COUNTS]
+
+# type of the entries in json records
+SUMMARY_RECORD_TYPES = {
+    "infos": "info",
+    "warnings": "warning",
+    "errors": "error"
+}
+
+# number of lines printed at once
+ECHO_CHUNK_SIZE = 1000
+
+
+class SummaryEntries:
+    """
+    The entries of a journal file read by SummaryManager._read_entries
+    """
+
+    def __init__(self, info_limit: int or None):
+        """
+        Constructor
+        :param info_limit: maximum number of (the most recent) info messages kept for each section,
+                           None if all of them are spilled
+        """
+        self.info_limit = info_limit
+        # number of entries of each type for each section in the order of their first entry,
+        # None for the main summary
+        self.counts = OrderedDict()
+        # section -> journal index and text of the most recent info messages
+        self.recent_infos = {}
+        # (section, type) -> path of the file the entries have been spilled to
+        self.spill_files = {}
+
+    def iter_entries(self, section: str or None, summary_type: str) -> iter:
+        """
+        :param section: the section of the entries, None for the main summary
+        :param summary_type: the type of the entries
+        :return: iterator of the journal index and text of each entry
+        """
+        if summary_type == SummaryManager._infos and self.info_limit is not None:
+            return iter(self.recent_infos.get(section, ()))
+        return _iter_spill_file(self.spill_files.get((section, summary_type)))
 
 
 class SummaryManager:
     """
     Class used to manage summary entries
+
+    Entries are stored in an append-only journal file with one json record per line,
+    so multiple threads and processes can add entries at the same time without any locking.
+    Entries can be grouped into sections (f.ex. one for each gopass mount) which are printed separately.
     """
 
     _infos = "infos"
@@ -34,6 +85,7 @@ class SummaryManager:
         :param tmp_file_path: the tmp file to store the summary or None if no such file exists yet
         """
         self.set_tmp_file(tmp_file_path)
+        self._current_section = create_context_variable("summary_section", default=None)
 
     def set_tmp_file(self, tmp_file_path: str or None = None) -> None:
         """
@@ -46,6 +98,9 @@ class SummaryManager:
             tmp_dir = self._select_tmp_file_path()
             if not tmp_dir:
                 raise ValueError("No valid directory for tmp file found")
+            import random
+            import string
+
             random_file_name = ''.join(random.choice(string.ascii_uppercase + string.digits) for _ in range(25))
             self.tmp_file_path = os.path.join(tmp_dir,
                                               "gopass-chrome-importer",
@@ -70,32 +125,84 @@ class SummaryManager:
         """
         return self.tmp_file_path
 
+    def get_section(self) -> str or None:
+        """
+        :return: the section entries of the current thread or asyncio task are added to, if any
+        """
+        return self._current_section.get()
+
+    @contextmanager
+    def section(self, name: str or None):
+        """
+        Adds all entries of the current thread or asyncio task to the given section
+
+        :param name: name of the section, None for the main summary
+        """
+        token = self._current_section.set(name)
+        try:
+            yield
+        finally:
+            self._current_section.reset(token)
+
     def read_from_filesystem(self) -> dict:
         """
-        Reads the current summary from a file
-        :return: the summary dict
+        Reads the current summary from the journal file
+        :return: the summary dict (including the entries of all sections)
         """
-        if os.path.isfile(self.tmp_file_path):
-            with open(self.tmp_file_path, 'rb') as summary_file:
-                return pickle.load(summary_file)
-        else:
-            return self._default_summary_items
+        summary = {key: list(value) for key, value in self._default_summary_items.items()}
+        for section_summary in self.read_sections().values():
+            for key, texts in section_summary.items():
+                summary[key].extend(texts)
+        return summary
 
-    def _write_to_filesystem(self, summary: dict) -> None:
+    def read_sections(self) -> dict:
         """
-        Write the given summary to a file system
-        :param summary: the summary dict to save
+        Reads the current summary from the journal file, grouped by section
+        :return: the summary dict of each section in the order of their first entry, None for the main summary
         """
-        os.makedirs(os.path.dirname(self.tmp_file_path), exist_ok=True)
-        with open(self.tmp_file_path, 'wb') as summary_file:
-            pickle.dump(summary, summary_file, protocol=pickle.HIGHEST_PROTOCOL)
+        sections = OrderedDict([(None, {key: list(value) for key, value in self._default_summary_items.items()})])
+        for section, summary_type, text in self._iter_records():
+            summary = sections.setdefault(
+                section, {key: list(value) for key, value in self._default_summary_items.items()})
+            summary[summary_type].append(text)
+        return sections
+
+    def _iter_records(self) -> iter:
+        """
+        Lazily reads the journal file
+        :return: generator of the section, type and text of every entry
+        """
+        if not os.path.isfile(self.tmp_file_path):
+            return
+
+        with open(self.tmp_file_path, 'r') as summary_file:
+            for line in summary_file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # ignore incomplete records, f.ex. of a process that has been killed
+                    continue
+                if record.get("type") not in self._default_summary_items:
+                    continue
+                yield record.get("section"), record["type"], record["text"]
 
     def clear(self):
         """
         Removes temp files of previous runs
         """
+        import shutil
+
         shutil.rmtree(os.path.dirname(self.tmp_file_path), ignore_errors=True)
 
+    def remove(self) -> None:
+        """
+        Removes the journal file, entries added afterwards start a new one
+        """
+        try:
+            os.remove(self.tmp_file_path)
+        except FileNotFoundError:
+            pass
+
     def add_info(self, text: any) -> None:
         """
         Add an info message to the summary
@@ -122,42 +229,226 @@ class SummaryManager:
         Appends an item to the summary
         :param item:
         """
-        summary = self.read_from_filesystem()
-
-        text = str(item)
         if error:
-            summary[self._errors].append(text)
+            summary_type = self._errors
         elif warn:
-            summary[self._warnings].append(text)
+            summary_type = self._warnings
         else:
-            summary[self._infos].append(text)
+            summary_type = self._infos
+
+        record = {"type": summary_type, "text": str(item)}
+        section = self.get_section()
+        if section is not None:
+            record["section"] = section
+        record = json.dumps(record) + "\n"
 
-        self._write_to_filesystem(summary)
+        with PROFILER.measure(STAGE_SUMMARY):
+            self._append_record(record)
 
-    def print_summary(self):
+    def _append_record(self, record: str) -> None:
+        """
+        Appends a single record to the journal file
+        :param record: the serialized record
+        """
+        os.makedirs(os.path.dirname(self.tmp_file_path), exist_ok=True)
+
+        # a single write to a file opened with O_APPEND is not interleaved with
+        # the writes of other threads or processes appending to the same file
+        file_descriptor = os.open(self.tmp_file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(file_descriptor, record.encode())
+        finally:
+            os.close(file_descriptor)
+
+    def print_summary(self, output_format: str = SUMMARY_FORMAT_TEXT, info_limit: int or None = None) -> None:
         """
         Prints the current state of the summary to the console
+
+        The journal file is read only once: its entries are counted, the most recent info messages are kept
+        in memory if they are limited and all other entries are spilled into a file for each section and type
+        next to the journal file, which are streamed afterwards. So printing huge summaries needs only little
+        memory. Nothing is spilled if only the counts are printed.
+
+        :param output_format: one of SUMMARY_FORMATS
+        :param info_limit: maximum number of (the most recent) info messages printed for each section,
+                           all info messages are counted anyway. None to print all of them.
         """
-        summary = self.read_from_filesystem()
-        infos = summary[self._infos]
-        errors = summary[self._errors]
-        warnings = summary[self._warnings]
+        if output_format == SUMMARY_FORMAT_COUNTS:
+            self._print_summary(output_format, self._read_entries(None, info_limit))
+            return
+
+        import tempfile
+
+        journal_dir = os.path.dirname(self.tmp_file_path)
+        os.makedirs(journal_dir, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix="summary-spill-", dir=journal_dir) as spill_dir:
+            self._print_summary(output_format, self._read_entries(spill_dir, info_limit))
 
-        summary_title = "Summary (%s warning(s), %s error(s))" % (len(warnings), len(errors))
+    def _print_summary(self, output_format: str, entries: SummaryEntries) -> None:
+        """
+        :param output_format: one of SUMMARY_FORMATS
+        :param entries: the entries read from the journal file
+        """
+        # click is only needed by the importing process, not by the store_hook processes
+        import click
+
+        if output_format == SUMMARY_FORMAT_JSONL:
+            self._print_jsonl(entries)
+            return
+
+        counts = entries.counts
+        warning_count = sum(section_counts[self._warnings] for section_counts in counts.values())
+        error_count = sum(section_counts[self._errors] for section_counts in counts.values())
+
+        summary_title = "Summary (%s warning(s), %s error(s))" % (warning_count, error_count)
         text = "%s\n" % summary_title + ('=' * len(summary_title)) + "\n"
         click.echo(click.style(text, fg='white'))
 
-        text = ""
-        for info in infos:
-            text += str(info) + "\n"
-        click.echo(click.style(text, fg='green'))
+        for section, section_counts in counts.items():
+            if section is not None:
+                text = "%s\n" % section + ('-' * len(section)) + "\n"
+                click.echo(click.style(text, fg='white'))
+
+            if output_format == SUMMARY_FORMAT_COUNTS:
+                click.echo(click.style("%s info(s), %s warning(s), %s error(s)\n" % (
+                    section_counts[self._infos], section_counts[self._warnings], section_counts[self._errors]),
+                    fg='white'))
+                continue
+
+            self._print_section_entries(entries, section)
+
+    def _read_entries(self, spill_dir: str or None, info_limit: int or None) -> SummaryEntries:
+        """
+        Reads the journal file once, counting its entries and writing them to a file for each section and type
+
+        :param spill_dir: the directory to create the files in, None to only count the entries
+        :param info_limit: maximum number of (the most recent) info messages kept for each section,
+                           None to spill all of them
+        :return: the entries of the journal
+        """
+        entries = SummaryEntries(info_limit)
+        # the main summary is always printed first, even without any entries
+        entries.counts[None] = {key: 0 for key in self._default_summary_items.keys()}
+        open_files = {}
+        try:
+            for index, (section, summary_type, text) in enumerate(self._iter_records()):
+                if section not in entries.counts:
+                    entries.counts[section] = {key: 0 for key in self._default_summary_items.keys()}
+                entries.counts[section][summary_type] += 1
+
+                if spill_dir is None:
+                    continue
+                # the index keeps the order of the journal across the files
+                if summary_type == self._infos and info_limit is not None:
+                    if section not in entries.recent_infos:
+                        entries.recent_infos[section] = deque(maxlen=info_limit)
+                    entries.recent_infos[section].append((index, text))
+                    continue
+
+                if (section, summary_type) not in open_files:
+                    file_path = os.path.join(spill_dir, "%s-%s" % (len(open_files), summary_type))
+                    entries.spill_files[(section, summary_type)] = file_path
+                    open_files[(section, summary_type)] = open(file_path, 'w')
+                open_files[(section, summary_type)].write(json.dumps([index, text]) + "\n")
+        finally:
+            for spill_file in open_files.values():
+                spill_file.close()
+
+        return entries
+
+    def _print_section_entries(self, entries: SummaryEntries, section: str or None) -> None:
+        """
+        Prints the entries of a single section
+
+        :param entries: the entries read from the journal file
+        :param section: the section to print, None for the main summary
+        """
+        import click
+
+        omitted_infos = self._get_omitted_count(entries.counts[section][self._infos], entries.info_limit)
+        if omitted_infos > 0:
+            click.echo(click.style("... %s earlier info message(s) omitted" % omitted_infos, fg='green'))
+
+        for summary_type, color in [(self._infos, 'green'), (self._warnings, 'yellow'), (self._errors, 'red')]:
+            texts = (text for _, text in entries.iter_entries(section, summary_type))
+            _echo_lines(texts, color, err=summary_type == self._errors)
+
+    def _print_jsonl(self, entries: SummaryEntries) -> None:
+        """
+        Prints one json record per entry (in the order they have been added) followed by one counts record
+        per section
+
+        :param entries: the entries read from the journal file
+        """
+        def iter_entries(section: str or None, summary_type: str):
+            for index, text in entries.iter_entries(section, summary_type):
+                yield index, section, summary_type, text
+
+        sources = [iter_entries(section, summary_type)
+                   for section in entries.counts.keys() for summary_type in self._default_summary_items.keys()]
+
+        def records():
+            # merges the entries in the order of the journal, the index of every entry is unique
+            for _, section, summary_type, text in heapq.merge(*sources):
+                yield json.dumps({"section": section, "type": SUMMARY_RECORD_TYPES[summary_type], "text": text})
+
+            for section, section_counts in entries.counts.items():
+                record = {"section": section, "type": "counts"}
+                record.update(section_counts)
+                yield json.dumps(record)
+
+        _echo_lines(records(), separate=False)
+
+    @staticmethod
+    def _get_omitted_count(count: int, limit: int or None) -> int:
+        """
+        :param count: number of entries
+        :param limit: maximum number of entries to print, None for no limit
+        :return: number of entries that are not printed
+        """
+        if limit is None:
+            return 0
+        return max(count - limit, 0)
+
+
+def _iter_spill_file(file_path: str or None) -> iter:
+    """
+    :param file_path: path of a file written by SummaryManager._read_entries, None for no entries
+    :return: generator of the journal index and text of each entry
+    """
+    if file_path is None:
+        return
+
+    with open(file_path, 'r') as spill_file:
+        for line in spill_file:
+            index, text = json.loads(line)
+            yield index, text
+
+
+def _echo_lines(lines: iter, color: str or None = None, err: bool = False, separate: bool = True) -> None:
+    """
+    Prints lines in chunks, without building the whole text in memory
+
+    :param lines: the lines to print
+    :param color: the foreground color of the lines, None for plain text
+    :param err: set to true to print to stderr
+    :param separate: set to true to print an empty line after the last line
+    """
+    import click
+
+    def echo_chunk(chunk: [str]) -> None:
+        text = "\n".join(chunk)
+        click.echo(click.style(text, fg=color) if color else text, err=err)
 
-        text = ""
-        for warning in warnings:
-            text += str(warning) + "\n"
-        click.echo(click.style(text, fg='yellow'))
+    chunk = []
+    for line in lines:
+        chunk.append(str(line))
+        if len(chunk) >= ECHO_CHUNK_SIZE:
+            echo_chunk(chunk)
+            chunk = []
 
-        text = ""
-        for error in errors:
-            text += str(error) + "\n"
-        click.echo(click.style(text, fg='red'), err=True)
+    if separate:
+        # separates the blocks of the summary
+        chunk.append("")
+    if chunk:
+        echo_chunk(chunk)
@@ -0,0 +1,69 @@
+"""
+Module for reading back imported secrets and comparing them with the imported entries
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from gopass_chrome_importer.executor import CommandError
+from gopass_chrome_importer.store_index import content_digest, normalize_secret_path
+
+# the secret contains the content of the entry
+VERIFY_OK = "verified"
+# the secret contains a different content
+VERIFY_MISMATCH = "mismatch"
+# the secret could not be read, f.ex. because it does not exist
+VERIFY_UNREADABLE = "unreadable"
+
+VERIFY_CATEGORIES = [VERIFY_OK, VERIFY_MISMATCH, VERIFY_UNREADABLE]
+
+
+class ImportVerification:
+    """
+    The expected content of every secret written by an import, kept as digests only
+    """
+
+    def __init__(self):
+        # secret path -> digest of the expected content
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def add(self, secret_path: str, secret_content: str) -> None:
+        """
+        Adds a written secret
+
+        :param secret_path: the path of the secret within gopass
+        :param secret_content: the content that has been written
+        """
+        digest = content_digest(secret_content)
+        with self._lock:
+            self._digests[normalize_secret_path(secret_path)] = digest
+
+    def verify(self, read_secret: callable, jobs: int = 1) -> dict:
+        """
+        Reads all added secrets in parallel and compares their content with the expected one
+
+        :param read_secret: function that returns the content of a secret, raising a CommandError if it fails
+        :param jobs: number of secrets to read in parallel
+        :return: the sorted secret paths of each of the VERIFY_CATEGORIES
+        """
+        with self._lock:
+            expected = sorted(self._digests.items())
+
+        def check(item: (str, str)) -> str:
+            secret_path, digest = item
+            try:
+                content = read_secret(secret_path)
+            except CommandError:
+                return VERIFY_UNREADABLE
+            return VERIFY_OK if content_digest(content) == digest else VERIFY_MISMATCH
+
+        result = {category: [] for category in VERIFY_CATEGORIES}
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            # map keeps the (sorted) order of the secret paths
+            for (secret_path, digest), category in zip(expected, executor.map(check, expected)):
+                result[category].append(secret_path)
+        return result
@@ -75,6 +75,9 @@ setup(
     install_requires=[
         'click'
     ],
+    extras_require={
+        'zstd': ['zstandard']
+    },
     tests_require=[
         'pytest',
         'pylint',
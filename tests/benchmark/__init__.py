@@ -0,0 +1,67 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from tests.benchmark.fake_gopass import STORE_ENV_VARIABLE_NAME, LATENCY_ENV_VARIABLE_NAME
+
+FAKE_GOPASS_FILE_PATH = os.path.join(os.path.dirname(__file__), 'fake_gopass.py')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeGopass:
+    """
+    Context manager that puts the fake gopass executable (and this version of gopass-chrome-importer)
+    in front of the PATH of this process
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Constructor
+        :param latency: delay of every gopass call in seconds
+        """
+        self.latency = latency
+        self.tmp_dir = None
+        self.store = None
+        self._original_environ = None
+
+    def __enter__(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="fake-gopass-")
+        self.store = os.path.join(self.tmp_dir, "store")
+        bin_dir = os.path.join(self.tmp_dir, "bin")
+        os.makedirs(bin_dir)
+
+        self._write_script(os.path.join(bin_dir, "gopass"),
+                           'exec "%s" "%s" "$@"' % (sys.executable, FAKE_GOPASS_FILE_PATH))
+
+        self._original_environ = dict(os.environ)
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+        # the editor command used by the "edit" backend runs the store_hook module of this version
+        os.environ["PYTHONPATH"] = os.pathsep.join(
+            path for path in [PROJECT_ROOT, os.environ.get("PYTHONPATH")] if path)
+        os.environ[STORE_ENV_VARIABLE_NAME] = self.store
+        os.environ[LATENCY_ENV_VARIABLE_NAME] = str(self.latency)
+        os.environ["XDG_CACHE_HOME"] = os.path.join(self.tmp_dir, "cache")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        os.environ.clear()
+        os.environ.update(self._original_environ)
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def read_secret(self, secret_path: str) -> str or None:
+        """
+        :param secret_path: path of a secret
+        :return: the content of the secret or None if it does not exist
+        """
+        file_path = os.path.join(self.store, secret_path.strip("/") + ".gpg")
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path) as file:
+            return file.read()
+
+    @staticmethod
+    def _write_script(path: str, command: str) -> None:
+        with open(path, 'w') as file:
+            file.write("#!/bin/sh\n%s\n" % command)
+        os.chmod(path, 0o755)
@@ -0,0 +1,129 @@
+"""
+Benchmark for the import command using synthetic exports and a fake gopass executable
+
+Usage:
+    python -m tests.benchmark.benchmark --rows 1000 10000 --latency 0.01 -- --backend insert --jobs 4
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from gopass_chrome_importer import gopass_chrome_importer, secret_path
+from gopass_chrome_importer.executor import CommandExecutor
+from tests.benchmark import FakeGopass
+from tests.benchmark.export_generator import generate_export
+
+
+@contextmanager
+def _silenced():
+    """
+    Redirects stdout and stderr (including those of child processes) to /dev/null
+    """
+    saved = [os.dup(1), os.dup(2)]
+    with open(os.devnull, 'w') as devnull:
+        os.dup2(devnull.fileno(), 1)
+        os.dup2(devnull.fileno(), 2)
+        try:
+            yield
+        finally:
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            for file_descriptor in saved:
+                os.close(file_descriptor)
+
+
+def run_benchmark(rows: int, latency: float = 0.0, import_args: [str] = (), seed: int = 0) -> dict:
+    """
+    Runs the import of a synthetic export against the fake gopass executable
+
+    :param rows: number of entries in the export
+    :param latency: delay of every gopass call in seconds
+    :param import_args: additional arguments for the import command
+    :param seed: seed for the export generator
+    :return: the measured timings
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir, FakeGopass(latency=latency):
+        export_path = os.path.join(tmp_dir, "export.csv")
+        generate_export(export_path, rows, seed=seed)
+
+        # the stages are measured by the profiler of the import itself, so they all belong to the same run
+        profile_path = os.path.join(tmp_dir, "profile.json")
+
+        # the gopass calls of the command line interface are run by the executor of its context
+        gopass_chrome_importer.EXECUTOR = gopass_chrome_importer.CONTEXT.executor = CommandExecutor()
+        gopass_chrome_importer.SUMMARY_MANAGER.set_tmp_file()
+        secret_path.format_site.cache_clear()
+        secret_path.find_type.cache_clear()
+        try:
+            start = time.perf_counter()
+            with _silenced():
+                gopass_chrome_importer.cli.main(
+                    args=["import", "-p", export_path, "-y", "--profile", profile_path] + list(import_args),
+                    prog_name="gopass-chrome-importer", standalone_mode=False)
+            import_duration = time.perf_counter() - start
+        finally:
+            gopass_chrome_importer.CONTEXT.close()
+
+        with open(profile_path, 'r') as profile_file:
+            profile = json.load(profile_file)
+        stages = {stage: statistics["total"] for stage, statistics in sorted(profile["stages"].items())}
+
+        commands = {}
+        for name, statistics in gopass_chrome_importer.EXECUTOR.get_statistics().items():
+            commands[name] = {
+                "count": statistics.count,
+                "failed": statistics.failed,
+                "total": statistics.total,
+                "average": statistics.average,
+                "max": statistics.max
+            }
+
+    return {
+        "rows": rows,
+        "latency": latency,
+        "args": list(import_args),
+        "rows_per_second": rows / import_duration if import_duration else 0.0,
+        "duration": import_duration,
+        # summed durations of each stage over all entries, stages of parallel entries overlap
+        "stages": stages,
+        "commands": commands
+    }
+
+
+def _print_result(result: dict) -> None:
+    print("%s rows (latency %ss, args: %s)" % (result["rows"], result["latency"], " ".join(result["args"]) or "-"))
+    print("  %.1f rows/sec, %.3fs" % (result["rows_per_second"], result["duration"]))
+    for stage, duration in result["stages"].items():
+        print("  %-16s %10.3fs" % (stage, duration))
+    for name, statistics in result["commands"].items():
+        print("  %-20s %6s calls, %8.3fs total, %.4fs avg, %.4fs max" % (
+            name, statistics["count"], statistics["total"], statistics["average"], statistics["max"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="sizes of the generated exports")
+    parser.add_argument("--latency", type=float, default=0.0, help="delay of every gopass call in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the export generator")
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    parser.add_argument("import_args", nargs="*", help="additional arguments for the import command")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        result = run_benchmark(rows, latency=args.latency, import_args=args.import_args, seed=args.seed)
+        results.append(result)
+        if not args.json:
+            _print_result(result)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
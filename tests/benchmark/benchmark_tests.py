@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from gopass_chrome_importer import gopass_chrome_importer
+from gopass_chrome_importer.secret_path import create_secret_path
+from gopass_chrome_importer.store_hook import create_secret_content
+from tests import CliTestBase
+from tests.benchmark import FakeGopass
+from tests.benchmark.benchmark import run_benchmark
+from tests.benchmark.export_generator import generate_export
+
+
+class BenchmarkTests(CliTestBase):
+    """
+    Smoke tests for the benchmark suite, which also run a real import against the fake gopass executable
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.export_path = os.path.join(self.tmp_dir.name, "export.csv")
+        generate_export(self.export_path, 20, seed=1)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_generator_is_deterministic(self):
+        other_path = os.path.join(self.tmp_dir.name, "other.csv")
+        generate_export(other_path, 20, seed=1)
+
+        self.assertEqual(gopass_chrome_importer._read_csv(self.export_path),
+                         gopass_chrome_importer._read_csv(other_path))
+
+    def test_import_edit_backend(self):
+        self._assert_import(["--editor-server"])
+
+    def test_import_edit_backend_store_internal(self):
+        self._assert_import([])
+
+    def test_import_insert_backend(self):
+        self._assert_import(["--backend", "insert", "--jobs", "4"])
+
+    def test_run_benchmark(self):
+        result = run_benchmark(10, import_args=["--backend", "insert"])
+
+        self.assertEqual(result["rows"], 10)
+        self.assertGreater(result["rows_per_second"], 0)
+        self.assertGreater(result["duration"], 0)
+        # the stages are taken from the profiling report of the import
+        self.assertTrue({"parse", "plan", "check", "store"}.issubset(result["stages"].keys()))
+        self.assertEqual(result["commands"]["gopass list"]["count"], 1)
+
+    def _assert_import(self, args: [str]):
+        with FakeGopass() as fake_gopass:
+            self._run_cli_cmd(args=["import", "-p", self.export_path, "-y", "-gb", "test/"] + args)
+
+            # the first entry of each secret path is imported
+            expected = {}
+            for entry in gopass_chrome_importer._read_csv(self.export_path):
+                secret_path = create_secret_path("test/", entry.name, entry.url, entry.username)
+                expected.setdefault(secret_path, create_secret_content(
+                    entry.password, entry.username))
+
+            for secret_path, content in expected.items():
+                self.assertEqual(fake_gopass.read_secret(secret_path), content)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Generator for synthetic chrome password exports
+"""
+
+import csv
+import random
+import string
+
+TLDS = ["com", "de", "org", "net", "io"]
+SUBDOMAINS = ["", "www.", "login.", "accounts.", "smile."]
+PATHS = ["", "/", "/login", "/ap/signin", "/account/login.php?next=%2F"]
+
+
+def _random_word(rnd: random.Random, min_length: int = 4, max_length: int = 10) -> str:
+    return "".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(min_length, max_length)))
+
+
+def _random_password(rnd: random.Random) -> str:
+    alphabet = string.ascii_letters + string.digits + string.punctuation + " "
+    return "".join(rnd.choice(alphabet) for _ in range(rnd.randint(8, 32)))
+
+
+def _website(rnd: random.Random, hosts: [str]) -> (str, str):
+    host = rnd.choice(hosts)
+    url = "%s://%s%s" % (rnd.choice(["https", "https", "http"]), rnd.choice(SUBDOMAINS), host)
+    if rnd.random() < 0.1:
+        url += ":%s" % rnd.choice([443, 80, 8080, 8443])
+    url += rnd.choice(PATHS)
+    name = host if rnd.random() < 0.3 else ""
+    return name, url
+
+
+def _ip(rnd: random.Random) -> (str, str):
+    if rnd.random() < 0.7:
+        # private ranges
+        address = rnd.choice(["192.168.%s.%s" % (rnd.randint(0, 2), rnd.randint(1, 254)),
+                              "10.0.%s.%s" % (rnd.randint(0, 2), rnd.randint(1, 254))])
+    else:
+        address = ".".join(str(rnd.randint(1, 254)) for _ in range(4))
+    url = "http://%s" % address
+    if rnd.random() < 0.5:
+        url += ":%s" % rnd.choice([80, 8080, 5000, 8888])
+    url += rnd.choice(PATHS)
+    return "", url
+
+
+def _android(rnd: random.Random, packages: [str]) -> (str, str):
+    key = "".join(rnd.choice(string.ascii_letters + string.digits + "_-") for _ in range(86))
+    return "", "android://%s==@%s/" % (key, rnd.choice(packages))
+
+
+def generate_export(path: str, rows: int, seed: int = 0, ip_share: float = 0.15,
+                    android_share: float = 0.15, host_count: int or None = None) -> None:
+    """
+    Writes a synthetic chrome password export
+
+    :param path: path of the csv file to write
+    :param rows: number of entries
+    :param seed: seed for the random generator, the same seed always generates the same file
+    :param ip_share: share of entries for IP addresses
+    :param android_share: share of entries for android apps
+    :param host_count: number of distinct websites, defaults to a tenth of the rows
+    """
+    rnd = random.Random(seed)
+
+    host_count = host_count or max(rows // 10, 1)
+    hosts = ["%s.%s" % (_random_word(rnd), rnd.choice(TLDS)) for _ in range(host_count)]
+    packages = ["com.%s.%s" % (_random_word(rnd), _random_word(rnd)) for _ in range(max(host_count // 5, 1))]
+    usernames = ["%s@%s.com" % (_random_word(rnd), _random_word(rnd)) for _ in range(20)] + ["", "admin", "root"]
+
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["name", "url", "username", "password"])
+
+        for _ in range(rows):
+            category = rnd.random()
+            if category < ip_share:
+                name, url = _ip(rnd)
+            elif category < ip_share + android_share:
+                name, url = _android(rnd, packages)
+            else:
+                name, url = _website(rnd, hosts)
+
+            writer.writerow([name, url, rnd.choice(usernames), _random_password(rnd)])
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Minimal stand-in for the gopass executable used for benchmarks and tests.
+
+Secrets are stored unencrypted in the directory given by FAKE_GOPASS_STORE
+and every call is delayed by FAKE_GOPASS_LATENCY seconds to simulate gpg and git.
+Only the subset of gopass commands used by gopass-chrome-importer is supported.
+"""
+
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+STORE_ENV_VARIABLE_NAME = "FAKE_GOPASS_STORE"
+LATENCY_ENV_VARIABLE_NAME = "FAKE_GOPASS_LATENCY"
+
+
+def _secret_file(store: str, secret_path: str) -> str:
+    return os.path.join(store, secret_path.strip("/") + ".gpg")
+
+
+def _write(file_path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as file:
+        file.write(content)
+
+
+def _read(file_path: str) -> str:
+    with open(file_path, 'r') as file:
+        return file.read()
+
+
+def _edit(store: str, secret_path: str) -> int:
+    file_path = _secret_file(store, secret_path)
+
+    with tempfile.NamedTemporaryFile('w', suffix=".txt", delete=False) as tmp_file:
+        if os.path.isfile(file_path):
+            tmp_file.write(_read(file_path))
+
+    try:
+        exit_code = subprocess.call(shlex.split(os.environ["EDITOR"]) + [tmp_file.name])
+        if exit_code != 0:
+            return exit_code
+
+        content = _read(tmp_file.name)
+        if content:
+            _write(file_path, content)
+    finally:
+        os.remove(tmp_file.name)
+
+    return 0
+
+
+def _insert(store: str, secret_path: str, force: bool) -> int:
+    file_path = _secret_file(store, secret_path)
+    if os.path.isfile(file_path) and not force:
+        sys.stderr.write("Error: %s already exists\n" % secret_path)
+        return 1
+
+    _write(file_path, sys.stdin.read())
+    return 0
+
+
+def _list(store: str) -> int:
+    for root, _, files in os.walk(store):
+        for file_name in sorted(files):
+            if file_name.endswith(".gpg"):
+                print(os.path.relpath(os.path.join(root, file_name), store)[:-len(".gpg")])
+    return 0
+
+
+def _show(store: str, secret_path: str) -> int:
+    file_path = _secret_file(store, secret_path)
+    if not os.path.isfile(file_path):
+        sys.stderr.write("Error: %s is not in the password store\n" % secret_path)
+        return 1
+
+    print(_read(file_path))
+    return 0
+
+
+def main(args: [str]) -> int:
+    """
+    :param args: command line arguments (without the program name)
+    :return: exit code
+    """
+    time.sleep(float(os.environ.get(LATENCY_ENV_VARIABLE_NAME, "0")))
+
+    store = os.environ[STORE_ENV_VARIABLE_NAME]
+    os.makedirs(store, exist_ok=True)
+
+    args = [arg for arg in args if arg != "--yes"]
+    command = args[0]
+    flags = [arg for arg in args[1:] if arg.startswith("-")]
+    positional = [arg for arg in args[1:] if not arg.startswith("-")]
+
+    if command == "edit":
+        return _edit(store, positional[0])
+    if command == "insert":
+        return _insert(store, positional[0], force="--force" in flags or "-f" in flags)
+    if command in ["list", "ls"]:
+        return _list(store)
+    if command == "show":
+        return _show(store, positional[0])
+    if command == "config" and positional and positional[0] in ["path", "mounts.path"]:
+        print(store)
+        return 0
+
+    sys.stderr.write("Unsupported command: %s\n" % " ".join(args))
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,105 @@
+import sys
+import threading
+import time
+
+from gopass_chrome_importer import engine
+from gopass_chrome_importer.backends import StoreBackend, StoreCall
+from gopass_chrome_importer.context import ImportContext
+from gopass_chrome_importer.entry import SecretEntry
+from gopass_chrome_importer.store_hook import StoreResult
+
+
+class RecordingBackend(StoreBackend):
+    """
+    Backend that only records which secrets would have been stored
+    """
+
+    def __init__(self, fail_on: str or None = None):
+        super().__init__()
+        self.fail_on = fail_on
+        self.stored = []
+        self.overlapping_writes = []
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def store(self, secret_path: str, username: str, password: str) -> None:
+        with self._lock:
+            if secret_path in self._active:
+                self.overlapping_writes.append(secret_path)
+            self._active.add(secret_path)
+
+        time.sleep(0.01)
+
+        with self._lock:
+            self._active.remove(secret_path)
+            self.stored.append((secret_path, password))
+
+        if password == self.fail_on:
+            raise ValueError("An error occurred")
+
+
+class CommandBackend(StoreBackend):
+    """
+    Backend that passes the password to a python process, which fails for the password "fail"
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.stored = []
+
+    def prepare(self, secret_path: str, username: str, password: str) -> StoreCall:
+        script = "import sys, time; time.sleep(0.2); sys.exit(sys.stdin.read() == 'fail')"
+
+        def finish(succeeded: bool) -> StoreResult:
+            if succeeded:
+                self.stored.append((secret_path, password))
+            return StoreResult.IMPORTED
+
+        return StoreCall([sys.executable, "-c", script], input_data=password, finish=finish)
+
+
+def create_entry(url: str, username: str, password: str) -> SecretEntry:
+    """
+    :return: an entry without a name
+    """
+    return SecretEntry("", url, username, password)
+
+
+class ResultBackend(StoreBackend):
+    """
+    Backend that skips the secrets of "skipped.com" and imports all other ones without calling gopass
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.opened = False
+        self.closed = False
+
+    def open(self, context: ImportContext) -> None:
+        super().open(context)
+        self.opened = True
+
+    def close(self) -> None:
+        self.closed = True
+
+    def store(self, secret_path: str, username: str, password: str) -> StoreResult:
+        return StoreResult.SKIPPED if "skipped.com" in secret_path else StoreResult.IMPORTED
+
+
+def import_entries(entries: iter, store_backend: StoreBackend, base_path: str, **kwargs) -> ImportContext:
+    """
+    Stores the given entries using the import engine, like an Importer does
+
+    :param entries: the entries to store
+    :param store_backend: the backend used to store the secrets, opened with a new context
+    :param base_path: The base path to insert secrets into within gopass
+    :param kwargs: further arguments of the import engine
+    :return: the context the messages have been collected in
+    """
+    context = ImportContext()
+    store_backend.open(context)
+    try:
+        engine.import_entries(entries, store_backend, base_path, context, **kwargs)
+    finally:
+        store_backend.close()
+    return context
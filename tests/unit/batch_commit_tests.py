@@ -0,0 +1,147 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from gopass_chrome_importer.batch_commit import BatchCommit
+from gopass_chrome_importer.executor import CommandExecutor, CommandError
+
+
+class ConfigExecutor(CommandExecutor):
+    """
+    Executor that answers "gopass config" calls from a dictionary and runs everything else
+    """
+
+    def __init__(self, config: dict):
+        super().__init__()
+        self.config = config
+
+    def run(self, args: [str], input_data: str or None = None, capture_output: bool = False,
+            env: dict or None = None, interactive: bool = False) -> str or None:
+        if args[:2] != ["gopass", "config"]:
+            return super().run(args, input_data=input_data, capture_output=capture_output, env=env,
+                               interactive=interactive)
+
+        key = args[2]
+        if key not in self.config:
+            raise CommandError(args, 1)
+        if len(args) > 3:
+            self.config[key] = args[3]
+            return ""
+        return "%s\n" % self.config[key]
+
+
+def _git(store_root: str, *args: str) -> str:
+    return subprocess.check_output(["git", "-C", store_root, "-c", "user.name=test", "-c", "user.email=test@test",
+                                    "-c", "commit.gpgsign=false"] + list(args)).decode().strip()
+
+
+def _get_finished_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def _add_secret(store_root: str, name: str) -> None:
+    with open(os.path.join(store_root, name), 'w') as secret_file:
+        secret_file.write(name)
+    _git(store_root, "add", name)
+    _git(store_root, "commit", "--quiet", "-m", "Add %s" % name)
+
+
+class BatchCommitTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store_root = os.path.join(self.tmp_dir.name, "store")
+        self.restore_file_path = os.path.join(self.tmp_dir.name, "restore.json")
+        os.makedirs(self.store_root)
+        _git(self.store_root, "init", "--quiet")
+        _git(self.store_root, "config", "user.name", "test")
+        _git(self.store_root, "config", "user.email", "test@test")
+        _git(self.store_root, "config", "commit.gpgsign", "false")
+        _add_secret(self.store_root, "existing")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _create_batch(self, executor: CommandExecutor) -> BatchCommit:
+        return BatchCommit(self.store_root, executor, lambda *args: ["gopass"] + list(args),
+                           restore_file_path=self.restore_file_path)
+
+    def test_settings_are_suspended_and_restored(self):
+        executor = ConfigExecutor({"core.autosync": "true", "core.autopush": "true"})
+        batch = self._create_batch(executor)
+
+        batch.begin()
+        self.assertEqual(executor.config, {"core.autosync": "false", "core.autopush": "false"})
+        self.assertTrue(os.path.isfile(self.restore_file_path))
+
+        batch.restore()
+        self.assertEqual(executor.config, {"core.autosync": "true", "core.autopush": "true"})
+        self.assertFalse(os.path.exists(self.restore_file_path))
+
+    def test_restore_interrupted(self):
+        executor = ConfigExecutor({"autosync": "true"})
+        self._create_batch(executor).begin()
+
+        # the settings of a running import are left alone
+        self.assertEqual(self._restore_interrupted(executor), {})
+        self.assertEqual(executor.config, {"autosync": "false"})
+
+        self._set_restore_file_owner(_get_finished_pid())
+        restored = self._restore_interrupted(executor)
+
+        self.assertEqual(restored, {"autosync": "true"})
+        self.assertEqual(executor.config, {"autosync": "true"})
+        self.assertFalse(os.path.exists(self.restore_file_path))
+
+    def test_concurrent_batch_is_refused(self):
+        executor = ConfigExecutor({"autosync": "true"})
+        self._create_batch(executor).begin()
+
+        with self.assertRaises(ValueError):
+            self._create_batch(executor).begin()
+        self.assertTrue(os.path.isfile(self.restore_file_path))
+
+        self._set_restore_file_owner(_get_finished_pid())
+        self._create_batch(executor).begin()
+
+    def test_restore_file_per_store(self):
+        self.assertEqual(BatchCommit.get_restore_file_path(self.store_root),
+                         BatchCommit.get_restore_file_path(self.store_root))
+        self.assertNotEqual(BatchCommit.get_restore_file_path(self.store_root),
+                            BatchCommit.get_restore_file_path(os.path.join(self.tmp_dir.name, "other")))
+
+    def _restore_interrupted(self, executor: CommandExecutor) -> dict:
+        return BatchCommit.restore_interrupted(self.store_root, executor, lambda *args: ["gopass"] + list(args),
+                                               restore_file_path=self.restore_file_path)
+
+    def _set_restore_file_owner(self, pid: int) -> None:
+        with open(self.restore_file_path, 'r') as restore_file:
+            data = json.load(restore_file)
+        data["pid"] = pid
+        with open(self.restore_file_path, 'w') as restore_file:
+            json.dump(data, restore_file)
+
+    def test_commits_are_squashed(self):
+        batch = self._create_batch(ConfigExecutor({}))
+        batch.begin()
+
+        for i in range(3):
+            _add_secret(self.store_root, "secret%s" % i)
+
+        self.assertEqual(batch.commit(), 3)
+        self.assertEqual(_git(self.store_root, "rev-list", "--count", "HEAD"), "2")
+        self.assertEqual(_git(self.store_root, "status", "--porcelain"), "")
+        self.assertEqual(sorted(_git(self.store_root, "ls-files").splitlines()),
+                         ["existing", "secret0", "secret1", "secret2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from gopass_chrome_importer.checkpoint import ImportCheckpoint, file_digest
+from tests.unit import RecordingBackend, create_entry, import_entries
+
+
+class CheckpointTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp_dir.name, "checkpoints", "checkpoint.log")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_file_path_depends_on_content(self):
+        csv_path = os.path.join(self.tmp_dir.name, "export.csv")
+        with open(csv_path, 'w') as csv_file:
+            csv_file.write("name,url,username,password\n")
+        digest = file_digest(csv_path)
+
+        self.assertEqual(ImportCheckpoint.get_file_path(digest, "imported/"),
+                         ImportCheckpoint.get_file_path(file_digest(csv_path), "imported/"))
+        self.assertNotEqual(ImportCheckpoint.get_file_path(digest, "imported/"),
+                            ImportCheckpoint.get_file_path(digest, "other/"))
+
+        with open(csv_path, 'a') as csv_file:
+            csv_file.write("a,https://a.com,user,password\n")
+        self.assertNotEqual(file_digest(csv_path), digest)
+
+    def test_incomplete_line_is_ignored(self):
+        checkpoint = ImportCheckpoint(self.file_path)
+        checkpoint.open()
+        checkpoint.add(1)
+        checkpoint.add(2)
+        checkpoint.close()
+        with open(self.file_path, 'a') as journal_file:
+            journal_file.write("3")
+
+        checkpoint = ImportCheckpoint(self.file_path)
+        self.assertEqual(checkpoint.load(), 2)
+        checkpoint.open(resume=True)
+        checkpoint.add(4)
+        checkpoint.close()
+
+        checkpoint = ImportCheckpoint(self.file_path)
+        self.assertEqual(checkpoint.load(), 3)
+        self.assertTrue(checkpoint.contains(4))
+        self.assertFalse(checkpoint.contains(3))
+
+    def test_resume(self):
+        def create_entries() -> list:
+            # the passwords of imported entries are wiped
+            return [create_entry("https://site%s.com" % i, "user", str(i)) for i in range(1, 11)]
+
+        checkpoint = ImportCheckpoint(self.file_path)
+        checkpoint.open()
+        backend = RecordingBackend(fail_on="6")
+        with self.assertRaises(ValueError):
+            import_entries(create_entries(), backend, "/", checkpoint=checkpoint)
+        checkpoint.close()
+
+        checkpoint = ImportCheckpoint(self.file_path)
+        self.assertEqual(checkpoint.load(), 5)
+        checkpoint.open(resume=True)
+        backend = RecordingBackend()
+        import_entries(create_entries(), backend, "/", checkpoint=checkpoint)
+        checkpoint.remove()
+
+        self.assertEqual([password for path, password in backend.stored], [str(i) for i in range(6, 11)])
+        self.assertFalse(os.path.exists(self.file_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import csv
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from gopass_chrome_importer import chunked_csv, gopass_chrome_importer
+from gopass_chrome_importer.chunked_csv import find_record_boundaries, iter_csv_chunked
+from gopass_chrome_importer.secret_path import create_secret_path
+from tests import DUMMY_FILE_PATH
+from tests.benchmark.export_generator import generate_export
+
+# values that are hard to split: quoted newlines (with the line ending of the file), quotes and commas
+TRICKY_ROWS = [
+    ["multi\nline", "https://a.com", "user", 'pass"word\n,"'],
+    ["", "https://b.com/login", "", "\r\n\"\n"],
+    ["ö", "android://key==@com.example.app/", "user", "\"\"\n\"\""],
+    ["", "http://192.168.0.1:8080", "admin", ",\n,\n,"]
+]
+
+
+class ChunkedCsvTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "export.csv")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_record_boundaries(self):
+        data = b'a,b\n"x\ny",z\n"q""\n",1\nlast'
+
+        chunks = find_record_boundaries(data, 4, len(data), 1)
+
+        self.assertEqual([data[start:end] for start, end in chunks], [b'"x\ny",z\n', b'"q""\n",1\n', b"last"])
+
+    def test_identical_to_serial_parsing(self):
+        generate_export(self.path, 500, seed=1)
+        for line_ending in ["\n", "\r\n"]:
+            with open(self.path, 'a', newline='') as file:
+                writer = csv.writer(file, lineterminator=line_ending)
+                for _ in range(50):
+                    writer.writerows(TRICKY_ROWS)
+
+            self._assert_identical(self.path)
+
+    def test_dummy_file(self):
+        self._assert_identical(DUMMY_FILE_PATH)
+
+    def test_empty_file(self):
+        open(self.path, 'w').close()
+
+        self.assertEqual(list(iter_csv_chunked(self.path, 2, gopass_chrome_importer._find_csv_columns)), [])
+
+    def test_bounded_chunks_in_flight(self):
+        generate_export(self.path, 500, seed=1)
+        counts = {"submitted": 0, "consumed": 0, "max_in_flight": 0}
+
+        class RecordingExecutor(ThreadPoolExecutor):
+            def submit(self, *args, **kwargs):
+                counts["submitted"] += 1
+                counts["max_in_flight"] = max(counts["max_in_flight"], counts["submitted"] - counts["consumed"])
+                future = super().submit(*args, **kwargs)
+                result = future.result
+
+                def consume(*result_args):
+                    counts["consumed"] += 1
+                    return result(*result_args)
+
+                future.result = consume
+                return future
+
+        with mock.patch.object(chunked_csv, "ProcessPoolExecutor", RecordingExecutor):
+            entries = list(iter_csv_chunked(self.path, 2, gopass_chrome_importer._find_csv_columns, chunk_size=64))
+
+        self.assertEqual(len(entries), 500)
+        self.assertGreater(counts["submitted"], 2 * chunked_csv.MAX_CHUNKS_AHEAD_PER_JOB)
+        self.assertEqual(counts["max_in_flight"], 2 * chunked_csv.MAX_CHUNKS_AHEAD_PER_JOB)
+
+    def test_unsupported_paths(self):
+        for path in ["-", "export.csv.gz", "export.csv.zst"]:
+            with self.assertRaises(ValueError):
+                gopass_chrome_importer._check_parse_jobs(path, 2)
+            gopass_chrome_importer._check_parse_jobs(path, 1)
+
+    def _assert_identical(self, path: str):
+        serial = gopass_chrome_importer._read_csv(path)
+        for jobs, chunk_size in [(1, 64), (2, 64), (3, 1000), (2, None)]:
+            chunked = list(iter_csv_chunked(path, jobs, gopass_chrome_importer._find_csv_columns,
+                                            base_path="imported/", chunk_size=chunk_size))
+
+            self.assertEqual([entry.to_dict() for entry in chunked], [entry.to_dict() for entry in serial])
+            self.assertEqual([entry.secret_path for entry in chunked],
+                             [create_secret_path("imported/", entry.name, entry.url, entry.username)
+                              for entry in serial])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from gopass_chrome_importer import gopass_chrome_importer
+from gopass_chrome_importer.const import KEY_NAME, KEY_URL, KEY_USERNAME, KEY_PASSWORD
+from tests import DUMMY_FILE_PATH
+
+
+class CsvReaderTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_dummy_file(self):
+        entries = gopass_chrome_importer._read_csv(DUMMY_FILE_PATH)
+
+        self.assertEqual(len(entries), 9)
+        self.assertEqual(entries[0].to_dict(), {
+            KEY_NAME: "127.0.0.1",
+            KEY_URL: "http://127.0.0.1:1234/login.wft",
+            KEY_USERNAME: "",
+            KEY_PASSWORD: "ABCD1"
+        })
+        self.assertEqual(entries[7].password, '56vHI"O,,,ö#"&,.')
+
+    def test_is_lazy(self):
+        entries = gopass_chrome_importer._iter_csv(DUMMY_FILE_PATH)
+
+        self.assertEqual(next(entries).password, "ABCD1")
+
+    def test_columns_by_header_name(self):
+        path = self._write("export.csv", "password,username,note,url,name\nsecret,user,,https://www.google.de,Google\n")
+
+        entries = gopass_chrome_importer._read_csv(path)
+
+        self.assertEqual([entry.to_dict() for entry in entries], [{
+            KEY_NAME: "Google",
+            KEY_URL: "https://www.google.de",
+            KEY_USERNAME: "user",
+            KEY_PASSWORD: "secret"
+        }])
+
+    def test_missing_column(self):
+        path = self._write("export.csv", "name,url,password\n")
+
+        with self.assertRaises(ValueError):
+            gopass_chrome_importer._read_csv(path)
+
+    def test_empty_file(self):
+        path = self._write("export.csv", "")
+
+        self.assertEqual(gopass_chrome_importer._read_csv(path), [])
+
+    def test_gzip(self):
+        path = os.path.join(self.tmp_dir.name, "export.csv.gz")
+        with open(DUMMY_FILE_PATH, 'rb') as source, gzip.open(path, 'wb') as target:
+            shutil.copyfileobj(source, target)
+
+        self.assertEqual(gopass_chrome_importer._read_csv(path), gopass_chrome_importer._read_csv(DUMMY_FILE_PATH))
+
+    def _write(self, file_name: str, content: str) -> str:
+        path = os.path.join(self.tmp_dir.name, file_name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+
+if __name__ == '__main__':
+    unittest.main()
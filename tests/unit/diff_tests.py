@@ -0,0 +1,53 @@
+import unittest
+
+from gopass_chrome_importer import gopass_chrome_importer
+from gopass_chrome_importer.executor import CommandError
+from gopass_chrome_importer.store_hook import create_secret_content
+from gopass_chrome_importer.store_index import StoreIndex
+from tests.unit import create_entry
+
+
+class DiffTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def test_diff(self):
+        contents = {
+            "imported/website/identical.com/user": create_secret_content("password", "user") + "\n",
+            "imported/website/changed.com/user": create_secret_content("old", "user"),
+            "imported/website/removed.com/user": create_secret_content("password", "user"),
+            "other/website/new.com/user": create_secret_content("password", "user"),
+            "imported/website/unreadable.com/user": None
+        }
+        entries = [create_entry("https://new.com", "user", "password"),
+                   create_entry("https://identical.com", "user", "password"),
+                   create_entry("https://changed.com", "user", "new"),
+                   create_entry("https://changed.com/login", "user", "newer"),
+                   create_entry("https://unreadable.com", "user", "password")]
+        read_paths = []
+
+        def read_secret(secret_path: str) -> str:
+            read_paths.append(secret_path)
+            if contents[secret_path] is None:
+                raise CommandError(["gopass", "show", secret_path], 1)
+            return contents[secret_path]
+
+        diff = gopass_chrome_importer._diff_store(entries, "imported/", StoreIndex(contents.keys()), read_secret,
+                                                  jobs=2)
+
+        self.assertEqual(diff, {
+            gopass_chrome_importer.DIFF_NEW: ["imported/website/new.com/user"],
+            gopass_chrome_importer.DIFF_CHANGED: ["imported/website/changed.com/user"],
+            gopass_chrome_importer.DIFF_IDENTICAL: ["imported/website/identical.com/user"],
+            gopass_chrome_importer.DIFF_STORE_ONLY: ["imported/website/removed.com/user"],
+            gopass_chrome_importer.DIFF_UNREADABLE: ["imported/website/unreadable.com/user"]
+        })
+        # only existing secrets that are part of the export are read
+        self.assertEqual(sorted(read_paths), ["imported/website/changed.com/user",
+                                              "imported/website/identical.com/user",
+                                              "imported/website/unreadable.com/user"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import tempfile
+import unittest
+
+from gopass_chrome_importer.editor_server import EditorServer
+
+
+class EditorServerTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.processed = []
+        self.server = EditorServer(handler=lambda file_path, entry: self.processed.append((file_path, entry)))
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_shim_forwards_file(self):
+        token = self.server.register("entry")
+
+        with tempfile.NamedTemporaryFile() as file:
+            exit_code = self._run_shim(token, file.name)
+
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(self.processed, [(file.name, "entry")])
+
+    def test_unknown_token(self):
+        token = self.server.register("entry")
+        self.server.unregister(token)
+
+        exit_code = self._run_shim(token, "/dev/null")
+
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(self.processed, [])
+
+    def _run_shim(self, token: str, file_path: str) -> int:
+        env = dict(os.environ)
+        env.update(self.server.get_environment(token))
+        return subprocess.call("%s %s" % (self.server.get_editor_command(), file_path), shell=True, env=env)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from gopass_chrome_importer.engine import DUPLICATE_POLICY_FIRST
+from gopass_chrome_importer.entry import SecretEntry
+from tests.unit import RecordingBackend, import_entries
+
+
+class SecretEntryTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def test_wipe(self):
+        entry = SecretEntry("Google", "https://www.google.de", "user", "secret")
+        buffer = entry._password
+
+        entry.wipe()
+
+        self.assertEqual(buffer, bytearray(len("secret")))
+        self.assertEqual(entry.password, "")
+        self.assertEqual(entry.username, "user")
+
+    def test_repr_hides_password(self):
+        entry = SecretEntry("Google", "https://www.google.de", "user", "secret")
+
+        self.assertNotIn("secret", repr(entry))
+        self.assertEqual(entry.password, "secret")
+
+    def test_has_no_dict(self):
+        entry = SecretEntry("Google", "https://www.google.de", "user", "secret")
+
+        with self.assertRaises(AttributeError):
+            entry.note = "note"
+
+    def test_entries_are_wiped_after_import(self):
+        entries = [SecretEntry("", "https://a.com", "user", "1"), SecretEntry("", "https://b.com", "user", "2"),
+                   SecretEntry("", "https://a.com/login", "user", "3")]
+        backend = RecordingBackend()
+
+        import_entries(entries, backend, "/", jobs=2, duplicate_policy=DUPLICATE_POLICY_FIRST)
+
+        self.assertEqual(sorted(backend.stored), [("/website/a.com/user", "1"), ("/website/b.com/user", "2")])
+        # including the ignored duplicate
+        self.assertEqual([entry.password for entry in entries], ["", "", ""])
+
+
+if __name__ == '__main__':
+    unittest.main()
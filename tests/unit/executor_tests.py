@@ -0,0 +1,61 @@
+import sys
+import unittest
+
+from gopass_chrome_importer.executor import CommandExecutor, CommandError
+
+
+class ExecutorTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.executor = CommandExecutor()
+
+    def test_capture_output(self):
+        output = self.executor.run([sys.executable, "-c", "import sys; print(sys.argv[1])", "it's \"quoted\""],
+                                   capture_output=True)
+
+        self.assertEqual(output, "it's \"quoted\"\n")
+
+    def test_input_data(self):
+        output = self.executor.run([sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read())"],
+                                   input_data="line 1\nline 2", capture_output=True)
+
+        self.assertEqual(output, "line 1\nline 2")
+
+    def test_error(self):
+        with self.assertRaises(CommandError) as context:
+            self.executor.run([sys.executable, "-c", "import sys; sys.stderr.write('broken'); sys.exit(3)"])
+
+        self.assertEqual(context.exception.exit_code, 3)
+        self.assertEqual(context.exception.stderr, "broken")
+        self.assertIn("broken", str(context.exception))
+        # existing callers handle ValueError
+        self.assertIsInstance(context.exception, ValueError)
+
+    def test_statistics(self):
+        script = "import sys; sys.exit(int(sys.argv[1]))"
+        self.executor.run([sys.executable, "-c", script, "0"])
+        self.executor.run([sys.executable, "-I", "-c", script, "0"])
+        with self.assertRaises(CommandError):
+            self.executor.run([sys.executable, "-c", script, "1"])
+
+        statistics = self.executor.get_statistics()
+        name = "%s %s" % (sys.executable, script)
+
+        self.assertEqual(list(statistics.keys()), [name])
+        self.assertEqual(statistics[name].count, 3)
+        self.assertEqual(statistics[name].failed, 1)
+        self.assertGreater(statistics[name].total, 0)
+        self.assertGreaterEqual(statistics[name].max, statistics[name].average)
+
+    def test_command_name(self):
+        self.assertEqual(self.executor._command_name(["gopass", "--yes", "edit", "--create", "a/b"]), "gopass edit")
+
+        executor = CommandExecutor(run_as="user")
+        self.assertEqual(executor._command_name(["sudo", "-u", "user", "gopass", "show", "a/b"]), "gopass show")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from gopass_chrome_importer.filters import EntryFilter, FILTER_INCLUDED, FILTER_EXCLUDED
+from tests.unit import RecordingBackend, create_entry, import_entries
+
+
+class EntryFilterTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def test_include(self):
+        entry_filter = EntryFilter(includes=["host:*.example.com", "category:android"])
+
+        self.assertTrue(entry_filter.accepts("website/mail.example.com", "user"))
+        self.assertTrue(entry_filter.accepts("android/com.example.app", "user"))
+        self.assertFalse(entry_filter.accepts("website/example.com", "user"))
+        self.assertFalse(entry_filter.accepts("ip/10.0.0.1", "user"))
+        self.assertEqual(entry_filter.get_counts(), [(FILTER_INCLUDED, "host:*.example.com", 1),
+                                                     (FILTER_INCLUDED, "category:android", 1)])
+        self.assertEqual(entry_filter.not_included_count, 2)
+
+    def test_exclude(self):
+        entry_filter = EntryFilter(excludes=[r"host:re:^(10|192\.168)\.", "username:admin*"])
+
+        self.assertFalse(entry_filter.accepts("ip/192.168.0.1:8080", "user"))
+        self.assertFalse(entry_filter.accepts("ip/10.0.0.1", "user"))
+        self.assertFalse(entry_filter.accepts("website/example.com", "administrator"))
+        self.assertTrue(entry_filter.accepts("ip/8.8.8.8", "user"))
+        # regular expressions match anywhere, globs the whole value
+        self.assertTrue(entry_filter.accepts("website/example.com", "the-admin"))
+        self.assertEqual(entry_filter.get_counts(), [(FILTER_EXCLUDED, r"host:re:^(10|192\.168)\.", 2),
+                                                     (FILTER_EXCLUDED, "username:admin*", 1)])
+
+    def test_invalid_filters(self):
+        for value in ["*.example.com", "url:*.example.com", "host:re:(unclosed"]:
+            with self.assertRaises(ValueError, msg=value):
+                EntryFilter(includes=[value])
+
+    def test_filtered_entries_are_not_stored(self):
+        entries = [create_entry("https://a.example.com", "user", "1"), create_entry("https://b.com", "user", "2"),
+                   create_entry("http://192.168.0.1/login", "user", "3"),
+                   create_entry("https://c.example.com", "admin", "4")]
+        entry_filter = EntryFilter(includes=["host:*.example.com", "category:ip"], excludes=["username:admin"])
+        backend = RecordingBackend()
+
+        import_entries(entries, backend, "/", entry_filter=entry_filter)
+
+        self.assertEqual(backend.stored, [("/website/a.example.com/user", "1"), ("/ip/192.168.0.1/user", "3")])
+        self.assertEqual(entries[1].password, "")
+
+
+if __name__ == '__main__':
+    unittest.main()
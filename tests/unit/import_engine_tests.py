@@ -0,0 +1,158 @@
+import time
+import unittest
+
+from gopass_chrome_importer.engine import DUPLICATE_POLICIES, DUPLICATE_POLICY_SUFFIX, ENGINE_ASYNCIO
+from gopass_chrome_importer.executor import CommandError
+from gopass_chrome_importer.mounts import MountMap
+from tests.unit import CommandBackend, RecordingBackend, create_entry, import_entries
+
+
+class ImportEngineTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def test_sequential(self):
+        entries = [create_entry("https://a.com", "user", "1"), create_entry("https://b.com", "user", "2")]
+        backend = RecordingBackend()
+
+        import_entries(entries, backend, "/", jobs=1)
+
+        self.assertEqual(backend.stored, [("/website/a.com/user", "1"), ("/website/b.com/user", "2")])
+
+    def test_parallel_keeps_same_path_serialized(self):
+        entries = []
+        for i in range(20):
+            entries.append(create_entry("https://site%s.com" % (i % 5), "user", str(i)))
+        backend = RecordingBackend()
+
+        import_entries(entries, backend, "/", jobs=8)
+
+        self.assertEqual(backend.overlapping_writes, [])
+        self.assertEqual(len(backend.stored), len(entries))
+        # writes to the same path keep the order of the csv file
+        for i in range(5):
+            passwords = [password for path, password in backend.stored if path == "/website/site%s.com/user" % i]
+            self.assertEqual(passwords, [str(j) for j in range(i, 20, 5)])
+
+    def test_parallel_raises_errors(self):
+        entries = [create_entry("https://site%s.com" % i, "user", str(i)) for i in range(10)]
+        backend = RecordingBackend(fail_on="3")
+
+        with self.assertRaises(ValueError):
+            import_entries(entries, backend, "/", jobs=4)
+
+    def test_parallel_wipes_skipped_entries(self):
+        entries = [create_entry("https://a.com", "user", str(i)) for i in range(4)]
+        backend = RecordingBackend(fail_on="0")
+
+        with self.assertRaises(ValueError):
+            import_entries(entries, backend, "/", jobs=2)
+        # the later writes to the same secret are skipped
+        self.assertEqual(backend.stored, [("/website/a.com/user", "0")])
+        self.assertEqual([entry.password for entry in entries], [""] * len(entries))
+
+    def test_duplicates_are_merged(self):
+        for policy in DUPLICATE_POLICIES:
+            entries = [create_entry("https://a.com", "user", "1"), create_entry("http://a.com/login", "user", "1"),
+                       create_entry("https://b.com", "user", "2")]
+            backend = RecordingBackend()
+            import_entries(entries, backend, "/", duplicate_policy=policy)
+            self.assertEqual(backend.stored, [("/website/a.com/user", "1"), ("/website/b.com/user", "2")])
+
+    def test_conflict_policies(self):
+        expected = {
+            "first": [("/website/a.com/user", "1"), ("/website/b.com/user", "2")],
+            "last": [("/website/a.com/user", "3"), ("/website/b.com/user", "2")],
+            "suffix": [("/website/a.com/user", "1"), ("/website/b.com/user", "2"),
+                       ("/website/a.com/user-2", "3"), ("/website/a.com/user-3", "4")]
+        }
+
+        for policy, stored in expected.items():
+            entries = [create_entry("https://a.com", "user", "1"), create_entry("https://b.com", "user", "2"),
+                       create_entry("http://a.com/login", "user", "3"), create_entry("https://a.com:443", "user", "4"),
+                       create_entry("https://www.a.com", "user", "3")]
+            backend = RecordingBackend()
+            import_entries(entries, backend, "/", jobs=4, duplicate_policy=policy)
+            self.assertEqual(sorted(backend.stored), sorted(stored), policy)
+
+    def test_suffix_does_not_take_the_path_of_a_later_row(self):
+        entries = [create_entry("https://a.com", "user", "1"), create_entry("https://a.com", "user", "2"),
+                   create_entry("https://a.com", "user-2", "3"), create_entry("https://a.com", "user", "2")]
+        backend = RecordingBackend()
+
+        context = import_entries(entries, backend, "/", duplicate_policy=DUPLICATE_POLICY_SUFFIX)
+
+        self.assertEqual(sorted(backend.stored), [("/website/a.com/user", "1"), ("/website/a.com/user-2", "3"),
+                                                  ("/website/a.com/user-3", "2")])
+        # every entry is counted once
+        infos = context.summary_manager.read_from_filesystem()["infos"]
+        self.assertIn("Duplicate entries merged: 1", infos)
+        self.assertIn("Conflicting entries resolved using the \"suffix\" policy: 1", infos)
+        context.close()
+
+    def test_asyncio_engine_keeps_same_path_serialized(self):
+        entries = [create_entry("https://site%s.com" % (i % 5), "user", str(i)) for i in range(20)]
+        backend = RecordingBackend()
+
+        import_entries(entries, backend, "/", jobs=8, engine=ENGINE_ASYNCIO)
+
+        self.assertEqual(backend.overlapping_writes, [])
+        for i in range(5):
+            passwords = [password for path, password in backend.stored if path == "/website/site%s.com/user" % i]
+            self.assertEqual(passwords, [str(j) for j in range(i, 20, 5)])
+
+    def test_asyncio_engine_runs_calls_concurrently(self):
+        entries = [create_entry("https://site%s.com" % i, "user", str(i)) for i in range(8)]
+        backend = CommandBackend()
+
+        start = time.perf_counter()
+        import_entries(entries, backend, "/", jobs=8, engine=ENGINE_ASYNCIO)
+
+        self.assertEqual(sorted(password for path, password in backend.stored), [str(i) for i in range(8)])
+        # 8 calls of at least 200ms each
+        self.assertLess(time.perf_counter() - start, 1.2)
+
+    def test_asyncio_engine_raises_errors(self):
+        entries = [create_entry("https://site%s.com" % i, "user", "fail" if i == 3 else str(i)) for i in range(10)]
+        backend = CommandBackend()
+
+        with self.assertRaises(CommandError):
+            import_entries(entries, backend, "/", jobs=2, engine=ENGINE_ASYNCIO)
+
+    def test_asyncio_engine_wipes_skipped_entries(self):
+        entries = [create_entry("https://a.com", "user", "fail" if i == 0 else str(i)) for i in range(4)]
+        backend = CommandBackend()
+
+        with self.assertRaises(CommandError):
+            import_entries(entries, backend, "/", jobs=2, engine=ENGINE_ASYNCIO)
+        self.assertEqual(backend.stored, [])
+        self.assertEqual([entry.password for entry in entries], [""] * len(entries))
+
+    def test_sharded_keeps_mount_order(self):
+        entries = [create_entry("https://site%s.com" % (i % 3), "user%s" % i, str(i)) for i in range(30)]
+        backend = RecordingBackend()
+        mount_map = MountMap(["website/site0.com", "website/site1.com"])
+
+        import_entries(entries, backend, "/", jobs=3, mount_map=mount_map)
+
+        self.assertEqual(len(backend.stored), len(entries))
+        # writes to the same mount keep the order of the csv file
+        for i in range(3):
+            passwords = [password for path, password in backend.stored if path.startswith("/website/site%s.com/" % i)]
+            self.assertEqual(passwords, [str(j) for j in range(i, 30, 3)])
+
+    def test_sharded_raises_errors(self):
+        entries = [create_entry("https://site%s.com" % (i % 2), "user%s" % i, str(i)) for i in range(10)]
+        backend = RecordingBackend(fail_on="3")
+
+        with self.assertRaises(ValueError):
+            import_entries(entries, backend, "/", jobs=2, mount_map=MountMap(["website/site1.com"]))
+        # the mount of the failed entry stops writing
+        self.assertNotIn("5", [password for path, password in backend.stored])
+        # including the entries that have not been written
+        self.assertEqual([entry.password for entry in entries], [""] * len(entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
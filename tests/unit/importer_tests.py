@@ -0,0 +1,146 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from gopass_chrome_importer.backends import EditStoreBackend, InsertStoreBackend
+from gopass_chrome_importer.checkpoint import ImportCheckpoint
+from gopass_chrome_importer.const import KEY_NAME, KEY_URL, KEY_USERNAME, KEY_PASSWORD
+from gopass_chrome_importer.context import ImportContext
+from gopass_chrome_importer.engine import DUPLICATE_POLICY_FIRST, ENGINE_ASYNCIO
+from gopass_chrome_importer.importer import Importer, RowResult
+from gopass_chrome_importer.store_hook import StoreResult, create_secret_content
+from gopass_chrome_importer.store_index import StoreIndex, content_digest
+from gopass_chrome_importer.verify import VERIFY_OK
+from tests.benchmark import FakeGopass
+from tests.unit import CommandBackend, RecordingBackend, ResultBackend, create_entry
+
+
+class ImporterTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def test_results(self):
+        rows = [
+            {KEY_NAME: "", KEY_URL: "https://site%s.com" % i, KEY_USERNAME: "user", KEY_PASSWORD: str(i)}
+            for i in range(10)
+        ]
+        rows[3] = create_entry("https://site0.com", "user", "0")
+        backend = ResultBackend()
+
+        report = Importer(backend, "/", jobs=4, duplicate_policy=DUPLICATE_POLICY_FIRST).run(iter(rows))
+
+        self.assertTrue(backend.opened and backend.closed)
+        self.assertEqual(report.rows, 10)
+        # the duplicate of the first row is not passed to the backend
+        self.assertEqual([row_result.row for row_result in report.results], [1, 2, 3, 5, 6, 7, 8, 9, 10])
+        self.assertEqual(report.results[1].secret_path, "/website/site1.com/user")
+        self.assertTrue(all(isinstance(row_result, RowResult) and row_result.stored and row_result.duration >= 0
+                            for row_result in report.results))
+        self.assertEqual(report.count_results()[StoreResult.IMPORTED], 9)
+        self.assertGreaterEqual(report.duration, max(row_result.duration for row_result in report.results))
+
+    def test_run_async(self):
+        backend = CommandBackend()
+        importer = Importer(backend, "/", jobs=4, engine=ENGINE_ASYNCIO)
+        rows = [create_entry("https://site%s.com" % i, "user", str(i)) for i in range(4)]
+
+        # the import is awaited by the event loop of the caller
+        loop = asyncio.new_event_loop()
+        try:
+            report = loop.run_until_complete(importer.run_async(rows))
+        finally:
+            loop.close()
+
+        self.assertEqual([row_result.row for row_result in report.results], [1, 2, 3, 4])
+        self.assertEqual(sorted(password for path, password in backend.stored), ["0", "1", "2", "3"])
+
+        with self.assertRaises(ValueError):
+            Importer(backend, "/").run_async(rows)
+
+    def test_skipped_without_gopass(self):
+        store_index = StoreIndex(["website/a.com/user"])
+        store_index.add("website/a.com/user", content_digest(create_secret_content("1", "user")))
+        backend = ResultBackend(store_index=store_index)
+
+        report = Importer(backend, "/", store_index=store_index, compare_content=True).run(
+            [create_entry("https://a.com", "user", "1"), create_entry("https://b.com", "user", "2")])
+
+        self.assertEqual([(row_result.result, row_result.stored) for row_result in report.results],
+                         [(StoreResult.IDENTICAL, False), (StoreResult.IMPORTED, True)])
+
+    def test_environment_is_unchanged(self):
+        with FakeGopass() as fake_gopass:
+            environment = dict(os.environ)
+            report = Importer(EditStoreBackend(yes=True), "imported/").run([create_entry("https://a.com", "user", "1")])
+
+            self.assertEqual(dict(os.environ), environment)
+            self.assertEqual([row_result.result for row_result in report.results], [StoreResult.IMPORTED])
+            self.assertEqual(fake_gopass.read_secret("imported/website/a.com/user"),
+                             create_secret_content("1", "user"))
+
+    def test_dry_run(self):
+        store_index = StoreIndex([])
+        backend = InsertStoreBackend(dry_run=True, store_index=store_index)
+
+        report = Importer(backend, "/").run([create_entry("https://a.com", "user", "1")])
+
+        self.assertEqual([row_result.result for row_result in report.results], [StoreResult.DRY_RUN])
+
+    def test_checkpoint(self):
+        def create_rows() -> list:
+            return [create_entry("https://site%s.com" % i, "user", str(i)) for i in range(1, 5)]
+
+        messages = []
+        context = ImportContext(printer=lambda text, color, err: messages.append((text, err)))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "checkpoint.log")
+
+            with self.assertRaises(ValueError):
+                Importer(RecordingBackend(fail_on="3"), "/", checkpoint=ImportCheckpoint(file_path),
+                         context=context).run(create_rows())
+            self.assertTrue(os.path.exists(file_path))
+            self.assertTrue(messages[-1][1])
+
+            backend = RecordingBackend()
+            Importer(backend, "/", checkpoint=ImportCheckpoint(file_path), resume=True, context=context).run(
+                create_rows())
+            self.assertEqual([password for path, password in backend.stored], ["3", "4"])
+            self.assertFalse(os.path.exists(file_path))
+
+    def test_verify(self):
+        with FakeGopass():
+            report = Importer(InsertStoreBackend(yes=True), "imported/", verify=True).run(
+                [create_entry("https://a.com", "user", "1")])
+
+        self.assertEqual(report.verified[VERIFY_OK], ["imported/website/a.com/user"])
+
+    def test_shard_mounts_requires_threads(self):
+        with self.assertRaises(ValueError):
+            Importer(ResultBackend(), shard_mounts=True, engine=ENGINE_ASYNCIO)
+
+    def test_context_close_removes_journal(self):
+        with ImportContext() as context:
+            Importer(RecordingBackend(), base_path="/", context=context).run(
+                [create_entry("https://a.com", "user", "1")])
+            context.echo("warning", warn=True)
+            journal_path = context.summary_manager.get_tmp_file_path()
+            self.assertTrue(os.path.isfile(journal_path))
+
+        self.assertFalse(os.path.exists(journal_path))
+        # closing twice does not fail
+        context.close()
+
+    def test_without_command_line_interface(self):
+        script = "import sys, gopass_chrome_importer.importer; print(','.join(sorted(sys.modules.keys())))"
+        modules = subprocess.check_output([sys.executable, "-c", script]).decode().strip().split(",")
+
+        self.assertNotIn("click", modules)
+        self.assertNotIn("gopass_chrome_importer.gopass_chrome_importer", modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+from gopass_chrome_importer.manifest import ImportManifest
+
+
+class ManifestTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store_root = os.path.join(self.tmp_dir.name, "store")
+        os.makedirs(self.store_root)
+        self.manifest_path = os.path.join(self.tmp_dir.name, "cache", "manifest.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_roundtrip(self):
+        manifest = ImportManifest(self.manifest_path)
+        manifest.add("website/google.de/user", "password")
+        manifest.save()
+
+        loaded = ImportManifest(self.manifest_path)
+
+        self.assertTrue(loaded.load())
+        self.assertTrue(loaded.contains("website/google.de/user", "password"))
+        self.assertFalse(loaded.contains("website/google.de/user", "other"))
+        self.assertFalse(loaded.contains("website/google.de/other", "password"))
+
+    def test_secrets_are_not_stored(self):
+        manifest = ImportManifest(self.manifest_path)
+        manifest.add("website/google.de/user", "password")
+        manifest.save()
+
+        with open(self.manifest_path) as manifest_file:
+            content = manifest_file.read()
+
+        self.assertNotIn("password", content)
+        self.assertNotIn("google", content)
+
+    def test_overwritten_secret(self):
+        manifest = ImportManifest(self.manifest_path)
+        manifest.add("website/google.de/user", "old")
+        manifest.add("website/google.de/user", "new")
+
+        self.assertFalse(manifest.contains("website/google.de/user", "old"))
+        self.assertTrue(manifest.contains("website/google.de/user", "new"))
+
+    def test_changed_secrets_are_dropped(self):
+        mount_root = os.path.join(self.tmp_dir.name, "mount")
+        for file_path in [os.path.join(self.store_root, "website", "a.com", "user.gpg"),
+                          os.path.join(self.store_root, "website", "b.com", "user.age"),
+                          os.path.join(mount_root, "website", "a.com", "user.gpg")]:
+            self._write(file_path, "secret")
+        manifest = ImportManifest(self.manifest_path, store_root=self.store_root, mounts={"work": mount_root})
+        for secret_path in ["website/a.com/user", "website/b.com/user", "work/website/a.com/user"]:
+            manifest.add(secret_path, "password")
+        manifest.save()
+
+        # changed by hand, an unrelated secret and a secret of the mount
+        self._write(os.path.join(self.store_root, "website", "a.com", "user.gpg"), "changed secret")
+        self._write(os.path.join(self.store_root, "other.gpg"), "unrelated")
+        self._write(os.path.join(mount_root, "website", "a.com", "user.gpg"), "changed secret")
+
+        loaded = ImportManifest(self.manifest_path, store_root=self.store_root, mounts={"work": mount_root})
+        self.assertTrue(loaded.load())
+        self.assertFalse(loaded.contains("website/a.com/user", "password"))
+        self.assertTrue(loaded.contains("website/b.com/user", "password"))
+        self.assertFalse(loaded.contains("work/website/a.com/user", "password"))
+
+    def test_secret_file_path(self):
+        manifest = ImportManifest(self.manifest_path, store_root=self.store_root, mounts={"work": "/mnt/work"})
+
+        self.assertEqual(manifest.get_secret_file_path("/imported/website/a.com/user"),
+                         os.path.join(self.store_root, "imported", "website", "a.com", "user"))
+        self.assertEqual(manifest.get_secret_file_path("work/website/a.com/user"),
+                         os.path.join("/mnt/work", "website", "a.com", "user"))
+        self.assertEqual(manifest.get_secret_file_path("workshop/user"),
+                         os.path.join(self.store_root, "workshop", "user"))
+
+    @staticmethod
+    def _write(file_path: str, content: str):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as secret_file:
+            secret_file.write(content)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from gopass_chrome_importer.mounts import MountMap, ROOT_MOUNT, parse_mounts
+
+
+class MountsTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def test_parse_mounts(self):
+        output = "gopass (/home/user/.password-store)\n" \
+                 "├── work (/home/user/.password-store-work)\n" \
+                 "└── work/team (/home/user/.password-store-team)\n"
+
+        self.assertEqual(parse_mounts(output), {
+            "work": "/home/user/.password-store-work",
+            "work/team": "/home/user/.password-store-team"
+        })
+
+    def test_parse_without_mounts(self):
+        self.assertEqual(parse_mounts("gopass (/home/user/.password-store)\n"), {})
+
+    def test_longest_mount_wins(self):
+        mount_map = MountMap(["work", "work/team"])
+
+        self.assertEqual(mount_map.get_mount("/work/team/website/a.com/user"), "work/team")
+        self.assertEqual(mount_map.get_mount("work/website/a.com/user"), "work")
+        self.assertEqual(mount_map.get_mount("workshop/website/a.com/user"), ROOT_MOUNT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 
-from gopass_chrome_importer import gopass_chrome_importer
-from gopass_chrome_importer.gopass_chrome_importer import UrlType
+from gopass_chrome_importer import secret_path
+from gopass_chrome_importer.secret_path import UrlType
 
 
 class PathTypeTests(unittest.TestCase):
@@ -34,7 +34,7 @@ class PathTypeTests(unittest.TestCase):
         self._assertType(url, UrlType.ANDROID)
 
     def _assertType(self, url: str, type: UrlType):
-        result = gopass_chrome_importer._find_type(url)
+        result = secret_path.find_type(url)
         self.assertEqual(result, type)
 
 
@@ -0,0 +1,98 @@
+import os
+import stat
+import tempfile
+import unittest
+
+from gopass_chrome_importer import gopass_chrome_importer
+from gopass_chrome_importer.plan import ImportPlan, PLAN_ACTION_CREATE, PLAN_ACTION_SKIP_IDENTICAL, \
+    PLAN_ACTION_CONFLICT, PLAN_ACTION_OVERWRITE
+from gopass_chrome_importer.store_hook import create_secret_content
+from gopass_chrome_importer.store_index import StoreIndex, content_digest
+from tests.benchmark import FakeGopass
+from tests.unit import RecordingBackend, import_entries
+
+CSV_CONTENT = "name,url,username,password\n" \
+              "a,https://a.com,user,new\n" \
+              "b,https://b.com,user,identical\n" \
+              "c,https://c.com,user,changed\n" \
+              "a,https://a.com/login,user,other\n"
+
+
+class PlanTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = os.path.join(self.tmp_dir.name, "export.csv")
+        self.plan_path = os.path.join(self.tmp_dir.name, "plan.jsonl")
+        with open(self.csv_path, 'w') as csv_file:
+            csv_file.write(CSV_CONTENT)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_save_and_load(self):
+        plan = ImportPlan(self.csv_path, "digest", "imported/", force=True)
+        plan.add(2, "imported/website/b.com/user", PLAN_ACTION_OVERWRITE)
+        plan.add(1, "imported/website/a.com/user", PLAN_ACTION_CREATE)
+        plan.save(self.plan_path)
+
+        loaded = ImportPlan.load(self.plan_path)
+
+        self.assertEqual(loaded.get_entries(), [(1, "imported/website/a.com/user", PLAN_ACTION_CREATE),
+                                                (2, "imported/website/b.com/user", PLAN_ACTION_OVERWRITE)])
+        self.assertEqual((loaded.csv_digest, loaded.base_path, loaded.force), ("digest", "imported/", True))
+        self.assertEqual(stat.S_IMODE(os.stat(self.plan_path).st_mode), 0o600)
+
+    def test_plan_action(self):
+        content = create_secret_content("password", "user")
+        store_index = StoreIndex(["website/a.com/user", "website/b.com/user"])
+        store_index.add("website/b.com/user", content_digest(content))
+        plan_action = gopass_chrome_importer._plan_action
+
+        self.assertEqual(plan_action("/website/new.com/user", content, store_index, None, False), PLAN_ACTION_CREATE)
+        self.assertEqual(plan_action("/website/b.com/user", content, store_index, None, False),
+                         PLAN_ACTION_SKIP_IDENTICAL)
+        self.assertEqual(plan_action("/website/a.com/user", content, store_index, None, False), PLAN_ACTION_CONFLICT)
+        self.assertEqual(plan_action("/website/a.com/user", content, store_index, None, True), PLAN_ACTION_OVERWRITE)
+        # unknown store
+        self.assertEqual(plan_action("/website/a.com/user", content, None, None, False), PLAN_ACTION_CREATE)
+
+    def test_plan_uses_a_single_gopass_call(self):
+        with FakeGopass() as gopass:
+            for secret_path, password in [("b", "identical"), ("c", "old")]:
+                file_path = os.path.join(gopass.store, "imported", "website", secret_path, "user.gpg")
+                os.makedirs(os.path.dirname(file_path))
+                with open(file_path, 'w') as secret_file:
+                    secret_file.write(create_secret_content(password, "user"))
+
+            calls_before = _count_calls()
+            plan = gopass_chrome_importer._plan_import(self.csv_path, "imported/")
+            calls = _count_calls() - calls_before
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(plan.get_entries(), [(1, "imported/website/a/user", PLAN_ACTION_CREATE),
+                                              (2, "imported/website/b/user", PLAN_ACTION_CONFLICT),
+                                              (3, "imported/website/c/user", PLAN_ACTION_CONFLICT)])
+
+    def test_apply_writes_planned_entries(self):
+        plan = ImportPlan(self.csv_path, "digest", "/")
+        plan.add(1, "/website/a.com/user", PLAN_ACTION_CREATE)
+        plan.add(2, "/website/b.com/user", PLAN_ACTION_SKIP_IDENTICAL)
+        plan.add(3, "/website/c.com/user", PLAN_ACTION_CONFLICT)
+        plan.add(4, "/website/a.com/user-2", PLAN_ACTION_CREATE)
+        backend = RecordingBackend()
+
+        import_entries(gopass_chrome_importer._iter_csv(self.csv_path), backend, "/", plan=plan)
+
+        self.assertEqual(backend.stored, [("/website/a.com/user", "new"), ("/website/a.com/user-2", "other")])
+
+
+def _count_calls() -> int:
+    return sum(statistics.count for statistics in gopass_chrome_importer.EXECUTOR.get_statistics().values())
+
+
+if __name__ == '__main__':
+    unittest.main()
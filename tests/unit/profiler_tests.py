@@ -0,0 +1,90 @@
+import json
+import os
+import tempfile
+import unittest
+
+from gopass_chrome_importer.profiler import Profiler, STAGE_PARSE, STAGE_STORE, STAGE_STORE_INTERNAL
+
+
+class ProfilerTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def test_disabled(self):
+        profiler = Profiler()
+
+        with profiler.entry(1, "imported/website/google.de/user"), profiler.measure(STAGE_STORE):
+            pass
+        profiler.record(STAGE_PARSE, 1.0, row=1)
+
+        report = profiler.create_report()
+        self.assertEqual(report["entries"], 0)
+        self.assertEqual(report["stages"], {})
+
+    def test_report(self):
+        profiler = Profiler()
+        profiler.enable()
+
+        for row in range(1, 101):
+            profiler.record(STAGE_PARSE, 0.001, row=row)
+            with profiler.entry(row, "imported/website/site%s/user" % row):
+                profiler.record(STAGE_STORE, row / 100)
+        profiler.finish()
+
+        report = profiler.create_report(slowest_count=3)
+        self.assertEqual(report["entries"], 100)
+
+        store = report["stages"][STAGE_STORE]
+        self.assertEqual(store["count"], 100)
+        self.assertAlmostEqual(store["mean"], 0.505)
+        self.assertAlmostEqual(store["p50"], 0.51)
+        self.assertAlmostEqual(store["p90"], 0.9)
+        self.assertAlmostEqual(store["p99"], 0.99)
+        self.assertAlmostEqual(store["max"], 1.0)
+
+        slowest = report["slowest_entries"]
+        self.assertEqual([entry["row"] for entry in slowest], [100, 99, 98])
+        self.assertEqual(slowest[0]["secret_path"], "imported/website/site100/user")
+        self.assertAlmostEqual(slowest[0]["total"], 1.001)
+
+    def test_merge_journal(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            journal_path = os.path.join(tmp_dir, "profile")
+
+            child = Profiler()
+            child.enable(journal_path=journal_path)
+            with child.entry(7, "imported/website/google.de/user"), child.measure(STAGE_STORE_INTERNAL):
+                pass
+
+            profiler = Profiler()
+            profiler.enable()
+            profiler.record(STAGE_STORE, 0.5, row=7, secret_path="imported/website/google.de/user")
+            profiler.merge_journal(journal_path)
+
+            self.assertFalse(os.path.exists(journal_path))
+            report = profiler.create_report()
+            self.assertEqual(report["entries"], 1)
+            self.assertEqual(set(report["slowest_entries"][0]["stages"].keys()), {STAGE_STORE, STAGE_STORE_INTERNAL})
+
+    def test_write_report(self):
+        profiler = Profiler()
+        profiler.enable()
+        profiler.record(STAGE_STORE, 0.5, row=1, secret_path="imported/website/google.de/user")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path = os.path.join(tmp_dir, "report.json")
+            profiler.write_report(json_path)
+            with open(json_path, 'r') as report_file:
+                self.assertEqual(json.load(report_file)["entries"], 1)
+
+            csv_path = os.path.join(tmp_dir, "report.csv")
+            profiler.write_report(csv_path)
+            with open(csv_path, 'r') as report_file:
+                lines = report_file.read().splitlines()
+            self.assertEqual(lines[0], "type,name,count,total,mean,p50,p90,p99,max")
+            self.assertIn("stage,store,1,0.5,0.5,0.5,0.5,0.5,0.5", lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from gopass_chrome_importer import gopass_chrome_importer
+from gopass_chrome_importer.store_hook import create_secret_content
 
 
 class SecretContentTests(unittest.TestCase):
@@ -14,7 +14,7 @@ class SecretContentTests(unittest.TestCase):
 
         expected = "{}\n---\nuser: {}".format(password, username)
 
-        content = gopass_chrome_importer._create_secret_content(
+        content = create_secret_content(
             username=username,
             password=password,
             mask_pw=False)
@@ -26,7 +26,7 @@ class SecretContentTests(unittest.TestCase):
 
         expected = password
 
-        content = gopass_chrome_importer._create_secret_content(
+        content = create_secret_content(
             password=password,
             mask_pw=False)
 
@@ -38,7 +38,7 @@ class SecretContentTests(unittest.TestCase):
 
         expected = "{}\n---\nuser: {}".format('*' * 10, username)
 
-        content = gopass_chrome_importer._create_secret_content(
+        content = create_secret_content(
             username=username,
             password=password,
             mask_pw=True)
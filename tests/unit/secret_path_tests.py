@@ -1,6 +1,6 @@
 import unittest
 
-from gopass_chrome_importer import gopass_chrome_importer
+from gopass_chrome_importer import secret_path
 
 
 class SecretPathTests(unittest.TestCase):
@@ -16,7 +16,7 @@ class SecretPathTests(unittest.TestCase):
 
         expected = "/website/{}/{}".format(name, username)
 
-        path = gopass_chrome_importer._create_secret_path(
+        path = secret_path.create_secret_path(
             base_path=base_path,
             name=name,
             username=username,
@@ -32,7 +32,7 @@ class SecretPathTests(unittest.TestCase):
 
         expected = "/website/google.de/{}".format(username)
 
-        path = gopass_chrome_importer._create_secret_path(
+        path = secret_path.create_secret_path(
             base_path=base_path,
             name=name,
             username=username,
@@ -48,7 +48,7 @@ class SecretPathTests(unittest.TestCase):
 
         expected = "/website/google.de:12345/{}".format(username)
 
-        path = gopass_chrome_importer._create_secret_path(
+        path = secret_path.create_secret_path(
             base_path=base_path,
             name=name,
             username=username,
@@ -64,7 +64,7 @@ class SecretPathTests(unittest.TestCase):
 
         expected = "/website/google.de/{}".format(username)
 
-        path = gopass_chrome_importer._create_secret_path(
+        path = secret_path.create_secret_path(
             base_path=base_path,
             name=name,
             username=username,
@@ -73,7 +73,7 @@ class SecretPathTests(unittest.TestCase):
         self.assertEqual(path, expected)
 
         url = "https://www.google.de:443"
-        path = gopass_chrome_importer._create_secret_path(
+        path = secret_path.create_secret_path(
             base_path=base_path,
             name=name,
             username=username,
@@ -89,7 +89,7 @@ class SecretPathTests(unittest.TestCase):
 
         expected = "/android/com.paypal.android.p2pmobile/{}".format(username)
 
-        path = gopass_chrome_importer._create_secret_path(
+        path = secret_path.create_secret_path(
             base_path=base_path,
             name=name,
             username=username,
@@ -105,7 +105,7 @@ class SecretPathTests(unittest.TestCase):
 
         expected = "/ip/127.0.0.1/{}".format(username)
 
-        path = gopass_chrome_importer._create_secret_path(
+        path = secret_path.create_secret_path(
             base_path=base_path,
             name=name,
             username=username,
@@ -121,7 +121,7 @@ class SecretPathTests(unittest.TestCase):
 
         expected = "/ip/127.0.0.1:8888/{}".format(username)
 
-        path = gopass_chrome_importer._create_secret_path(
+        path = secret_path.create_secret_path(
             base_path=base_path,
             name=name,
             username=username,
@@ -129,6 +129,15 @@ class SecretPathTests(unittest.TestCase):
 
         self.assertEqual(path, expected)
 
+    def test_site_is_cached(self):
+        url = "https://cached.example.com:443/login"
+        secret_path.format_site.cache_clear()
+
+        first = secret_path.format_site(url)
+        self.assertEqual(secret_path.format_site.cache_info().hits, 0)
+
+        self.assertEqual(secret_path.format_site(url), first)
+        self.assertEqual(secret_path.format_site.cache_info().hits, 1)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from gopass_chrome_importer.const import SUMMARY_TMP_FILE_ENV_VARIABLE_NAME, SECRET_PATH_ENV_VARIABLE_NAME, \
+    USERNAME_ENV_VARIABLE_NAME, PASSWORD_ENV_VARIABLE_NAME, STORE_RESULT_FILE_ENV_VARIABLE_NAME
+from gopass_chrome_importer.store_hook import StoreResult, create_secret_content
+from gopass_chrome_importer.summary_manager import SummaryManager
+
+# maximum time importing the modules used by a store_hook process may take (best of IMPORT_RUNS)
+IMPORT_TIME_BUDGET = 0.05
+IMPORT_RUNS = 3
+
+# modules that must never be imported by a store_hook process
+HEAVY_MODULES = ["click", "gopass_chrome_importer.gopass_chrome_importer", "csv", "pickle", "random", "shutil"]
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import gopass_chrome_importer.store_hook, gopass_chrome_importer.summary_manager, gopass_chrome_importer.profiler
+duration = time.perf_counter() - start
+print(duration)
+print(",".join(sorted(sys.modules.keys())))
+"""
+
+
+class StoreHookTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.summary_path = os.path.join(self.tmp_dir.name, "summary")
+        self.result_path = os.path.join(self.tmp_dir.name, "result")
+        self.secret_path = os.path.join(self.tmp_dir.name, "secret")
+        open(self.secret_path, 'w').close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _run_hook(self, *args: str) -> (int, str):
+        env = dict(os.environ)
+        env.update({
+            SUMMARY_TMP_FILE_ENV_VARIABLE_NAME: self.summary_path,
+            SECRET_PATH_ENV_VARIABLE_NAME: "imported/website/a.com/user",
+            USERNAME_ENV_VARIABLE_NAME: "user",
+            PASSWORD_ENV_VARIABLE_NAME: "password",
+            STORE_RESULT_FILE_ENV_VARIABLE_NAME: self.result_path
+        })
+        process = subprocess.Popen([sys.executable, "-m", "gopass_chrome_importer.store_hook"] + list(args),
+                                   env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        _, error_output = process.communicate()
+        return process.returncode, error_output.decode()
+
+    def test_store(self):
+        exit_code, error_output = self._run_hook(self.secret_path)
+
+        self.assertEqual(exit_code, 0, error_output)
+        with open(self.secret_path) as secret_file:
+            self.assertEqual(secret_file.read(), create_secret_content("password", "user"))
+        with open(self.result_path) as result_file:
+            self.assertEqual(result_file.read(), StoreResult.IMPORTED.value)
+        self.assertEqual(SummaryManager(self.summary_path).read_from_filesystem()["infos"],
+                         ["Imported imported/website/a.com/user"])
+
+    def test_existing_secret_is_kept(self):
+        with open(self.secret_path, 'w') as secret_file:
+            secret_file.write("other")
+
+        exit_code, error_output = self._run_hook("--dry-run", self.secret_path)
+
+        self.assertEqual(exit_code, 0, error_output)
+        with open(self.result_path) as result_file:
+            self.assertEqual(result_file.read(), StoreResult.SKIPPED.value)
+        self.assertEqual(len(SummaryManager(self.summary_path).read_from_filesystem()["warnings"]), 1)
+
+    def test_unknown_option(self):
+        exit_code, _ = self._run_hook("--unknown", self.secret_path)
+
+        self.assertEqual(exit_code, 2)
+        self.assertFalse(os.path.exists(self.result_path))
+
+    def test_import_time_budget(self):
+        durations = []
+        for _ in range(IMPORT_RUNS):
+            output = subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT]).decode().splitlines()
+            durations.append(float(output[0]))
+            modules = output[1].split(",")
+            for module in HEAVY_MODULES:
+                self.assertNotIn(module, modules)
+
+        self.assertLess(min(durations), IMPORT_TIME_BUDGET)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from gopass_chrome_importer import engine
+from gopass_chrome_importer.context import ImportContext
+from gopass_chrome_importer.executor import CommandError
+from gopass_chrome_importer.store_hook import StoreResult, create_secret_content
+from gopass_chrome_importer.store_index import StoreIndex, content_digest
+
+
+class StoreIndexTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def test_contains(self):
+        store_index = StoreIndex(["imported/website/google.de/user"])
+
+        self.assertTrue(store_index.contains("/imported/website/google.de/user"))
+        self.assertFalse(store_index.contains("imported/website/google.de/other"))
+
+    def test_get_secret_paths(self):
+        store_index = StoreIndex(["imported/b", "imported/a", "imported-other/c", "d"])
+
+        self.assertEqual(store_index.get_secret_paths("/imported/"), ["imported/a", "imported/b"])
+        self.assertEqual(len(store_index.get_secret_paths()), 4)
+
+    def test_load_digests(self):
+        store_index = StoreIndex(["a", "b"])
+        contents = {"a": "password\n", "b": "other"}
+
+        store_index.load_digests(["a", "b", "c"], lambda secret_path: contents[secret_path], jobs=2)
+
+        self.assertEqual(store_index.get_digest("a"), content_digest("password"))
+        self.assertEqual(store_index.get_digest("b"), content_digest("other"))
+        self.assertIsNone(store_index.get_digest("c"))
+
+    def test_load_digests_of_unreadable_secrets(self):
+        store_index = StoreIndex(["a", "b", "c"])
+
+        def read_secret(secret_path: str) -> str:
+            if secret_path != "b":
+                raise CommandError(["gopass", "show", secret_path], 1)
+            return "password"
+
+        self.assertEqual(store_index.load_digests(["c", "b", "a"], read_secret, jobs=2), ["a", "c"])
+        self.assertEqual(store_index.get_digest("b"), content_digest("password"))
+        self.assertIsNone(store_index.get_digest("a"))
+
+    def test_check_existing_entry(self):
+        identical_content = create_secret_content("password", "identical")
+        store_index = StoreIndex(["website/google.de/identical", "website/google.de/changed"])
+        store_index.add("website/google.de/identical", content_digest(identical_content))
+        context = ImportContext()
+
+        for force in [False, True]:
+            result = engine._check_existing_entry(
+                "/website/google.de/identical", identical_content, store_index, context, force=force)
+            self.assertEqual(result, StoreResult.IDENTICAL)
+
+        result = engine._check_existing_entry(
+            "/website/google.de/changed", "password", store_index, context, force=False)
+        self.assertEqual(result, StoreResult.SKIPPED)
+
+        result = engine._check_existing_entry(
+            "/website/google.de/changed", "password", store_index, context, force=True)
+        self.assertIsNone(result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from click.testing import CliRunner
+
+from gopass_chrome_importer.summary_manager import SummaryManager, SUMMARY_FORMAT_TEXT, SUMMARY_FORMAT_JSONL, \
+    SUMMARY_FORMAT_COUNTS
+
+
+class SummaryManagerTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.summary_manager = SummaryManager(os.path.join(self.tmp_dir.name, "summary", "journal"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_empty(self):
+        summary = self.summary_manager.read_from_filesystem()
+
+        self.assertEqual(summary, {"infos": [], "warnings": [], "errors": []})
+
+    def test_entries(self):
+        self.summary_manager.add_info("info")
+        self.summary_manager.add_warning("warning\nwith newline")
+        self.summary_manager.add_error("error")
+
+        summary = self.summary_manager.read_from_filesystem()
+
+        self.assertEqual(summary, {"infos": ["info"], "warnings": ["warning\nwith newline"], "errors": ["error"]})
+
+    def test_concurrent_writers(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for i in range(500):
+                executor.submit(self.summary_manager.add_info, i)
+
+        summary = self.summary_manager.read_from_filesystem()
+
+        self.assertEqual(sorted(int(info) for info in summary["infos"]), list(range(500)))
+
+    def test_incomplete_record_is_ignored(self):
+        self.summary_manager.add_info("info")
+        with open(self.summary_manager.get_tmp_file_path(), 'a') as journal:
+            journal.write('{"type": "err')
+
+        summary = self.summary_manager.read_from_filesystem()
+
+        self.assertEqual(summary["infos"], ["info"])
+        self.assertEqual(summary["errors"], [])
+
+    def test_sections(self):
+        self.summary_manager.add_info("main")
+        with self.summary_manager.section("Mount: work"):
+            self.summary_manager.add_info("work")
+            self.summary_manager.add_error("work error")
+
+        sections = self.summary_manager.read_sections()
+
+        self.assertEqual(sections[None]["infos"], ["main"])
+        self.assertEqual(sections["Mount: work"], {"infos": ["work"], "warnings": [], "errors": ["work error"]})
+        self.assertEqual(self.summary_manager.read_from_filesystem()["infos"], ["main", "work"])
+
+    def _print_summary(self, output_format: str, info_limit: int or None = None) -> str:
+        # click only writes to the output captured by the runner while a command is running
+        runner = CliRunner()
+        with runner.isolation() as streams:
+            self.summary_manager.print_summary(output_format=output_format, info_limit=info_limit)
+            # newer click versions also return the stderr stream
+            output = streams[0] if isinstance(streams, tuple) else streams
+            return output.getvalue().decode()
+
+    def test_print_text_with_info_limit(self):
+        for i in range(5):
+            self.summary_manager.add_info("info %s" % i)
+        self.summary_manager.add_warning("warning")
+
+        output = self._print_summary(SUMMARY_FORMAT_TEXT, info_limit=2)
+
+        self.assertIn("3 earlier info message(s) omitted", output)
+        self.assertNotIn("info 2", output)
+        self.assertIn("info 3\ninfo 4\n", output)
+        self.assertIn("warning", output)
+
+    def test_print_jsonl(self):
+        self.summary_manager.add_info("info 1")
+        self.summary_manager.add_error("error")
+        self.summary_manager.add_info("info 2")
+        with self.summary_manager.section("Mount: work"):
+            self.summary_manager.add_info("work")
+
+        output = self._print_summary(SUMMARY_FORMAT_JSONL, info_limit=1)
+        records = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual(records, [
+            {"section": None, "type": "error", "text": "error"},
+            {"section": None, "type": "info", "text": "info 2"},
+            {"section": "Mount: work", "type": "info", "text": "work"},
+            {"section": None, "type": "counts", "infos": 2, "warnings": 0, "errors": 1},
+            {"section": "Mount: work", "type": "counts", "infos": 1, "warnings": 0, "errors": 0}
+        ])
+
+    def test_print_counts(self):
+        for i in range(3):
+            self.summary_manager.add_info("info %s" % i)
+
+        output = self._print_summary(SUMMARY_FORMAT_COUNTS)
+
+        self.assertIn("3 info(s), 0 warning(s), 0 error(s)", output)
+        self.assertNotIn("info 0", output)
+
+    def test_print_sections(self):
+        with self.summary_manager.section("Mount: work"):
+            self.summary_manager.add_info("work info")
+            self.summary_manager.add_warning("work warning")
+        self.summary_manager.add_info("main info")
+
+        output = self._print_summary(SUMMARY_FORMAT_TEXT)
+
+        self.assertIn("Summary (1 warning(s), 0 error(s))", output)
+        self.assertLess(output.index("main info"), output.index("Mount: work"))
+        self.assertLess(output.index("work info"), output.index("work warning"))
+
+    def test_journal_is_read_once(self):
+        for i in range(3):
+            with self.summary_manager.section("Mount: %s" % i):
+                self.summary_manager.add_info("info")
+        iter_records = self.summary_manager._iter_records
+        calls = []
+
+        def record_call():
+            calls.append(None)
+            return iter_records()
+
+        self.summary_manager._iter_records = record_call
+        for output_format in [SUMMARY_FORMAT_TEXT, SUMMARY_FORMAT_JSONL]:
+            self._print_summary(output_format, info_limit=1)
+
+        self.assertEqual(len(calls), 2)
+
+    def test_entries_are_spilled_next_to_the_journal(self):
+        for i in range(3):
+            self.summary_manager.add_info("info %s" % i)
+        self.summary_manager.add_warning("warning")
+        spill_dirs = []
+        temporary_directory = tempfile.TemporaryDirectory
+
+        def record_spill_dir(*args, **kwargs):
+            spill_dir = temporary_directory(*args, **kwargs)
+            spill_dirs.append(spill_dir.name)
+            return spill_dir
+
+        with mock.patch.object(tempfile, "TemporaryDirectory", record_spill_dir):
+            self._print_summary(SUMMARY_FORMAT_COUNTS)
+            self.assertEqual(spill_dirs, [])
+
+            self._print_summary(SUMMARY_FORMAT_TEXT, info_limit=1)
+
+        self.assertEqual([os.path.dirname(spill_dir) for spill_dir in spill_dirs],
+                         [os.path.dirname(self.summary_manager.get_tmp_file_path())])
+        self.assertFalse(os.path.exists(spill_dirs[0]))
+
+    def test_limited_infos_are_not_spilled(self):
+        for i in range(3):
+            self.summary_manager.add_info("info %s" % i)
+        self.summary_manager.add_warning("warning")
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            entries = self.summary_manager._read_entries(spill_dir, info_limit=2)
+            self.assertEqual(list(entries.iter_entries(None, "infos")), [(1, "info 1"), (2, "info 2")])
+            self.assertEqual(list(entries.iter_entries(None, "warnings")), [(3, "warning")])
+            self.assertEqual(len(os.listdir(spill_dir)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
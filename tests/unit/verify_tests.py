@@ -0,0 +1,71 @@
+import threading
+import time
+import unittest
+
+from gopass_chrome_importer.executor import CommandError
+from gopass_chrome_importer.store_hook import create_secret_content
+from gopass_chrome_importer.verify import ImportVerification, VERIFY_OK, VERIFY_MISMATCH, VERIFY_UNREADABLE
+from tests.unit import ResultBackend, create_entry, import_entries
+
+
+class VerifyTests(unittest.TestCase):
+    """
+    Unit tests
+    """
+
+    def test_verify(self):
+        contents = {
+            "imported/website/ok.com/user": create_secret_content("password", "user") + "\n",
+            "imported/website/changed.com/user": create_secret_content("other", "user")
+        }
+        verification = ImportVerification()
+        for secret_path in ["/imported/website/ok.com/user", "imported/website/changed.com/user",
+                            "imported/website/missing.com/user"]:
+            verification.add(secret_path, create_secret_content("password", "user"))
+
+        def read_secret(secret_path: str) -> str:
+            if secret_path not in contents:
+                raise CommandError(["gopass", "show", secret_path], 1)
+            return contents[secret_path]
+
+        self.assertEqual(verification.verify(read_secret, jobs=2), {
+            VERIFY_OK: ["imported/website/ok.com/user"],
+            VERIFY_MISMATCH: ["imported/website/changed.com/user"],
+            VERIFY_UNREADABLE: ["imported/website/missing.com/user"]
+        })
+
+    def test_secrets_are_read_in_parallel(self):
+        verification = ImportVerification()
+        for i in range(8):
+            verification.add("website/site%s.com/user" % i, "password")
+        active = []
+        max_active = []
+        lock = threading.Lock()
+
+        def read_secret(secret_path: str) -> str:
+            with lock:
+                active.append(secret_path)
+                max_active.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(secret_path)
+            return "password"
+
+        result = verification.verify(read_secret, jobs=4)
+
+        self.assertEqual(len(result[VERIFY_OK]), 8)
+        self.assertEqual(max(max_active), 4)
+
+    def test_import_adds_written_secrets(self):
+        entries = [create_entry("https://a.com", "user", "1"), create_entry("https://skipped.com", "user", "2")]
+        verification = ImportVerification()
+
+        import_entries(entries, ResultBackend(), "/", verification=verification)
+
+        result = verification.verify(lambda secret_path: create_secret_content("1", "user"))
+        self.assertEqual(result[VERIFY_OK], ["website/a.com/user"])
+        self.assertEqual(len(verification), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()